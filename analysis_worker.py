@@ -0,0 +1,90 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger("CryptoTrader")
+
+
+class ResultSlot:
+    """Hasil analisis terakhir sebuah stream beserta nomor versi yang naik setiap publish
+
+    Pembaca (mis. UI) cukup membandingkan versi untuk tahu apakah ada hasil baru,
+    dan bisa menunggu versi baru tanpa polling.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.df = pd.DataFrame()
+        self.analysis: Dict = {}
+        self._condition = threading.Condition()
+
+    def publish(self, df: pd.DataFrame, analysis: Dict) -> int:
+        with self._condition:
+            self.df, self.analysis = df, analysis
+            self.version += 1
+            self._condition.notify_all()
+            return self.version
+
+    def latest(self) -> Tuple[int, pd.DataFrame, Dict]:
+        with self._condition:
+            return self.version, self.df, self.analysis
+
+    def wait(self, after_version: int, timeout: Optional[float] = None) -> bool:
+        """Menunggu versi lebih baru dari `after_version`; True jika ada"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.version > after_version, timeout)
+
+
+class AnalysisWorker:
+    """Thread latar yang menjalankan analisis stream yang ditandai berubah
+
+    Penanda per stream digabung: jika beberapa candle close sebelum worker sempat
+    menganalisis, stream itu hanya dianalisis sekali dengan data terbaru.
+    """
+
+    def __init__(self, analyze: Callable[[str, Dict], None], name: str = "analysis-worker"):
+        self._analyze = analyze
+        # socket_name -> pesan kline close terakhir yang belum dianalisis
+        self._pending: Dict[str, Dict] = {}
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, socket_name: str, msg: Dict):
+        with self._condition:
+            self._pending[socket_name] = msg
+            self._condition.notify_all()
+
+    def discard(self, socket_name: str):
+        with self._condition:
+            self._pending.pop(socket_name, None)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Menunggu sampai tidak ada analisis tertunda maupun berjalan"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                pending, self._pending = self._pending, {}
+                self._busy = True
+            for socket_name, msg in pending.items():
+                try:
+                    self._analyze(socket_name, msg)
+                except Exception as e:
+                    logger.exception(f"Analysis worker failed for {socket_name}: {e}")
@@ -4,8 +4,23 @@ import numpy as np
 import plotly.graph_objects as go
 import time
 import backend
+import metrics
+import result_cache
+from chart_data import ChartSeries
+from daemon_client import DaemonClient
 from datetime import datetime
 
+# Awal run skrip, untuk histogram durasi render Streamlit
+render_start = time.perf_counter()
+
+# Interval pengecekan versi hasil analisis real-time (hanya fragmen tampilan yang dijalankan ulang)
+REFRESH_SECONDS = 1.0
+
+# Pilihan rentang grafik; data di luar batas titik grafik diturunkan (LTTB / agregasi OHLC)
+CHART_WINDOWS = ["100", "500", "2000", "10000", "Semua"]
+PRICE_LINES = ['EMA_FAST', 'EMA_SLOW', 'GRID_UP', 'CENTER', 'GRID_LOW']
+MOMENTUM_LINES = ['RSI', 'MACD', 'DIF', 'DEA']
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Sistem Trading Crypto Pro",
@@ -24,179 +39,132 @@ if 'last_update' not in st.session_state:
     st.session_state.last_update = datetime.now()
 if 'bot' not in st.session_state:
     st.session_state.bot = None
+if 'result_version' not in st.session_state:
+    st.session_state.result_version = 0
+if 'view_version' not in st.session_state:
+    st.session_state.view_version = 0
+
+def set_result(df, analysis):
+    """Mengganti hasil yang ditampilkan; figure dibangun ulang sekali per hasil baru"""
+    st.session_state.df = df
+    st.session_state.analysis = analysis
+    st.session_state.last_update = datetime.now()
+    st.session_state.view_version += 1
+
 
 # UI Sidebar
 st.sidebar.header("🔒 Autentikasi Binance")
 api_key = st.sidebar.text_input("API Key", type="password")
 api_secret = st.sidebar.text_input("API Secret", type="password")
 testnet = st.sidebar.checkbox("Gunakan Testnet", value=True)
+use_store = st.sidebar.checkbox("Simpan Candle Lokal", value=True)
+expose_metrics = st.sidebar.checkbox("Endpoint Metrics Prometheus (:9108)", value=False)
+
+
+@st.cache_resource
+def start_metrics_server():
+    # Satu server /metrics per proses Streamlit, bukan per rerun
+    return metrics.serve(9108)
+
+
+if expose_metrics:
+    start_metrics_server()
+causal_wavelet = st.sidebar.checkbox("Wavelet Kausal (Tanpa Repaint)", value=False)
+# Cache rekomendasi dipakai bersama semua sesi; tier disk opsional bertahan lintas restart
+disk_cache = st.sidebar.checkbox("Cache Hasil di Disk", value=False)
+use_journal = st.sidebar.checkbox("Jurnal Keputusan", value=False)
+result_cache.RESULT_CACHE.set_disk_dir("result_cache" if disk_cache else None)
 
 if st.sidebar.button("Inisialisasi Sistem") and api_key and api_secret:
     try:
-        st.session_state.bot = backend.CryptoTradingSystem(api_key, api_secret, testnet)
-        st.sidebar.success("Sistem trading diinisialisasi!")
+        st.session_state.bot = backend.CryptoTradingSystem(
+            api_key, api_secret, testnet,
+            store_dir="candle_store" if use_store else None,
+            causal_wavelet=causal_wavelet,
+            journal_dir="decision_journal" if use_journal else None
+        )
+        # Koneksi dibuat saat pertama dipakai; ping memastikan exchange terjangkau
+        if st.session_state.bot.ping():
+            st.sidebar.success("Sistem trading diinisialisasi!")
+        else:
+            st.sidebar.warning("Sistem diinisialisasi, tetapi Binance tidak dapat dihubungi")
     except Exception as e:
         st.sidebar.error(f"Error: {str(e)}")
 
 st.sidebar.header("⚙️ Parameter Trading")
 symbol = st.sidebar.text_input("Simbol", "BTCUSDT").upper()
 timeframe = st.sidebar.selectbox("Time Frame", ["M1", "M3", "M5", "M15", "M30", "H1", "H4"], index=2)
-limit = st.sidebar.slider("Jumlah Data", 100, 1000, 500)
+limit = st.sidebar.slider("Jumlah Data", 100, 10000, 500, step=100)
 
 if st.sidebar.button("Analisis Sekarang") and st.session_state.bot:
     with st.spinner("Menganalisis data pasar..."):
         df, analysis = st.session_state.bot.get_trading_recommendation(symbol, timeframe, limit)
-        st.session_state.df = df
-        st.session_state.analysis = analysis
-        st.session_state.last_update = datetime.now()
+        set_result(df, analysis)
+
+st.sidebar.header("🧭 Konfirmasi Multi Timeframe")
+confirm_timeframes = st.sidebar.multiselect("Timeframe Konfirmasi", ["M5", "M15", "M30", "H1", "H4"], default=["M15", "H1"])
+if st.sidebar.button("Konfirmasi Timeframe") and st.session_state.bot and confirm_timeframes:
+    with st.spinner("Mengambil riwayat multi timeframe (candle terbentuk dari M1)..."):
+        st.session_state.mtf_analysis = st.session_state.bot.analyze_multi_timeframe(
+            symbol, [timeframe] + [tf for tf in confirm_timeframes if tf != timeframe], limit=200
+        )
+
+st.sidebar.header("📋 Scanner Pasar")
+scan_only_signals = st.sidebar.checkbox("Hanya Tampilkan Sinyal Aktif", value=False)
+if st.sidebar.button("Scan Semua Pasangan USDT") and st.session_state.bot:
+    with st.spinner("Memindai seluruh pasangan USDT..."):
+        st.session_state.scan_result = st.session_state.bot.scan_market(
+            timeframe, limit=200, only_signals=scan_only_signals
+        )
 
 # Toggle real-time
 realtime_toggle = st.sidebar.toggle("Analisis Real-time", st.session_state.realtime_active)
+use_order_book = st.sidebar.checkbox("Konfirmasi Order Book (Diff-Depth)", value=False,
+                                     disabled=st.session_state.realtime_active)
+# Daemon analisis (daemon.py) dibagi semua sesi: tanpa socket dan perhitungan per browser
+daemon_url = st.sidebar.text_input("URL Daemon Analisis (opsional)", "",
+                                   disabled=st.session_state.realtime_active).strip()
+
+def handle_realtime_message(msg):
+    # Dipanggil dari thread worker backend: tidak boleh memakai st.*, UI membaca slot hasil sendiri
+    pass
+
+if realtime_toggle and (st.session_state.bot or daemon_url):
+    if not st.session_state.realtime_active:
+        if daemon_url:
+            st.session_state.realtime_source = DaemonClient(daemon_url)
+            st.session_state.book_socket = None
+        else:
+            st.session_state.realtime_source = st.session_state.bot
+            st.session_state.book_socket = st.session_state.bot.start_order_book(symbol) if use_order_book else None
+        st.session_state.socket_name = st.session_state.realtime_source.start_realtime_analysis(
+            symbol, timeframe, handle_realtime_message, limit)
+        st.session_state.realtime_active = True
+        st.session_state.result_version = 0
+        st.sidebar.success("Analisis real-time diaktifkan!")
+else:
+    if st.session_state.realtime_active:
+        st.session_state.realtime_source.stop_realtime_analysis(st.session_state.socket_name)
+        if st.session_state.get('book_socket'):
+            st.session_state.bot.stop_realtime_analysis(st.session_state.book_socket)
+        st.session_state.realtime_active = False
+        st.sidebar.info("Analisis real-time dimatikan")
 
 # Tampilan utama
 st.title(f"🚀 Sistem Trading Crypto Pro: {symbol}")
-st.caption(f"Terakhir diperbarui: {st.session_state.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
-
-# Panel rekomendasi trading
-if st.session_state.analysis and 'recommendation' in st.session_state.analysis:
-    rec = st.session_state.analysis['recommendation']
-    if rec == "BUY SEKARANG":
-        st.success(f"## 🚀 REKOMENDASI: {rec}!")
-    elif rec == "SELL SEKARANG":
-        st.error(f"## 📉 REKOMENDASI: {rec}!")
-    else:
-        st.info(f"## ⏳ REKOMENDASI: {rec}")
-else:
-    st.warning("## 🔍 Silahkan konfigurasi dan mulai analisis")
 
-# Tampilkan detail sinyal
-if st.session_state.analysis and 'trend_up' in st.session_state.analysis:
-    st.subheader("🔍 Detail Sinyal Trading")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Trend", 
-                "🔺 Naik" if st.session_state.analysis['trend_up'] else "🔻 Turun" if st.session_state.analysis['trend_down'] else "↔ Netral",
-                "EMA 9 vs EMA 21")
-    col2.metric("Momentum", 
-                "🟢 Beli" if st.session_state.analysis['momentum_buy'] else "🔴 Jual" if st.session_state.analysis['momentum_sell'] else "⚪ Netral",
-                "RSI 7 Periode")
-    col3.metric("Kekuatan Trend", 
-                "💪 Kuat" if st.session_state.analysis['trend_strong'] else "🫣 Lemah",
-                "ADX > 20")
-    col4.metric("Volatilitas", 
-                "🌊 Valid" if st.session_state.analysis['valid_volatility'] else "🍃 Tenang",
-                "Range > 0.8 * ATR")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Volume", 
-                "🚀 Spike" if st.session_state.analysis['volume_spike'] else "📉 Normal",
-                "Volume > 1.5x Rata-rata")
-    col2.metric("Pola Candle", 
-                "🟢 Bullish" if st.session_state.analysis['bull_candle'] else "🔴 Bearish" if st.session_state.analysis['bear_candle'] else "⚪ Netral",
-                "Konfirmasi Candlestick")
-    col3.metric("Sinyal MACD", 
-                "🟢 Beli" if st.session_state.analysis['macd_buy'] else "🔴 Jual" if st.session_state.analysis['macd_sell'] else "⚪ Netral",
-                "Wavelet-MACD Pro")
-    col4.metric("Sinyal Grid", 
-                "🟢 Beli" if st.session_state.analysis['grid_buy'] else "🔴 Jual" if st.session_state.analysis['grid_sell'] else "⚪ Netral",
-                "Dynamic Grid Trading")
-
-# Manajemen Risiko
-if st.session_state.analysis and 'last_close' in st.session_state.analysis:
-    st.subheader("🛡️ Manajemen Risiko")
-    
-    if st.session_state.analysis['recommendation'] == "BUY SEKARANG":
-        entry_price = st.session_state.analysis['last_close']
-        stop_loss = st.session_state.analysis['stop_loss_buy']
-        take_profit = st.session_state.analysis['take_profit_buy']
-        
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Harga Entry", f"${entry_price:.4f}")
-        col2.metric("Stop Loss", f"${stop_loss:.4f}", f"{(stop_loss-entry_price)/entry_price*100:.2f}%")
-        col3.metric("Take Profit", f"${take_profit:.4f}", f"{(take_profit-entry_price)/entry_price*100:.2f}%")
-        
-        st.info(f"🔺 Rasio Risk:Reward = 1:{abs((take_profit-entry_price)/(entry_price-stop_loss)):.1f}")
-        
-    elif st.session_state.analysis['recommendation'] == "SELL SEKARANG":
-        entry_price = st.session_state.analysis['last_close']
-        stop_loss = st.session_state.analysis['stop_loss_sell']
-        take_profit = st.session_state.analysis['take_profit_sell']
-        
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Harga Entry", f"${entry_price:.4f}")
-        col2.metric("Stop Loss", f"${stop_loss:.4f}", f"{(stop_loss-entry_price)/entry_price*100:.2f}%")
-        col3.metric("Take Profit", f"${take_profit:.4f}", f"{(take_profit-entry_price)/entry_price*100:.2f}%")
-        
-        st.info(f"🔻 Rasio Risk:Reward = 1:{abs((entry_price-take_profit)/(stop_loss-entry_price)):.1f}")
 
-# Grafik analisis
-if st.session_state.analysis and 'last_close' in st.session_state.analysis:
+def build_figures():
+    """Figure harga dan momentum tanpa data; data diisi fill_figures setiap ada hasil baru"""
     fig = go.Figure()
     
-    fig.add_trace(go.Candlestick(
-        x=st.session_state.df['timestamp'],
-        open=st.session_state.df['open'],
-        high=st.session_state.df['high'],
-        low=st.session_state.df['low'],
-        close=st.session_state.df['close'],
-        name='Harga'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['EMA_FAST'],
-        mode='lines',
-        name='EMA 9',
-        line=dict(color='blue', width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['EMA_SLOW'],
-        mode='lines',
-        name='EMA 21',
-        line=dict(color='orange', width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['GRID_UP'],
-        mode='lines',
-        name='Resistance',
-        line=dict(color='red', dash='dash', width=1)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['CENTER'],
-        mode='lines',
-        name='Midline',
-        line=dict(color='gray', dash='dash', width=1)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['GRID_LOW'],
-        mode='lines',
-        name='Support',
-        line=dict(color='green', dash='dash', width=1),
-        fill='tonexty'
-    ))
-    
-    last_rec = st.session_state.analysis['recommendation']
-    last_close = st.session_state.analysis['last_close']
-    if last_rec != "TUNGGU / NO TRADE":
-        fig.add_annotation(
-            x=st.session_state.df['timestamp'].iloc[-1],
-            y=last_close,
-            text=last_rec,
-            showarrow=True,
-            arrowhead=1,
-            ax=0,
-            ay=-40 if "BELI" in last_rec else 40,
-            bgcolor="green" if "BELI" in last_rec else "red",
-            font=dict(color="white", size=14)
-        )
+    fig.add_trace(go.Candlestick(name='Harga'))
+    fig.add_trace(go.Scattergl(mode='lines', name='EMA 9', line=dict(color='blue', width=2)))
+    fig.add_trace(go.Scattergl(mode='lines', name='EMA 21', line=dict(color='orange', width=2)))
+    fig.add_trace(go.Scattergl(mode='lines', name='Resistance', line=dict(color='red', dash='dash', width=1)))
+    fig.add_trace(go.Scattergl(mode='lines', name='Midline', line=dict(color='gray', dash='dash', width=1)))
+    fig.add_trace(go.Scattergl(mode='lines', name='Support', line=dict(color='green', dash='dash', width=1),
+                               fill='tonexty'))
     
     fig.update_layout(
         title=f"{symbol} - Analisis Harga",
@@ -205,46 +173,15 @@ if st.session_state.analysis and 'last_close' in st.session_state.analysis:
         template="plotly_dark",
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
-    st.plotly_chart(fig, use_container_width=True)
     
     fig2 = go.Figure()
     
-    fig2.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['RSI'],
-        mode='lines',
-        name='RSI',
-        line=dict(color='cyan', width=2),
-        yaxis='y1'
-    ))
+    fig2.add_trace(go.Scattergl(mode='lines', name='RSI', line=dict(color='cyan', width=2), yaxis='y1'))
     fig2.add_hline(y=30, line_dash="dash", line_color="green")
     fig2.add_hline(y=70, line_dash="dash", line_color="red")
-    
-    fig2.add_trace(go.Bar(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['MACD'],
-        name='MACD Histogram',
-        marker_color=np.where(st.session_state.df['MACD'] > 0, 'green', 'red'),
-        yaxis='y2'
-    ))
-    
-    fig2.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['DIF'],
-        mode='lines',
-        name='DIF',
-        line=dict(color='yellow', width=2),
-        yaxis='y2'
-    ))
-    
-    fig2.add_trace(go.Scatter(
-        x=st.session_state.df['timestamp'],
-        y=st.session_state.df['DEA'],
-        mode='lines',
-        name='DEA',
-        line=dict(color='purple', width=2),
-        yaxis='y2'
-    ))
+    fig2.add_trace(go.Bar(name='MACD Histogram', yaxis='y2'))
+    fig2.add_trace(go.Scattergl(mode='lines', name='DIF', line=dict(color='yellow', width=2), yaxis='y2'))
+    fig2.add_trace(go.Scattergl(mode='lines', name='DEA', line=dict(color='purple', width=2), yaxis='y2'))
     
     fig2.update_layout(
         title="Indikator Momentum",
@@ -253,35 +190,196 @@ if st.session_state.analysis and 'last_close' in st.session_state.analysis:
         yaxis=dict(title="RSI", domain=[0.6, 1.0]),
         yaxis2=dict(title="MACD", domain=[0.0, 0.4])
     )
-    st.plotly_chart(fig2, use_container_width=True)
+    return fig, fig2
 
-# Perbaikan real-time handler
-def handle_realtime_message(msg):
-    try:
-        if msg['e'] == 'kline' and msg['k']['x']:
-            st.session_state.last_update = datetime.now()
-            if st.session_state.bot:
-                df, analysis = st.session_state.bot.get_trading_recommendation(symbol, timeframe, limit)
-                st.session_state.df = df
-                st.session_state.analysis = analysis
-                st.rerun()
-    except Exception as e:
-        st.error(f"Error in real-time handler: {e}")
 
-if realtime_toggle and st.session_state.bot:
-    if not st.session_state.realtime_active:
-        st.session_state.socket_name = st.session_state.bot.start_realtime_analysis(symbol, timeframe, handle_realtime_message)
-        st.session_state.realtime_active = True
-        st.sidebar.success("Analisis real-time diaktifkan!")
-else:
-    if st.session_state.realtime_active and st.session_state.bot:
-        st.session_state.bot.stop_realtime(st.session_state.socket_name)
-        st.session_state.realtime_active = False
-        st.sidebar.info("Analisis real-time dimatikan")
+def fill_figures(fig, fig2, view):
+    """Mengganti data trace di tempat (tanpa membangun ulang figure) dari data grafik terdownsample"""
+    candles, lines = view['candles'], view['lines']
+    with fig.batch_update():
+        fig.data[0].update(x=candles['timestamp'], open=candles['open'], high=candles['high'],
+                           low=candles['low'], close=candles['close'])
+        for trace, name in zip(fig.data[1:], PRICE_LINES):
+            trace.update(x=lines[name][0], y=lines[name][1])
+        
+        fig.layout.annotations = []
+        last_rec = st.session_state.analysis['recommendation']
+        last_close = st.session_state.analysis['last_close']
+        if last_rec != "TUNGGU / NO TRADE":
+            fig.add_annotation(
+                x=candles['timestamp'][-1],
+                y=last_close,
+                text=last_rec,
+                showarrow=True,
+                arrowhead=1,
+                ax=0,
+                ay=-40 if "BUY" in last_rec else 40,
+                bgcolor="green" if "BUY" in last_rec else "red",
+                font=dict(color="white", size=14)
+            )
+    
+    with fig2.batch_update():
+        for trace, name in zip(fig2.data, MOMENTUM_LINES):
+            trace.update(x=lines[name][0], y=lines[name][1])
+        fig2.data[1].marker.color = np.where(lines['MACD'][1] > 0, 'green', 'red')
+
+
+def chart_view(window: str):
+    """Data grafik rentang terpilih; ChartSeries hanya memproses bar baru dari setiap hasil"""
+    chart = st.session_state.get('chart')
+    if chart is None or chart['key'] != (symbol, timeframe):
+        chart = st.session_state.chart = {'key': (symbol, timeframe), 'series': ChartSeries(), 'version': -1}
+    series = chart['series']
+    if chart['version'] != st.session_state.view_version:
+        series.update(st.session_state.df)
+        chart['version'] = st.session_state.view_version
+    if window == "Semua" or len(series) <= int(window):
+        return series.view()
+    return series.view(start_ms=int(series.timestamps[-int(window)]))
+
+
+def sync_realtime_result():
+    """Mengambil hasil worker real-time jika versinya berbeda dari yang ditampilkan"""
+    if st.session_state.realtime_active:
+        version, df, analysis = st.session_state.realtime_source.get_realtime_result(st.session_state.socket_name)
+        # Versi mundur dengan hasil berisi berarti sumbernya dimulai ulang: tetap hasil baru
+        if not df.empty and version != st.session_state.result_version:
+            st.session_state.result_version = version
+            set_result(df, analysis)
+
+
+def analysis_view():
+    sync_realtime_result()
+    st.caption(f"Terakhir diperbarui: {st.session_state.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
+    # Panel rekomendasi trading
+    if st.session_state.analysis and 'recommendation' in st.session_state.analysis:
+        rec = st.session_state.analysis['recommendation']
+        if rec == "BUY SEKARANG":
+            st.success(f"## 🚀 REKOMENDASI: {rec}!")
+        elif rec == "SELL SEKARANG":
+            st.error(f"## 📉 REKOMENDASI: {rec}!")
+        else:
+            st.info(f"## ⏳ REKOMENDASI: {rec}")
+    else:
+        st.warning("## 🔍 Silahkan konfigurasi dan mulai analisis")
+
+    # Tampilkan detail sinyal
+    if st.session_state.analysis and 'trend_up' in st.session_state.analysis:
+        st.subheader("🔍 Detail Sinyal Trading")
+    
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Trend", 
+                    "🔺 Naik" if st.session_state.analysis['trend_up'] else "🔻 Turun" if st.session_state.analysis['trend_down'] else "↔ Netral",
+                    "EMA 9 vs EMA 21")
+        col2.metric("Momentum", 
+                    "🟢 Beli" if st.session_state.analysis['momentum_buy'] else "🔴 Jual" if st.session_state.analysis['momentum_sell'] else "⚪ Netral",
+                    "RSI 7 Periode")
+        col3.metric("Kekuatan Trend", 
+                    "💪 Kuat" if st.session_state.analysis['trend_strong'] else "🫣 Lemah",
+                    "ADX > 20")
+        col4.metric("Volatilitas", 
+                    "🌊 Valid" if st.session_state.analysis['valid_volatility'] else "🍃 Tenang",
+                    "Range > 0.8 * ATR")
+    
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Volume", 
+                    "🚀 Spike" if st.session_state.analysis['volume_spike'] else "📉 Normal",
+                    "Volume > 1.5x Rata-rata")
+        col2.metric("Pola Candle", 
+                    "🟢 Bullish" if st.session_state.analysis['bull_candle'] else "🔴 Bearish" if st.session_state.analysis['bear_candle'] else "⚪ Netral",
+                    "Konfirmasi Candlestick")
+        col3.metric("Sinyal MACD", 
+                    "🟢 Beli" if st.session_state.analysis['macd_buy'] else "🔴 Jual" if st.session_state.analysis['macd_sell'] else "⚪ Netral",
+                    "Wavelet-MACD Pro")
+        col4.metric("Sinyal Grid", 
+                    "🟢 Beli" if st.session_state.analysis['grid_buy'] else "🔴 Jual" if st.session_state.analysis['grid_sell'] else "⚪ Netral",
+                    "Dynamic Grid Trading")
+    
+        if 'book_imbalance' in st.session_state.analysis:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Spread", f"{st.session_state.analysis['book_spread_bps']:.2f} bps", "Order Book Lokal")
+            col2.metric("Imbalance", f"{st.session_state.analysis['book_imbalance']:+.2f}", "10 Level Teratas")
+            col3.metric("Konfirmasi Beli", "🟢 Ya" if st.session_state.analysis['book_buy'] else "🔴 Tidak", "Spread & Imbalance")
+            col4.metric("Konfirmasi Jual", "🟢 Ya" if st.session_state.analysis['book_sell'] else "🔴 Tidak", "Spread & Imbalance")
+
+    # Manajemen Risiko
+    if st.session_state.analysis and 'last_close' in st.session_state.analysis:
+        st.subheader("🛡️ Manajemen Risiko")
+    
+        if st.session_state.analysis['recommendation'] == "BUY SEKARANG":
+            entry_price = st.session_state.analysis['last_close']
+            stop_loss = st.session_state.analysis['stop_loss_buy']
+            take_profit = st.session_state.analysis['take_profit_buy']
+        
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Harga Entry", f"${entry_price:.4f}")
+            col2.metric("Stop Loss", f"${stop_loss:.4f}", f"{(stop_loss-entry_price)/entry_price*100:.2f}%")
+            col3.metric("Take Profit", f"${take_profit:.4f}", f"{(take_profit-entry_price)/entry_price*100:.2f}%")
+        
+            st.info(f"🔺 Rasio Risk:Reward = 1:{abs((take_profit-entry_price)/(entry_price-stop_loss)):.1f}")
+        
+        elif st.session_state.analysis['recommendation'] == "SELL SEKARANG":
+            entry_price = st.session_state.analysis['last_close']
+            stop_loss = st.session_state.analysis['stop_loss_sell']
+            take_profit = st.session_state.analysis['take_profit_sell']
+        
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Harga Entry", f"${entry_price:.4f}")
+            col2.metric("Stop Loss", f"${stop_loss:.4f}", f"{(stop_loss-entry_price)/entry_price*100:.2f}%")
+            col3.metric("Take Profit", f"${take_profit:.4f}", f"{(take_profit-entry_price)/entry_price*100:.2f}%")
+        
+            st.info(f"🔻 Rasio Risk:Reward = 1:{abs((entry_price-take_profit)/(stop_loss-entry_price)):.1f}")
+
+    # Grafik analisis: figure dibuat sekali per simbol, lalu hanya datanya yang diganti per hasil baru
+    if st.session_state.analysis and 'last_close' in st.session_state.analysis:
+        window = st.select_slider("Rentang Grafik (bar terakhir)", options=CHART_WINDOWS, value="Semua",
+                                  key="chart_window")
+        figures = st.session_state.get('figures')
+        if figures is None or figures['key'] != (symbol, timeframe):
+            figures = st.session_state.figures = {'key': (symbol, timeframe), 'filled': None,
+                                                  'figs': build_figures()}
+        if figures['filled'] != (st.session_state.view_version, window):
+            fill_figures(*figures['figs'], chart_view(window))
+            figures['filled'] = (st.session_state.view_version, window)
+        st.plotly_chart(figures['figs'][0], use_container_width=True)
+        st.plotly_chart(figures['figs'][1], use_container_width=True)
+
+
+# Tanpa real-time fragmen hanya berjalan bersama skrip; dengan real-time hanya fragmen ini yang diulang
+st.fragment(analysis_view, run_every=REFRESH_SECONDS if st.session_state.realtime_active else None)()
+
+# Tabel hasil scanner multi-simbol
+if 'scan_result' in st.session_state and not st.session_state.scan_result.empty:
+    st.subheader(f"📋 Peringkat Scanner ({timeframe})")
+    st.dataframe(
+        st.session_state.scan_result[[
+            'symbol', 'recommendation', 'side', 'score', 'last_close',
+            'rsi', 'adx', 'atr', 'stop_loss', 'take_profit'
+        ]],
+        use_container_width=True,
+        hide_index=True
+    )
+
+# Tabel konfirmasi multi timeframe
+if st.session_state.get('mtf_analysis'):
+    st.subheader(f"🧭 Konfirmasi Multi Timeframe: {symbol}")
+    st.dataframe(
+        pd.DataFrame([
+            {
+                'timeframe': tf,
+                'recommendation': a.get('recommendation', '-'),
+                'trend': "Naik" if a.get('trend_up') else "Turun" if a.get('trend_down') else "Netral",
+                'trend_strong': a.get('trend_strong', False),
+                'macd': "Beli" if a.get('macd_buy') else "Jual" if a.get('macd_sell') else "Netral",
+                'last_close': a.get('last_close')
+            }
+            for tf, a in st.session_state.mtf_analysis.items()
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
 
-if st.session_state.realtime_active:
-    time.sleep(1)
-    st.rerun()
+metrics.APP_RENDER_SECONDS.observe(time.perf_counter() - render_start)
 
 st.markdown("---")
 st.caption("© 2024 Sistem Trading Crypto Pro | Binance API | Real-time Analysis")
@@ -0,0 +1,353 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+import pandas as pd
+from binance import AsyncClient, BinanceSocketManager
+
+from backend import CryptoTradingSystem, INTERVAL_MAP
+from log_config import configure_logging
+from backfill import KlineBackfiller, INTERVAL_MS, KLINES_REQUEST_WEIGHT, KLINES_PAGE_LIMIT
+from candle_buffer import CandleRingBuffer, kline_message_columns
+from kline_parser import klines_to_frame
+from metrics import observe_kline_latency
+from scanner import MarketScanner, EXCHANGE_INFO_WEIGHT
+from resample import bucket_start
+from request_scheduler import (RequestScheduler, REQUEST_SCHEDULER, PRIORITY_REALTIME, PRIORITY_INTERACTIVE,
+                               PRIORITY_BULK)
+
+logger = logging.getLogger("CryptoTrader")
+
+# Binance mengizinkan 1024 stream per koneksi; jumlah kecil menjaga URL pendek dan antrean per koneksi ringan
+STREAMS_PER_CONNECTION = 200
+
+# Jeda reconnect awal dan maksimum (detik), dilipatgandakan setiap kegagalan berturut-turut
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+
+def stream_name(symbol: str, interval: str) -> str:
+    """Nama combined stream kline, mis. btcusdt@kline_5m"""
+    return f"{symbol.lower()}@kline_{INTERVAL_MAP.get(interval, interval)}"
+
+
+class AsyncCryptoTradingSystem:
+    """Padanan asyncio CryptoTradingSystem untuk mengikuti banyak pasangan dari satu proses
+
+    REST berjalan konkuren lewat satu sesi HTTP ber-pool (AsyncClient), dibatasi
+    semaphore dan penjadwal bobot yang sama dengan request sinkron (REQUEST_SCHEDULER). Stream kline digabung ke combined-stream
+    socket berisi sampai `streams_per_connection` stream per koneksi; setiap koneksi
+    diawasi task yang membuka ulang koneksi dengan daftar stream terkini setelah
+    putus, lalu celah candle diisi lewat REST. Perhitungan indikator didelegasikan ke
+    CryptoTradingSystem offline (`analysis`, tanpa I/O sinkron) dan berjalan di thread
+    analisis agar event loop tidak terblokir.
+
+    Dibuat dengan `await AsyncCryptoTradingSystem.create(...)` dan ditutup dengan `await close()`.
+    """
+
+    def __init__(self, max_concurrency: int = 10, streams_per_connection: int = STREAMS_PER_CONNECTION,
+                 causal_wavelet: bool = False, analysis_workers: int = 1,
+                 journal_dir: Optional[str] = None):
+        configure_logging()
+        self.client: Optional[AsyncClient] = None
+        self.socket_manager: Optional[BinanceSocketManager] = None
+        self.testnet = False
+        # Komposisi, bukan pewarisan: API REST/stream sinkron CryptoTradingSystem tidak ikut terekspos
+        self.analysis = CryptoTradingSystem(offline=True, causal_wavelet=causal_wavelet, journal_dir=journal_dir)
+        self.realtime_streams: Dict[str, Dict] = {}
+        self.max_concurrency = max_concurrency
+        self.streams_per_connection = streams_per_connection
+        # Anggaran bobot berlaku per IP: dibagi dengan semua CryptoTradingSystem dalam proses
+        self.request_scheduler: RequestScheduler = REQUEST_SCHEDULER
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Cache analisis (memo MACD, DIF kausal) tidak thread-safe: default satu thread analisis
+        self._analysis_executor = ThreadPoolExecutor(max_workers=analysis_workers)
+        # Koneksi combined stream: daftar stream dan task pengawasnya
+        self._connections: List[Dict] = []
+        # Referensi task pemrosesan candle agar tidak dibersihkan garbage collector sebelum selesai
+        self._tasks = set()
+
+    @classmethod
+    async def create(cls, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: bool = False,
+                     **kwargs) -> "AsyncCryptoTradingSystem":
+        """Membuat sistem dengan AsyncClient dan pool koneksi HTTP yang dibagi semua request"""
+        self = cls(**kwargs)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+        self.testnet = testnet
+        self.client = await AsyncClient.create(api_key, api_secret, testnet=testnet,
+                                               session_params={'connector': connector})
+        # Antrean per koneksi harus menampung burst candle close dari semua stream di koneksi itu
+        self.socket_manager = BinanceSocketManager(self.client, max_queue_size=4 * self.streams_per_connection)
+        logger.info("Async trading system initialized")
+        return self
+
+    @property
+    def journal(self):
+        return self.analysis.journal
+
+    def calculate_indicators(self, df: pd.DataFrame, symbol: str = "", interval: str = "",
+                             **kwargs) -> Tuple[pd.DataFrame, Dict]:
+        """Indikator dan rekomendasi (sinkron, CPU saja) lewat sistem analisis"""
+        return self.analysis.calculate_indicators(df, symbol, interval, **kwargs)
+
+    async def request(self, method: str, weight: int, priority: int = PRIORITY_INTERACTIVE, **params):
+        """Memanggil metode AsyncClient lewat penjadwal bobot bersama (prioritas, header bobot, request identik digabung)"""
+        client = self.client
+        key = (type(client).__name__, bool(self.testnet), method, tuple(sorted(params.items())))
+        async with self._semaphore:
+            return await self.request_scheduler.call_async(
+                lambda: getattr(client, method)(**params), weight, priority, key,
+                response=lambda: getattr(client, 'response', None)
+            )
+
+    async def _request_klines(self, priority: int = PRIORITY_INTERACTIVE, **params) -> List:
+        return await self.request('get_klines', KLINES_REQUEST_WEIGHT, priority, **params)
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 500,
+                         priority: int = PRIORITY_INTERACTIVE) -> pd.DataFrame:
+        """Mendapatkan data klines dari Binance tanpa memblokir event loop"""
+        binance_interval = INTERVAL_MAP.get(interval, interval)
+        try:
+            if limit > KLINES_PAGE_LIMIT:
+                end_ms = int(time.time() * 1000)
+                start_ms = end_ms - limit * INTERVAL_MS[binance_interval]
+                df = await self.get_historical_klines(symbol, binance_interval, start_ms, end_ms, priority)
+                return df.tail(limit).reset_index(drop=True)
+            klines = await self._request_klines(priority, symbol=symbol, interval=binance_interval, limit=limit)
+            return klines_to_frame(klines)
+        except Exception as e:
+            logger.error(f"Error fetching klines: {e}")
+            return pd.DataFrame()
+
+    async def get_historical_klines(self, symbol: str, interval: str, start_time, end_time=None,
+                                    priority: int = PRIORITY_BULK) -> pd.DataFrame:
+        """Backfill rentang panjang: semua halaman diminta konkuren lewat pool koneksi"""
+        binance_interval = INTERVAL_MAP.get(interval, interval)
+        try:
+            start_ms = CryptoTradingSystem._to_ms(start_time)
+            end_ms = CryptoTradingSystem._to_ms(end_time) if end_time is not None else int(time.time() * 1000)
+            pages = KlineBackfiller.pages(start_ms, end_ms, binance_interval)
+            responses = await asyncio.gather(*[
+                self._request_klines(priority, symbol=symbol, interval=binance_interval, startTime=page_start,
+                                     endTime=page_end, limit=KLINES_PAGE_LIMIT)
+                for page_start, page_end in pages
+            ])
+            return KlineBackfiller.stitch([klines_to_frame(r) for r in responses], start_ms, end_ms)
+        except Exception as e:
+            logger.error(f"Error backfilling klines: {e}")
+            return pd.DataFrame()
+
+    async def get_klines_many(self, symbols: List[str], interval: str, limit: int = 500) -> Dict[str, pd.DataFrame]:
+        """Klines banyak simbol sekaligus; request berbagi pool koneksi dan anggaran bobot
+
+        Prioritas bulk seperti MarketScanner: scan pasar tidak menahan request interaktif/real-time.
+        """
+        frames = await asyncio.gather(*[self.get_klines(s, interval, limit, PRIORITY_BULK) for s in symbols])
+        return dict(zip(symbols, frames))
+
+    async def _analyze(self, df: pd.DataFrame, symbol: str, interval: str) -> Tuple[pd.DataFrame, Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._analysis_executor, self.calculate_indicators, df, symbol, interval)
+
+    async def get_trading_recommendation(self, symbol: str, interval: str, limit: int = 500) -> Tuple[pd.DataFrame, Dict]:
+        """Mendapatkan rekomendasi trading untuk simbol tertentu dari candle close (seperti versi sinkron)"""
+        binance_interval = INTERVAL_MAP.get(interval, interval)
+        df = await self.get_klines(symbol, interval, limit)
+        if not df.empty and binance_interval in INTERVAL_MS:
+            forming = bucket_start(np.int64(time.time() * 1000), binance_interval)
+            df = df[df['timestamp'] < pd.to_datetime(int(forming), unit='ms')].reset_index(drop=True)
+        if df.empty:
+            return df, {"error": "Failed to get data"}
+        return await self._analyze(df, symbol, binance_interval)
+
+    async def usdt_symbols(self) -> List[str]:
+        """Semua pasangan spot USDT yang sedang diperdagangkan"""
+        return MarketScanner.usdt_pairs(await self.request('get_exchange_info', EXCHANGE_INFO_WEIGHT))
+
+    async def scan_market(self, interval: str, limit: int = 200, symbols: Optional[List[str]] = None,
+                          only_signals: bool = False, compact: bool = False,
+                          columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Scan seluruh pasangan USDT: fetch konkuren lalu peringkat batch di thread analisis
+
+        `compact`/`columns` seperti AnalysisSystem.scan_market.
+        """
+        try:
+            symbols = symbols or await self.usdt_symbols()
+            logger.info(f"Scanning {len(symbols)} symbols @ {interval}")
+            stacked = MarketScanner.stack(await self.get_klines_many(symbols, interval, limit), limit)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._analysis_executor, MarketScanner.rank, stacked,
+                                                self.analysis.causal_denoiser)
+            return MarketScanner.finish(result, only_signals, compact, columns)
+        except Exception as e:
+            logger.exception(f"Error in market scan: {e}")
+            return pd.DataFrame()
+
+    async def subscribe(self, symbols: List[str], interval: str, callback: Optional[Callable] = None,
+                        limit: int = 500) -> List[str]:
+        """Mengikuti kline banyak simbol lewat combined stream; mengembalikan nama stream
+
+        `callback(stream, df, analysis)` (fungsi biasa atau coroutine) dipanggil setiap
+        candle close setelah analisis selesai.
+        """
+        binance_interval = INTERVAL_MAP.get(interval, interval)
+        names = [stream_name(s, binance_interval) for s in symbols]
+        new = [(s, n) for s, n in zip(symbols, names) if n not in self.realtime_streams]
+
+        # Isi ring buffer semua simbol baru secara konkuren
+        history = await self.get_klines_many([s for s, _ in new], binance_interval, limit)
+        for symbol, name in new:
+            buffer = CandleRingBuffer(limit)
+            buffer.extend_frame(history[symbol])
+            self.realtime_streams[name] = {
+                'symbol': symbol,
+                'interval': binance_interval,
+                'buffer': buffer,
+                'df': pd.DataFrame(),
+                'analysis': {},
+                'callback': callback,
+                'lock': asyncio.Lock()
+            }
+
+        # Stream baru mengisi koneksi yang belum penuh dulu; koneksi yang berubah dibuka ulang
+        pending = [n for _, n in new]
+        for connection in self._connections:
+            room = self.streams_per_connection - len(connection['streams'])
+            if pending and room > 0:
+                connection['streams'].extend(pending[:room])
+                pending = pending[room:]
+                self._restart_connection(connection)
+        while pending:
+            connection = {'streams': pending[:self.streams_per_connection], 'task': None}
+            pending = pending[self.streams_per_connection:]
+            self._connections.append(connection)
+            self._restart_connection(connection)
+
+        logger.info(f"Subscribed {len(new)} streams @ {binance_interval} "
+                    f"({len(self.realtime_streams)} streams on {len(self._connections)} connections)")
+        return names
+
+    async def unsubscribe(self, names: List[str]):
+        """Berhenti mengikuti stream; koneksi yang kosong ditutup"""
+        names = set(names)
+        for connection in list(self._connections):
+            remaining = [n for n in connection['streams'] if n not in names]
+            if len(remaining) == len(connection['streams']):
+                continue
+            connection['streams'] = remaining
+            if remaining:
+                self._restart_connection(connection)
+            else:
+                connection['task'].cancel()
+                self._connections.remove(connection)
+        for name in names:
+            self.realtime_streams.pop(name, None)
+
+    def _restart_connection(self, connection: Dict):
+        if connection['task'] is not None:
+            connection['task'].cancel()
+        connection['task'] = asyncio.create_task(self._run_connection(connection))
+
+    async def _run_connection(self, connection: Dict):
+        """Mengawasi satu combined-stream socket; setiap reconnect berlangganan ulang stream terkini"""
+        delay = RECONNECT_DELAY
+        while connection['streams']:
+            streams = list(connection['streams'])
+            try:
+                async with self.socket_manager.multiplex_socket(streams) as socket:
+                    logger.info(f"Combined stream connected: {len(streams)} streams")
+                    delay = RECONNECT_DELAY
+                    while True:
+                        msg = await socket.recv()
+                        if msg.get('e') == 'error':
+                            logger.warning(f"Combined stream error: {msg.get('m')}, reconnecting")
+                            break
+                        self._dispatch(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Combined stream failed: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _dispatch(self, msg: Dict):
+        """Meneruskan pesan combined stream ke stream-nya; candle close diproses di task terpisah"""
+        stream = self.realtime_streams.get(msg.get('stream'))
+        data = msg.get('data', {})
+        if stream is not None and data.get('e') == 'kline' and data['k']['x']:
+            task = asyncio.create_task(self._on_closed_kline(msg['stream'], stream, data))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _on_closed_kline(self, name: str, stream: Dict, data: Dict):
+        """Mengisi celah (mis. setelah reconnect), menambah candle, lalu menganalisis ring buffer"""
+        # Lock per stream menjaga urutan candle meskipun backfill celah sedang berjalan
+        async with stream['lock']:
+            try:
+                buffer = stream['buffer']
+                open_time = data['k']['t']
+                expected = buffer.last_open_time + INTERVAL_MS[stream['interval']] if len(buffer) else open_time
+                if open_time > expected:
+                    logger.warning(f"Gap detected on {name}, backfilling {expected}..{open_time - 1}")
+                    buffer.extend_frame(await self.get_historical_klines(
+                        stream['symbol'], stream['interval'], expected, open_time - 1, PRIORITY_REALTIME))
+
+                buffer.extend(kline_message_columns(data))
+                await self._publish(name, stream, data)
+            except Exception as e:
+                logger.exception(f"Error handling kline message: {e}")
+
+    async def refresh(self, name: str):
+        """Menganalisis ring buffer stream sekarang tanpa menunggu candle close (mis. hasil awal setelah subscribe)"""
+        stream = self.realtime_streams.get(name)
+        if stream is None:
+            return
+        async with stream['lock']:
+            try:
+                await self._publish(name, stream)
+            except Exception as e:
+                logger.exception(f"Error analyzing stream {name}: {e}")
+
+    async def _publish(self, name: str, stream: Dict, data: Optional[Dict] = None):
+        """Analisis ring buffer lalu memanggil callback stream (dipanggil dengan lock stream)
+
+        Setelah candle close hanya candle baru yang dihitung (calculate_stream_indicators); refresh
+        tanpa candle close bisa berisi candle yang masih terbentuk, jadi dianalisis penuh.
+        """
+        frame = stream['buffer'].to_frame()
+        if data is not None:
+            loop = asyncio.get_running_loop()
+            stream['df'], stream['analysis'] = await loop.run_in_executor(
+                self._analysis_executor, self.analysis.calculate_stream_indicators, stream, frame)
+        else:
+            stream['df'], stream['analysis'] = await self._analyze(frame, stream['symbol'], stream['interval'])
+        if data is not None:
+            observe_kline_latency(data, stream['interval'])
+
+        callback = stream['callback']
+        if callback is not None:
+            result = callback(name, stream['df'], stream['analysis'])
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def close(self):
+        """Menutup semua koneksi stream dan sesi HTTP"""
+        for connection in self._connections:
+            connection['task'].cancel()
+        await asyncio.gather(*[c['task'] for c in self._connections], return_exceptions=True)
+        self._connections.clear()
+        # Pengisian celah/analisis candle yang masih berjalan tidak boleh memakai client yang ditutup
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.realtime_streams.clear()
+        if self.client is not None:
+            await self.client.close_connection()
+        self._analysis_executor.shutdown(wait=False)
+        logger.info("Async trading system closed")
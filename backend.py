@@ -1,152 +1,382 @@
-from binance import Client, BinanceSocketManager
 import pandas as pd
 import numpy as np
-import pywt
-import ta
 import time
 import logging
+import threading
 from typing import Dict, Optional, Tuple, List
+from candle_store import CandleStore
+from backfill import KlineBackfiller, INTERVAL_MS, KLINES_PAGE_LIMIT, KLINES_REQUEST_WEIGHT
+from kline_parser import klines_to_frame
+from candle_buffer import CandleRingBuffer, kline_message_columns
+from macd_search import batched_macd_fitness
+from wavelet import wavelet_denoise, CausalWaveletDenoiser
+from macd_evolution import MacdEvolutionOptimizer
+from scanner import MarketScanner
+from resample import MultiTimeframeAggregator, bucket_start, DEFAULT_TIMEFRAMES
+from result_cache import ResultCache, RESULT_CACHE
+from compact_frame import CompactFrameBuffer, COMPACT_COLUMNS, INDICATOR_COLUMNS, RECOMMENDATION_LABELS, recommendation_codes
+from indicator_kernel import indicator_kernel
+from streaming_indicators import StreamingIndicators
+from collections import OrderedDict
+from analysis_worker import AnalysisWorker, ResultSlot
+from order_book import LocalOrderBook
+from request_scheduler import (RequestScheduler, REQUEST_SCHEDULER, PRIORITY_REALTIME, PRIORITY_INTERACTIVE,
+                               PRIORITY_BULK, depth_request_weight)
+from metrics import REGISTRY, StageTimer, STAGE_SECONDS, RECOMMENDATION_SECONDS, observe_kline_latency
+from journal import DecisionJournal, open_journal
+from log_config import configure_logging
 
-# Konfigurasi logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("crypto_trading.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("CryptoTrader")
 
+# Nilai interval kline Binance (sama dengan Client.KLINE_INTERVAL_*; binance tidak di-import saat startup)
+INTERVAL_MAP = {
+    'M1': '1m',
+    'M3': '3m',
+    'M5': '5m',
+    'M15': '15m',
+    'M30': '30m',
+    'H1': '1h',
+    'H4': '4h',
+    'D1': '1d'
+}
+
+# Bobot GET /api/v3/ping
+PING_WEIGHT = 1
+
+# Jumlah hasil optimasi MACD yang diingat (LRU)
+MACD_CACHE_SIZE = 256
+# Stream real-time memilih ulang parameter MACD setiap sekian candle close (seperti walk-forward Backtester)
+STREAM_MACD_REFIT_BARS = 100
+
+# Snapshot REST untuk sinkronisasi order book lokal dan jeda sebelum mencoba lagi
+ORDER_BOOK_SNAPSHOT_LIMIT = 1000
+ORDER_BOOK_RETRY_SECONDS = 1.0
+# Order book membatalkan sinyal jika spread lebih lebar dari ini atau imbalance melawan arah sinyal
+ORDER_BOOK_MAX_SPREAD_BPS = 10.0
+ORDER_BOOK_MIN_IMBALANCE = 0.3
+
+class OfflineModeError(RuntimeError):
+    """Operasi membutuhkan koneksi exchange padahal sistem berjalan dalam mode offline"""
+
 class CryptoTradingSystem:
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: bool = False):
-        self.client = Client(api_key, api_secret, testnet=testnet)
-        self.socket_manager = BinanceSocketManager(self.client)
+    # Koneksi exchange dibuat saat pertama dipakai (lihat properti client/socket_manager)
+    _client = None
+    _socket_manager = None
+    _credentials: Tuple[Optional[str], Optional[str]] = (None, None)
+    _connect_lock = threading.Lock()
+    testnet = False
+    offline = False
+    
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: bool = False,
+                 store_dir: Optional[str] = None, causal_wavelet: bool = False, offline: bool = False,
+                 journal_dir: Optional[str] = None):
+        """Tanpa request jaringan: client REST dan socket manager dibuat saat pertama dibutuhkan
+        
+        offline=True menolak semua akses exchange; calculate_indicators tetap berjalan pada data
+        yang diberikan dan get_klines hanya membaca candle tersimpan (store_dir).
+        """
+        if not offline:
+            configure_logging()
+        self._credentials = (api_key, api_secret)
+        self.testnet = testnet
+        self.offline = offline
+        self._init_analysis_state(store_dir, causal_wavelet, journal_dir)
+        logger.info("Trading system initialized" + (" (offline)" if offline else ""))
+    
+    @classmethod
+    def with_client(cls, client, socket_manager, store_dir: Optional[str] = None,
+                    causal_wavelet: bool = False, journal_dir: Optional[str] = None) -> "CryptoTradingSystem":
+        """Sistem dengan client dan socket manager pengganti (mis. replay pasar lokal)"""
+        system = cls.__new__(cls)
+        system.client = client
+        system.socket_manager = socket_manager
+        system.testnet = bool(getattr(client, 'testnet', False))
+        system._init_analysis_state(store_dir, causal_wavelet, journal_dir)
+        return system
+    
+    def _require_online(self, what: str):
+        if self.offline:
+            raise OfflineModeError(f"{what} is not available in offline mode")
+    
+    @property
+    def client(self):
+        """Client REST Binance; dibuat (dan binance di-import) saat pertama dipakai"""
+        if self._client is None:
+            self._require_online("Exchange client")
+            with self._connect_lock:
+                if self._client is None:
+                    from binance import Client
+                    api_key, api_secret = self._credentials
+                    # ping=False: tidak ada round-trip jaringan saat client dibuat
+                    self._client = Client(api_key, api_secret, testnet=self.testnet, ping=False)
+                    logger.info("Exchange client connected")
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    @property
+    def socket_manager(self):
+        """Socket manager WebSocket; dibuat saat stream pertama dimulai"""
+        if self._socket_manager is None:
+            self._require_online("Exchange streams")
+            client = self.client
+            with self._connect_lock:
+                if self._socket_manager is None:
+                    from binance import BinanceSocketManager
+                    self._socket_manager = BinanceSocketManager(client)
+        return self._socket_manager
+    
+    @socket_manager.setter
+    def socket_manager(self, socket_manager):
+        self._socket_manager = socket_manager
+    
+    def ping(self) -> bool:
+        """Cek koneksi ke exchange (GET /api/v3/ping lewat penjadwal)"""
+        try:
+            self.request('ping', PING_WEIGHT)
+            return True
+        except Exception as e:
+            logger.error(f"Ping failed: {e}")
+            return False
+    
+    def _init_analysis_state(self, store_dir: Optional[str] = None, causal_wavelet: bool = False,
+                             journal_dir: Optional[str] = None):
+        """State analisis dan stream yang tidak bergantung pada jenis client (sync/async)"""
         self.active_sockets = {}
-        logger.info("Trading system initialized")
+        # Ring buffer candle dan hasil analisis terakhir per stream real-time
+        self.realtime_streams = {}
+        # Thread analisis stream real-time (dibuat saat stream pertama dimulai)
+        self.analysis_worker = None
+        # Memo parameter MACD per (simbol, interval, open time candle terakhir, panjang data)
+        self._macd_cache = OrderedDict()
+        # Penyimpanan candle lokal (opsional) agar get_klines hanya mengambil candle yang belum ada
+        self.candle_store = CandleStore(store_dir) if store_dir else None
+        # Denoising DIF kausal (jendela geser, tanpa repaint) dan hasil terakhirnya per (simbol, interval, fast, slow)
+        self.causal_denoiser = CausalWaveletDenoiser() if causal_wavelet else None
+        self._causal_dif = OrderedDict()
+        # Cache rekomendasi bersama antar instance (sesi) dalam proses; None mematikan cache
+        self.result_cache: Optional[ResultCache] = RESULT_CACHE
+        # Buffer frame indikator ringkas per (simbol, interval, kolom) yang dipakai ulang antar panggilan
+        self._compact_buffers = OrderedDict()
+        # Semua request REST lewat penjadwal bobot bersama (anggaran per IP)
+        self.request_scheduler: RequestScheduler = REQUEST_SCHEDULER
+        # Order book lokal per simbol dari stream diff-depth
+        self.order_books: Dict[str, LocalOrderBook] = {}
+        # Jurnal keputusan (opsional): setiap analysis bersimbol dicatat untuk query riwayat sinyal
+        self.journal: Optional[DecisionJournal] = open_journal(journal_dir) if journal_dir else None
     
-    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> pd.DataFrame:
+    def request(self, method: str, weight: int, priority: int = PRIORITY_INTERACTIVE, **params):
+        """Memanggil metode REST client lewat penjadwal (antre sesuai prioritas dan bobot; request identik digabung)"""
+        client = self.client
+        key = (type(client).__name__, bool(getattr(client, 'testnet', False)), method, tuple(sorted(params.items())))
+        return self.request_scheduler.call(
+            lambda: getattr(client, method)(**params), weight, priority, key,
+            response=lambda: getattr(client, 'response', None)
+        )
+    
+    def get_klines(self, symbol: str, interval: str, limit: int = 500,
+                   priority: int = PRIORITY_INTERACTIVE) -> pd.DataFrame:
         """Mendapatkan data klines dari Binance"""
-        interval_map = {
-            'M1': Client.KLINE_INTERVAL_1MINUTE,
-            'M3': Client.KLINE_INTERVAL_3MINUTE,
-            'M5': Client.KLINE_INTERVAL_5MINUTE,
-            'M15': Client.KLINE_INTERVAL_15MINUTE,
-            'M30': Client.KLINE_INTERVAL_30MINUTE,
-            'H1': Client.KLINE_INTERVAL_1HOUR,
-            'H4': Client.KLINE_INTERVAL_4HOUR,
-            'D1': Client.KLINE_INTERVAL_1DAY
-        }
-        binance_interval = interval_map.get(interval, interval)
+        binance_interval = INTERVAL_MAP.get(interval, interval)
         
         try:
-            klines = self.client.get_klines(
+            if self.offline:
+                return self._get_klines_offline(symbol, binance_interval, limit)
+            
+            if self.candle_store is not None:
+                return self._get_klines_stored(symbol, binance_interval, limit, priority)
+            
+            # Melebihi batas satu request: ambil lewat backfill berhalaman
+            if limit > KLINES_PAGE_LIMIT:
+                end_ms = int(time.time() * 1000)
+                start_ms = end_ms - limit * INTERVAL_MS[binance_interval]
+                return self._backfill(symbol, binance_interval, start_ms, end_ms,
+                                      priority=priority).tail(limit).reset_index(drop=True)
+            
+            klines = self.request(
+                'get_klines', KLINES_REQUEST_WEIGHT, priority,
                 symbol=symbol,
                 interval=binance_interval,
                 limit=limit
             )
+            return klines_to_frame(klines)
+        except Exception as e:
+            logger.error(f"Error fetching klines: {e}")
+            return pd.DataFrame()
+    
+    def _get_klines_offline(self, symbol: str, binance_interval: str, limit: int) -> pd.DataFrame:
+        """Mode offline: hanya candle yang sudah tersimpan, tanpa request"""
+        if self.candle_store is None:
+            logger.warning(f"Offline mode without candle store: no klines for {symbol} {binance_interval}")
+            return pd.DataFrame()
+        return self.candle_store.read_frame(symbol, binance_interval, limit)
+    
+    def _get_klines_stored(self, symbol: str, binance_interval: str, limit: int,
+                           priority: int = PRIORITY_INTERACTIVE) -> pd.DataFrame:
+        """Mengambil klines lewat penyimpanan lokal, hanya mengunduh candle yang belum tersimpan"""
+        store = self.candle_store
+        
+        # Isi ekor: mulai dari candle terakhir yang tersimpan (bisa jadi belum close saat disimpan)
+        cursor = store.last_open_time(symbol, binance_interval)
+        if cursor is None:
+            klines = self.request('get_klines', KLINES_REQUEST_WEIGHT, priority,
+                                  symbol=symbol, interval=binance_interval, limit=limit)
+            store.write_frame(symbol, binance_interval, klines_to_frame(klines))
+        else:
+            while True:
+                klines = self.request(
+                    'get_klines', KLINES_REQUEST_WEIGHT, priority,
+                    symbol=symbol,
+                    interval=binance_interval,
+                    startTime=cursor,
+                    limit=KLINES_PAGE_LIMIT
+                )
+                store.write_frame(symbol, binance_interval, klines_to_frame(klines))
+                if len(klines) < KLINES_PAGE_LIMIT:
+                    break
+                cursor = klines[-1][0] + 1
+        
+        # Isi kepala: jika riwayat tersimpan masih lebih pendek dari limit
+        missing = limit - store.length(symbol, binance_interval)
+        first_open = store.first_open_time(symbol, binance_interval)
+        if missing > 0 and first_open is not None:
+            start_ms = first_open - missing * INTERVAL_MS[binance_interval]
+            head = self._backfill(symbol, binance_interval, start_ms, first_open - 1, priority=priority)
+            store.write_frame(symbol, binance_interval, head)
+        
+        return store.read_frame(symbol, binance_interval, limit)
+    
+    def _backfill(self, symbol: str, binance_interval: str, start_ms: int, end_ms: int,
+                  max_workers: int = 4, priority: int = PRIORITY_BULK, checkpoint: bool = False) -> pd.DataFrame:
+        """Backfill paralel lewat scheduler; checkpoint hanya untuk backfill massal yang bisa dilanjutkan"""
+        backfiller = KlineBackfiller(
+            self.client, klines_to_frame, max_workers=max_workers,
+            checkpoint_dir="backfill_checkpoints" if checkpoint else None,
+            request=lambda **params: self.request('get_klines', KLINES_REQUEST_WEIGHT, priority, **params)
+        )
+        return backfiller.run(symbol, binance_interval, start_ms, end_ms)
+    
+    @staticmethod
+    def _to_ms(value) -> int:
+        """Konversi waktu (ms, string, atau datetime; naive dianggap UTC) ke milidetik"""
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        return int(pd.Timestamp(value).timestamp() * 1000)
+    
+    def get_historical_klines(self, symbol: str, interval: str, start_time, end_time=None,
+                              max_workers: int = 4) -> pd.DataFrame:
+        """Backfill klines historis untuk rentang waktu panjang (melewati batas 1000 candle per request)"""
+        binance_interval = INTERVAL_MAP.get(interval, interval)
+        
+        try:
+            start_ms = self._to_ms(start_time)
+            end_ms = self._to_ms(end_time) if end_time is not None else int(time.time() * 1000)
+            
+            df = self._backfill(symbol, binance_interval, start_ms, end_ms, max_workers, checkpoint=True)
             
-            data = []
-            for k in klines:
-                data.append({
-                    'timestamp': pd.to_datetime(k[0], unit='ms'),
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5])
-                })
+            # Simpan ke penyimpanan lokal; CandleStore menolak rentang yang tidak bersambung dengan seri
+            if self.candle_store is not None and not df.empty:
+                self.candle_store.write_frame(symbol, binance_interval, df)
             
-            return pd.DataFrame(data)
+            return df
         except Exception as e:
-            logger.error(f"Error fetching klines: {e}")
+            logger.error(f"Error backfilling klines: {e}")
             return pd.DataFrame()
     
-    def calculate_indicators(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
-        """Menghitung semua indikator teknis dan rekomendasi trading"""
+    def calculate_indicators(self, df: pd.DataFrame, symbol: str = "", interval: str = "",
+                             compact: bool = False, columns: Optional[List[str]] = None,
+                             reuse_buffer: bool = False) -> Tuple[pd.DataFrame, Dict]:
+        """Menghitung semua indikator teknis dan rekomendasi trading
+        
+        Mode `compact` tidak mengubah df masukan: hasilnya frame baru berisi timestamp dan `columns`
+        (default COMPACT_COLUMNS) sebagai float32 dan RECOMMENDATION kategorikal (kode int8), dengan
+        blok float32 milik frame itu sendiri.
+        
+        `reuse_buffer=True` (perlu `symbol`) memakai ulang blok per (simbol, interval, columns) agar
+        panggilan berulang tidak realokasi. Frame hasilnya adalah view ke blok tersebut dan ikut
+        berubah pada panggilan berikutnya untuk kunci yang sama; salin (df.copy()) bila perlu disimpan.
+        """
         if df.empty or len(df) < 100:
             logger.warning("Insufficient data for indicator calculation")
             return df, {}
         
         try:
-            # 1. Trend Detection (EMA)
-            df['EMA_FAST'] = ta.trend.ema_indicator(df['close'], window=9)
-            df['EMA_SLOW'] = ta.trend.ema_indicator(df['close'], window=21)
-            trend_up = df['EMA_FAST'] > df['EMA_SLOW']
-            trend_down = df['EMA_FAST'] < df['EMA_SLOW']
-            
-            # 2. Momentum (RSI)
-            rsi = ta.momentum.rsi(df['close'], window=7)
-            momentum_buy = (rsi < 40) & (rsi.diff() > 0)
-            momentum_sell = (rsi > 60) & (rsi.diff() < 0)
-            
-            # 3. Trend Strength (ADX)
-            adx = ta.trend.adx(df['high'], df['low'], df['close'], window=14)
-            trend_strong = adx > 20
-            
-            # 4. Volatility (ATR)
-            atr = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=14)
-            valid_volatility = (df['high'] - df['low']) > (0.8 * atr)
+            stages = StageTimer(STAGE_SECONDS)
             
-            # 5. Volume Spike
-            vol_sma = ta.volume.sma_indicator(df['volume'], window=20)
-            volume_spike = df['volume'] > (1.5 * vol_sma)
+            # 1-9. Semua indikator dan kondisi dalam satu kernel NumPy (TR/DM dibagi ATR dan ADX)
+            cache_key = (symbol, interval, df['timestamp'].iloc[-1], len(df)) if symbol else None
+            with stages.time('macd_search'):
+                macd_params = self.optimize_macd_params(df['close'].values, cache_key)
+            p_fast, p_slow, p_signal = macd_params
             
-            # 6. Candlestick Confirmation
-            bull_candle = (df['close'] > df['open']) & (
-                (df['close'] - df['open']) > (df['close'].shift(1) - df['open'].shift(1)))
-            bear_candle = (df['close'] < df['open']) & (
-                (df['open'] - df['close']) > (df['open'].shift(1) - df['close'].shift(1)))
+            # Wavelet denoising hanya pada bagian DIF yang valid (NaN awal akan merusak dekomposisi)
+            def denoise(dif_values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+                with stages.time('wavelet_denoise'):
+                    if self.causal_denoiser is not None:
+                        dif_key = (symbol, interval, p_fast, p_slow) if symbol else None
+                        return self._causal_wavelet_denoise(dif_values, df['timestamp'].values[valid], dif_key)
+                    return self.wavelet_denoise(dif_values)
             
-            # 7. Wavelet-MACD (Pro 2025)
-            p_fast, p_slow, p_signal = self.optimize_macd_params(df['close'].values)
-            
-            # Hitung EMA untuk MACD
-            ema_fast_macd = ta.trend.ema_indicator(df['close'], window=p_fast)
-            ema_slow_macd = ta.trend.ema_indicator(df['close'], window=p_slow)
-            dif_raw = ema_fast_macd - ema_slow_macd
-            
-            # Terapkan wavelet denoising
-            dif_deno = self.wavelet_denoise(dif_raw.values)
-            dea = ta.trend.ema_indicator(pd.Series(dif_deno), window=p_signal)
-            
-            macd_buy = (pd.Series(dif_deno).shift(1) < dea.shift(1)) & (pd.Series(dif_deno) > dea)
-            macd_sell = (pd.Series(dif_deno).shift(1) > dea.shift(1)) & (pd.Series(dif_deno) < dea)
-            
-            # 8. Dynamic Grid Trading (DGT)
-            window = min(60, len(df))
-            highest_high = df['high'].rolling(window=window).max()
-            lowest_low = df['low'].rolling(window=window).min()
-            center = (highest_high + lowest_low) / 2
-            spacing = atr
-            grid_low = center - spacing
-            grid_up = center + spacing
-            
-            grid_buy = df['close'] <= grid_low
-            grid_sell = df['close'] >= grid_up
-            
-            # 9. Trading Recommendation
-            buy_conditions = (
-                trend_up & 
-                momentum_buy & 
-                trend_strong & 
-                valid_volatility & 
-                volume_spike & 
-                bull_candle & 
-                (macd_buy | grid_buy)
+            values, signals = indicator_kernel(
+                *(df[c].to_numpy(dtype=np.float64) for c in ['open', 'high', 'low', 'close', 'volume']),
+                macd_params, denoise
             )
+            stages.lap('indicators')
+            return self._finish_analysis(df, symbol, interval, values, signals, stages, compact, columns,
+                                         reuse_buffer)
+        except Exception as e:
+            logger.exception(f"Error in indicator calculation: {e}")
+            return df, {}
+    
+    def calculate_stream_indicators(self, stream: Dict, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+        """Seperti calculate_indicators untuk candle close ring buffer stream, tetapi inkremental
+        
+        Mesin StreamingIndicators di stream['indicators'] hanya memproses candle baru (O(1) per
+        candle). Parameter MACD dipilih ulang setiap STREAM_MACD_REFIT_BARS candle; mesin dibangun
+        ulang dari df jika parameternya berubah atau riwayatnya tidak lagi menyambung.
+        """
+        if df.empty or len(df) < 100:
+            logger.warning("Insufficient data for indicator calculation")
+            return df, {}
+        
+        symbol, interval = stream['symbol'], stream['interval']
+        try:
+            stages = StageTimer(STAGE_SECONDS)
             
-            # PERBAIKAN DI SINI: Tanda kurung tidak seimbang
-            sell_conditions = (
-                trend_down & 
-                momentum_sell & 
-                trend_strong & 
-                valid_volatility & 
-                volume_spike & 
-                bear_candle & 
-                (macd_sell | grid_sell)  # Diperbaiki
-            )
+            engine = stream.get('indicators')
+            if engine is None or engine.count - engine.fitted_at >= STREAM_MACD_REFIT_BARS:
+                cache_key = (symbol, interval, df['timestamp'].iloc[-1], len(df))
+                with stages.time('macd_search'):
+                    macd_params = self.optimize_macd_params(df['close'].values, cache_key)
+                if engine is not None and engine.macd_params == tuple(macd_params):
+                    engine.fitted_at = engine.count
+                else:
+                    engine = None
             
+            if engine is None or not engine.extend(df):
+                macd_params = macd_params if engine is None else engine.macd_params
+                engine = StreamingIndicators(stream['buffer'].capacity, macd_params, self.causal_denoiser)
+                engine.extend(df)
+                engine.fitted_at = engine.count
+            stream['indicators'] = engine
+            values, signals = engine.values(len(df)), engine.signals(len(df))
+            stages.lap('indicators')
+            return self._finish_analysis(df, symbol, interval, values, signals, stages)
+        except Exception as e:
+            logger.exception(f"Error in stream indicator calculation: {e}")
+            return df, {}
+    
+    def _finish_analysis(self, df: pd.DataFrame, symbol: str, interval: str, values: Dict[str, np.ndarray],
+                         signals: Dict[str, np.ndarray], stages: StageTimer, compact: bool = False,
+                         columns: Optional[List[str]] = None, reuse_buffer: bool = False) -> Tuple[pd.DataFrame, Dict]:
+        """Rekomendasi, konfirmasi order book, risk management, dan ringkasan dari nilai indikator"""
+        buy_conditions, sell_conditions = signals['buy'], signals['sell']
+        if compact:
+            codes = recommendation_codes(buy_conditions, sell_conditions)
+            last_recommendation = RECOMMENDATION_LABELS[codes[-1]]
+        else:
             recommendation = np.where(
                 buy_conditions, 
                 "BUY SEKARANG", 
@@ -156,86 +386,112 @@ class CryptoTradingSystem:
                     "TUNGGU / NO TRADE"
                 )
             )
-            
-            # 10. Risk Management
-            atr_current = atr.iloc[-1] if len(atr) > 0 else 0
-            last_close = df['close'].iloc[-1] if len(df) > 0 else 0
-            
-            stop_loss_buy = last_close - (0.5 * atr_current)
-            take_profit_buy = last_close + (1.5 * atr_current)
-            
-            stop_loss_sell = last_close + (0.5 * atr_current)
-            take_profit_sell = last_close - (1.5 * atr_current)
-            
+            last_recommendation = recommendation[-1] if len(recommendation) > 0 else "TUNGGU / NO TRADE"
+        
+        # Order book lokal (jika aktif) mengonfirmasi sinyal bar terakhir
+        book = self._order_book_features(symbol)
+        if book and last_recommendation != "TUNGGU / NO TRADE" and not book['book_' + last_recommendation.split()[0].lower()]:
+            last_recommendation = "TUNGGU / NO TRADE"
+            if compact:
+                codes[-1] = 0
+            else:
+                recommendation[-1] = last_recommendation
+        stages.lap('recommendation')
+        
+        # 10. Risk Management
+        atr_current = values['ATR'][-1]
+        last_close = df['close'].iloc[-1] if len(df) > 0 else 0
+        
+        stop_loss_buy = last_close - (0.5 * atr_current)
+        take_profit_buy = last_close + (1.5 * atr_current)
+        
+        stop_loss_sell = last_close + (0.5 * atr_current)
+        take_profit_sell = last_close - (1.5 * atr_current)
+        stages.lap('risk')
+        
+        if compact:
+            values.update({name: df[name] for name in ['open', 'high', 'low', 'close', 'volume']})
+            buffer = self._compact_buffer(symbol, interval, columns) if reuse_buffer else CompactFrameBuffer(columns)
+            df = buffer.frame(df['timestamp'].to_numpy(), values, codes)
+        else:
             # Add indicators to DataFrame
-            df['RSI'] = rsi
-            df['ADX'] = adx
-            df['ATR'] = atr
-            df['VOL_SMA'] = vol_sma
-            df['DIF'] = dif_deno
-            df['DEA'] = dea
-            df['MACD'] = pd.Series(dif_deno) - dea
-            df['CENTER'] = center
-            df['GRID_LOW'] = grid_low
-            df['GRID_UP'] = grid_up
+            for name in INDICATOR_COLUMNS:
+                df[name] = values[name]
             df['RECOMMENDATION'] = recommendation
-            
-            # Analysis summary
-            analysis = {
-                'symbol': symbol,
-                'last_close': last_close,
-                'atr': atr_current,
-                'trend_up': bool(trend_up.iloc[-1]),
-                'trend_down': bool(trend_down.iloc[-1]),
-                'momentum_buy': bool(momentum_buy.iloc[-1]),
-                'momentum_sell': bool(momentum_sell.iloc[-1]),
-                'trend_strong': bool(trend_strong.iloc[-1]),
-                'valid_volatility': bool(valid_volatility.iloc[-1]),
-                'volume_spike': bool(volume_spike.iloc[-1]),
-                'bull_candle': bool(bull_candle.iloc[-1]),
-                'bear_candle': bool(bear_candle.iloc[-1]),
-                'macd_buy': bool(macd_buy.iloc[-1]),
-                'macd_sell': bool(macd_sell.iloc[-1]),
-                'grid_buy': bool(grid_buy.iloc[-1]),
-                'grid_sell': bool(grid_sell.iloc[-1]),
-                'recommendation': recommendation[-1] if len(recommendation) > 0 else "TUNGGU / NO TRADE",
-                'stop_loss_buy': stop_loss_buy,
-                'take_profit_buy': take_profit_buy,
-                'stop_loss_sell': stop_loss_sell,
-                'take_profit_sell': take_profit_sell
-            }
-            
-            logger.info(f"Analysis completed: {analysis['recommendation']}")
-            return df, analysis
-        except Exception as e:
-            logger.exception(f"Error in indicator calculation: {e}")
-            return df, {}
+        
+        # Analysis summary
+        analysis = {
+            'symbol': symbol,
+            'last_close': last_close,
+            'atr': atr_current,
+            'trend_up': bool(signals['trend_up'][-1]),
+            'trend_down': bool(signals['trend_down'][-1]),
+            'momentum_buy': bool(signals['momentum_buy'][-1]),
+            'momentum_sell': bool(signals['momentum_sell'][-1]),
+            'trend_strong': bool(signals['trend_strong'][-1]),
+            'valid_volatility': bool(signals['valid_volatility'][-1]),
+            'volume_spike': bool(signals['volume_spike'][-1]),
+            'bull_candle': bool(signals['bull_candle'][-1]),
+            'bear_candle': bool(signals['bear_candle'][-1]),
+            'macd_buy': bool(signals['macd_buy'][-1]),
+            'macd_sell': bool(signals['macd_sell'][-1]),
+            'grid_buy': bool(signals['grid_buy'][-1]),
+            'grid_sell': bool(signals['grid_sell'][-1]),
+            'recommendation': last_recommendation,
+            'stop_loss_buy': stop_loss_buy,
+            'take_profit_buy': take_profit_buy,
+            'stop_loss_sell': stop_loss_sell,
+            'take_profit_sell': take_profit_sell
+        }
+        analysis.update(book)
+        
+        stages.lap('output')
+        
+        if self.journal is not None and symbol:
+            self.journal.record(analysis, interval, df['timestamp'].iloc[-1])
+        
+        logger.info(f"Analysis completed: {analysis['recommendation']}")
+        return df, analysis
+    
+    def _compact_buffer(self, symbol: str, interval: str, columns: Optional[List[str]]) -> CompactFrameBuffer:
+        """Buffer frame ringkas untuk pemanggil ini; tanpa simbol selalu buffer baru"""
+        columns = tuple(columns or COMPACT_COLUMNS)
+        if not symbol:
+            return CompactFrameBuffer(columns)
+        key = (symbol, interval, columns)
+        buffer = self._compact_buffers.get(key)
+        if buffer is None:
+            buffer = self._compact_buffers[key] = CompactFrameBuffer(columns)
+        self._compact_buffers.move_to_end(key)
+        if len(self._compact_buffers) > MACD_CACHE_SIZE:
+            self._compact_buffers.popitem(last=False)
+        return buffer
     
     def wavelet_denoise(self, signal: np.ndarray, wavelet: str = 'db4', level: int = 3) -> np.ndarray:
         """Wavelet denoising menggunakan Daubechies-4 wavelet"""
-        if len(signal) < 10:
-            return signal
-            
-        try:
-            # Dekomposisi sinyal
-            coeffs = pywt.wavedec(signal, wavelet, level=level)
-            
-            # Hitung threshold (universal threshold)
-            sigma = np.median(np.abs(coeffs[-level])) / 0.6745
-            threshold = sigma * np.sqrt(2 * np.log(len(signal)))
-            
-            # Terapkan soft thresholding ke detail coefficients
-            coeffs[1:] = [pywt.threshold(c, threshold, 'soft') for c in coeffs[1:]]
-            
-            # Rekonstruksi sinyal
-            denoised = pywt.waverec(coeffs, wavelet)
-            return denoised[:len(signal)]
-        except Exception as e:
-            logger.error(f"Wavelet denoising failed: {e}")
-            return signal
+        return wavelet_denoise(signal, wavelet, level)
     
-    def optimize_macd_params(self, close: np.ndarray) -> Tuple[int, int, int]:
-        """Optimasi parameter MACD dengan genetic algorithm (simplified)"""
+    def _causal_wavelet_denoise(self, dif: np.ndarray, timestamps: np.ndarray, cache_key: Optional[Tuple]) -> np.ndarray:
+        """Denoising kausal DIF; candle yang sudah dihitung pada panggilan sebelumnya dipakai ulang"""
+        start, previous = 0, None
+        if cache_key is not None and cache_key in self._causal_dif:
+            self._causal_dif.move_to_end(cache_key)
+            prev_timestamps, prev_values = self._causal_dif[cache_key]
+            # Candle terakhir sebelumnya mungkin masih terbentuk, jadi tidak ikut dipakai ulang
+            offset = int(np.searchsorted(prev_timestamps, timestamps[0]))
+            reusable = prev_timestamps[offset:-1]
+            if len(reusable) <= len(timestamps) and np.array_equal(timestamps[:len(reusable)], reusable):
+                start, previous = len(reusable), prev_values[offset:-1]
+        
+        denoised = self.causal_denoiser.denoise(dif, start, previous)
+        if cache_key is not None:
+            self._causal_dif[cache_key] = (timestamps, denoised)
+            if len(self._causal_dif) > MACD_CACHE_SIZE:
+                self._causal_dif.popitem(last=False)
+        return denoised
+    
+    def optimize_macd_params(self, close: np.ndarray, cache_key: Optional[Tuple] = None) -> Tuple[int, int, int]:
+        """Optimasi parameter MACD dengan pencarian grid batch (EMA dibagi antar kombinasi)"""
         # Parameter default jika optimasi gagal
         default_params = (12, 26, 9)
         
@@ -243,43 +499,28 @@ class CryptoTradingSystem:
             logger.warning("Insufficient data for MACD optimization")
             return default_params
         
+        # Data yang sama (simbol, interval, candle terakhir) tidak perlu dioptimasi ulang
+        if cache_key is not None and cache_key in self._macd_cache:
+            self._macd_cache.move_to_end(cache_key)
+            return self._macd_cache[cache_key]
+        
         try:
-            best_fitness = -np.inf
-            best_params = default_params
-            
             # Ruang parameter yang disederhanakan
             fast_periods = [8, 9, 10, 11, 12]
             slow_periods = [22, 24, 26, 28]
             signal_periods = [7, 8, 9, 10]
             
-            for fast in fast_periods:
-                for slow in slow_periods:
-                    if slow <= fast:
-                        continue
-                    for signal in signal_periods:
-                        try:
-                            ema_fast = ta.trend.ema_indicator(pd.Series(close), window=fast)
-                            ema_slow = ta.trend.ema_indicator(pd.Series(close), window=slow)
-                            dif = ema_fast - ema_slow
-                            # Hapus nilai NaN
-                            valid = dif.notna()
-                            dif = dif[valid]
-                            if len(dif) == 0:
-                                continue
-                            dea = ta.trend.ema_indicator(dif, window=signal)
-                            macd = dif - dea
-                            
-                            # Fungsi fitness: signal-to-noise ratio
-                            std = np.std(macd)
-                            if std == 0:
-                                continue
-                            fitness = np.mean(np.abs(macd)) / std
-                            
-                            if fitness > best_fitness:
-                                best_fitness = fitness
-                                best_params = (fast, slow, signal)
-                        except:
-                            continue
+            params, fitness = batched_macd_fitness(close, fast_periods, slow_periods, signal_periods)
+            best_params = default_params
+            best_fitness = -np.inf
+            if len(fitness) > 0 and np.isfinite(fitness.max()):
+                best = int(np.argmax(fitness))
+                best_params, best_fitness = params[best], fitness[best]
+            
+            if cache_key is not None:
+                self._macd_cache[cache_key] = best_params
+                if len(self._macd_cache) > MACD_CACHE_SIZE:
+                    self._macd_cache.popitem(last=False)
             
             logger.info(f"Optimized MACD params: {best_params} (fitness: {best_fitness:.2f})")
             return best_params
@@ -287,28 +528,142 @@ class CryptoTradingSystem:
             logger.error(f"MACD optimization failed: {e}")
             return default_params
     
-    def get_trading_recommendation(self, symbol: str, interval: str, limit: int = 500) -> Dict:
-        """Mendapatkan rekomendasi trading dengan manajemen risiko"""
+    def evolve_macd_params(self, close: np.ndarray, **kwargs) -> Dict:
+        """Optimasi Wavelet-MACD (periode, wavelet, level, mode threshold) dengan genetic algorithm paralel"""
+        if len(close) < 100:
+            logger.warning("Insufficient data for MACD optimization")
+            return {}
+        
+        try:
+            return MacdEvolutionOptimizer(**kwargs).optimize(close)
+        except Exception as e:
+            logger.error(f"MACD evolution failed: {e}")
+            return {}
+    
+    def _order_book_features(self, symbol: str) -> Dict:
+        """Fitur order book lokal yang sinkron untuk simbol (spread, imbalance, konfirmasi beli/jual); {} jika tidak ada"""
+        book = self.order_books.get(symbol.upper()) if symbol else None
+        features = book.features() if book is not None else {}
+        if not features:
+            return {}
+        spread_ok = features['spread_bps'] <= ORDER_BOOK_MAX_SPREAD_BPS
+        return {
+            'book_spread_bps': features['spread_bps'],
+            'book_imbalance': features['imbalance'],
+            'book_buy': spread_ok and features['imbalance'] > -ORDER_BOOK_MIN_IMBALANCE,
+            'book_sell': spread_ok and features['imbalance'] < ORDER_BOOK_MIN_IMBALANCE
+        }
+    
+    def analysis_signature(self) -> Tuple:
+        """Semua pengaturan yang memengaruhi hasil analisis selain data (bagian dari key cache)"""
+        denoiser = self.causal_denoiser
+        causal = (denoiser.window, denoiser.wavelet, denoiser.level, denoiser.mode) if denoiser is not None else None
+        return bool(self.testnet), self.offline, causal
+    
+    def get_trading_recommendation(self, symbol: str, interval: str, limit: int = 500) -> Tuple[pd.DataFrame, Dict]:
+        """Mendapatkan rekomendasi trading dengan manajemen risiko
+        
+        Selalu dihitung dari candle close saja: dari `limit` candle terakhir, candle yang masih
+        terbentuk dibuang, jadi last_close, SL/TP, dan rekomendasi milik candle close terakhir
+        (sama untuk hasil cache, tanpa cache, maupun dengan order book).
+        """
         try:
-            df = self.get_klines(symbol, interval, limit)
+            with RECOMMENDATION_SECONDS.time('total'):
+                binance_interval = INTERVAL_MAP.get(interval, interval)
+                step = INTERVAL_MS.get(binance_interval)
+                candle_open = int(bucket_start(np.int64(time.time() * 1000), binance_interval)) if step else None
+                compute = lambda: self._compute_recommendation(symbol, binance_interval, limit, candle_open)
+                # Order book berubah di antara close candle: hasil yang memakainya tidak di-cache
+                if self.result_cache is None or step is None or symbol.upper() in self.order_books:
+                    return compute()
+                
+                # Hasil sama sampai candle berikutnya close: key memuat open time candle close terakhir
+                key = (symbol.upper(), binance_interval, limit, self.analysis_signature(), candle_open - step)
+                return self.result_cache.get_or_compute(
+                    key, (candle_open + step) / 1000, compute,
+                    # Hasil gagal, atau REST belum memuat candle yang baru close, tidak disimpan
+                    lambda result: 'recommendation' in result[1] and
+                                   self._to_ms(result[0]['timestamp'].iloc[-1]) == candle_open - step
+                )
+        except Exception as e:
+            logger.exception(f"Error in trading recommendation: {e}")
+            return pd.DataFrame(), {"error": str(e)}
+    
+    def _compute_recommendation(self, symbol: str, interval: str, limit: int,
+                                closed_before: Optional[int] = None) -> Tuple[pd.DataFrame, Dict]:
+        """closed_before (open time ms candle terbentuk): baris mulai waktu itu dibuang sebelum analisis"""
+        try:
+            with RECOMMENDATION_SECONDS.time('fetch'):
+                df = self.get_klines(symbol, interval, limit)
+                if closed_before is not None and not df.empty:
+                    df = df[df['timestamp'] < pd.to_datetime(closed_before, unit='ms')].reset_index(drop=True)
             if df.empty:
-                return {"error": "No data available"}
+                return df, {"error": "No data available"}
             
-            df, analysis = self.calculate_indicators(df)
-            return analysis
+            with RECOMMENDATION_SECONDS.time('indicators'):
+                return self.calculate_indicators(df, symbol, interval)
         except Exception as e:
             logger.exception(f"Error in trading recommendation: {e}")
-            return {"error": str(e)}
+            return pd.DataFrame(), {"error": str(e)}
+    
+    def get_multi_timeframe_klines(self, symbol: str, timeframes: List[str], limit: int = 500) -> Dict[str, pd.DataFrame]:
+        """Klines beberapa timeframe: riwayat candle close native, candle terbentuk dibangun dari M1
+        
+        Candle M1 hanya diambil sejak awal candle terbentuk paling awal (paling banyak satu
+        candle timeframe terbesar), bukan seluruh riwayat yang di-resample.
+        """
+        try:
+            binance_timeframes = [INTERVAL_MAP.get(tf, tf) for tf in timeframes]
+            aggregator, first_forming = self._seed_timeframes(symbol, binance_timeframes, limit)
+            if first_forming is None:
+                return {}
+            # Candle terbentuk berumur kurang dari satu candle timeframe terbesar
+            minutes = max(INTERVAL_MS[tf] for tf in binance_timeframes) // INTERVAL_MS['1m']
+            base = self.get_klines(symbol, 'M1', minutes)
+            # Termasuk candle M1 yang masih terbentuk: tidak ada websocket yang meneruskan aggregator ini
+            aggregator.update_frame(base[base['timestamp'] >= first_forming] if not base.empty else base)
+            frames = {tf: aggregator.frame(binance_tf).tail(limit).reset_index(drop=True)
+                      for tf, binance_tf in zip(timeframes, binance_timeframes)}
+            return {tf: df for tf, df in frames.items() if not df.empty}
+        except Exception as e:
+            logger.error(f"Error building multi-timeframe klines: {e}")
+            return {}
     
-    def start_realtime_analysis(self, symbol: str, interval: str, callback):
+    def _seed_timeframes(self, symbol: str, binance_timeframes: List[str],
+                         limit: int) -> Tuple[MultiTimeframeAggregator, Optional[pd.Timestamp]]:
+        """Aggregator berisi riwayat candle close setiap timeframe (klines native) dan open time candle terbentuk paling awal"""
+        aggregator = MultiTimeframeAggregator(binance_timeframes, limit)
+        forming = []
+        for tf in binance_timeframes:
+            history = self.get_klines(symbol, tf, limit + 1)
+            if not history.empty:
+                aggregator.seed(tf, history.iloc[:-1])
+                forming.append(history['timestamp'].iloc[-1])
+        return aggregator, min(forming) if forming else None
+    
+    def analyze_multi_timeframe(self, symbol: str, timeframes: List[str], limit: int = 200) -> Dict[str, Dict]:
+        """Analisis setiap timeframe (mis. konfirmasi timeframe lebih tinggi) dari satu feed M1"""
+        frames = self.get_multi_timeframe_klines(symbol, timeframes, limit)
+        return {tf: self.calculate_indicators(df, symbol, INTERVAL_MAP.get(tf, tf))[1] for tf, df in frames.items()}
+    
+    def scan_market(self, interval: str, limit: int = 200, symbols: Optional[List[str]] = None,
+                    only_signals: bool = False, compact: bool = False,
+                    columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Scan banyak simbol (default semua pasangan USDT) dan urutkan berdasarkan sinyal trading
+        
+        Mode `compact` mengembalikan tabel baru (bukan view) dengan kolom float32, score int8, serta
+        recommendation/side kategorikal (kode int8, lihat RECOMMENDATION_LABELS dan SIDE_LABELS);
+        `columns` memproyeksikan tabel, symbol selalu disertakan.
+        """
+        try:
+            return MarketScanner(self).scan(interval, limit, symbols, only_signals, compact, columns)
+        except Exception as e:
+            logger.exception(f"Error in market scan: {e}")
+            return pd.DataFrame()
+    
+    def start_realtime_analysis(self, symbol: str, interval: str, callback, limit: int = 500):
         """Memulai analisis real-time dengan websocket"""
-        interval_map = {
-            'M1': Client.KLINE_INTERVAL_1MINUTE,
-            'M3': Client.KLINE_INTERVAL_3MINUTE,
-            'M5': Client.KLINE_INTERVAL_5MINUTE,
-            'M15': Client.KLINE_INTERVAL_15MINUTE
-        }
-        binance_interval = interval_map.get(interval, interval)
+        binance_interval = INTERVAL_MAP.get(interval, interval)
         socket_name = f"{symbol.lower()}_{binance_interval}"
         
         # Hentikan socket yang ada jika ada
@@ -317,25 +672,219 @@ class CryptoTradingSystem:
         
         # Mulai socket baru
         try:
+            # Isi ring buffer sekali dari REST, selanjutnya hanya dari pesan websocket
+            buffer = CandleRingBuffer(limit)
+            buffer.extend_frame(self.get_klines(symbol, interval, limit))
+            self.realtime_streams[socket_name] = {
+                'symbol': symbol,
+                'interval': binance_interval,
+                'buffer': buffer,
+                'lock': threading.Lock(),
+                'slot': ResultSlot(),
+                'callback': callback
+            }
+            
             logger.info(f"Starting real-time socket for {symbol} @ {binance_interval}")
             kline_socket = self.socket_manager.kline_socket(
                 symbol=symbol, 
                 interval=binance_interval
             )
             kline_socket.start()
-            kline_socket.add_listener(callback)
+            kline_socket.add_listener(lambda msg: self._on_kline_message(socket_name, msg, callback))
             self.active_sockets[socket_name] = kline_socket
             return socket_name
         except Exception as e:
             logger.error(f"Failed to start real-time socket: {e}")
             return None
     
+    def start_multi_timeframe_analysis(self, symbol: str, callback, timeframes: Optional[List[str]] = None,
+                                       limit: int = 500):
+        """Analisis real-time semua timeframe dari satu subscription kline M1 per simbol"""
+        binance_timeframes = [INTERVAL_MAP.get(tf, tf) for tf in (timeframes or DEFAULT_TIMEFRAMES)]
+        socket_name = f"{symbol.lower()}_mtf"
+        
+        if socket_name in self.active_sockets:
+            self.stop_realtime_analysis(socket_name)
+        
+        try:
+            # Riwayat candle yang sudah close diambil sekali per timeframe; candle yang sedang
+            # terbentuk dibangun ulang dari M1 sejak awal candle terbentuk yang paling awal
+            aggregator, first_forming = self._seed_timeframes(symbol, binance_timeframes, limit)
+            
+            buffer = CandleRingBuffer(limit)
+            base = self.get_klines(symbol, 'M1', limit)
+            if first_forming is not None:
+                if base.empty or base['timestamp'].iloc[0] > first_forming:
+                    end_ms = int(time.time() * 1000)
+                    base = self._backfill(symbol, INTERVAL_MAP['M1'], self._to_ms(first_forming), end_ms,
+                                          priority=PRIORITY_INTERACTIVE)
+                # Candle M1 terakhir masih terbentuk; versi close-nya datang dari websocket
+                aggregator.update_frame(base[base['timestamp'] >= first_forming].iloc[:-1])
+            buffer.extend_frame(base)
+            self.realtime_streams[socket_name] = {
+                'symbol': symbol,
+                'interval': INTERVAL_MAP['M1'],
+                'buffer': buffer,
+                'aggregator': aggregator,
+                'timeframes': {},
+                'lock': threading.Lock(),
+                'slot': ResultSlot(),
+                'callback': callback
+            }
+            
+            logger.info(f"Starting multi-timeframe socket for {symbol} @ {binance_timeframes}")
+            kline_socket = self.socket_manager.kline_socket(
+                symbol=symbol,
+                interval=INTERVAL_MAP['M1']
+            )
+            kline_socket.start()
+            kline_socket.add_listener(lambda msg: self._on_kline_message(socket_name, msg, callback))
+            self.active_sockets[socket_name] = kline_socket
+            return socket_name
+        except Exception as e:
+            logger.error(f"Failed to start multi-timeframe socket: {e}")
+            return None
+    
+    def _on_kline_message(self, socket_name: str, msg: Dict, callback):
+        """Menambahkan candle close ke ring buffer lalu menjadwalkan analisis di worker"""
+        try:
+            stream = self.realtime_streams.get(socket_name)
+            if stream is not None and msg.get('e') == 'kline' and msg['k']['x']:
+                buffer = stream['buffer']
+                aggregator = stream.get('aggregator')
+                open_time = msg['k']['t']
+                
+                with stream['lock']:
+                    # Celah urutan (mis. setelah reconnect): isi candle yang terlewat lewat REST
+                    expected = buffer.last_open_time + INTERVAL_MS[stream['interval']] if len(buffer) else open_time
+                    if open_time > expected:
+                        logger.warning(f"Gap detected on {socket_name}, backfilling {expected}..{open_time - 1}")
+                        gap = self._backfill(stream['symbol'], stream['interval'], expected, open_time - 1,
+                                             priority=PRIORITY_REALTIME)
+                        buffer.extend_frame(gap)
+                        if aggregator is not None:
+                            aggregator.update_frame(gap)
+                    
+                    columns = kline_message_columns(msg)
+                    buffer.extend(columns)
+                    # Candle timeframe lebih tinggi (termasuk yang masih parsial) diperbarui dari candle M1 ini
+                    if aggregator is not None:
+                        aggregator.update(columns)
+                
+                # Callback dipanggil worker setelah hasil analisis candle ini terbit
+                self._get_analysis_worker().submit(socket_name, msg)
+                return
+        except Exception as e:
+            logger.exception(f"Error handling kline message: {e}")
+        
+        callback(msg)
+    
+    def _get_analysis_worker(self) -> AnalysisWorker:
+        if self.analysis_worker is None:
+            self.analysis_worker = AnalysisWorker(self._analyze_stream)
+        return self.analysis_worker
+    
+    def _analyze_stream(self, socket_name: str, msg: Dict):
+        """Analisis buffer stream di thread worker lalu menerbitkan hasilnya ke slot stream"""
+        stream = self.realtime_streams.get(socket_name)
+        if stream is None:
+            return
+        aggregator = stream.get('aggregator')
+        with stream['lock']:
+            frame = stream['buffer'].to_frame()
+            timeframe_frames = {tf: aggregator.frame(tf) for tf in aggregator.timeframes} if aggregator else {}
+        
+        df, analysis = self.calculate_stream_indicators(stream, frame)
+        for tf, tf_frame in timeframe_frames.items():
+            stream['timeframes'][tf] = self.calculate_indicators(tf_frame, stream['symbol'], tf)
+        stream['slot'].publish(df, analysis)
+        observe_kline_latency(msg, stream['interval'])
+        stream['callback'](msg)
+    
+    def start_order_book(self, symbol: str, snapshot_limit: int = ORDER_BOOK_SNAPSHOT_LIMIT):
+        """Memulai order book lokal dari stream diff-depth; fiturnya dipakai rekomendasi setelah sinkron"""
+        socket_name = f"{symbol.lower()}_depth"
+        if socket_name in self.active_sockets:
+            self.stop_realtime_analysis(socket_name)
+        
+        try:
+            book = LocalOrderBook(symbol)
+            self.order_books[book.symbol] = book
+            
+            logger.info(f"Starting order book socket for {symbol}")
+            # Stream dibuka lebih dulu agar event sebelum snapshot ter-buffer
+            depth_socket = self.socket_manager.depth_socket(symbol=symbol, interval=100)
+            depth_socket.start()
+            depth_socket.add_listener(lambda msg: self._on_depth_message(book, msg, snapshot_limit))
+            self.active_sockets[socket_name] = depth_socket
+            self._resync_order_book(book, snapshot_limit)
+            return socket_name
+        except Exception as e:
+            logger.error(f"Failed to start order book socket: {e}")
+            self.order_books.pop(symbol.upper(), None)
+            return None
+    
+    def _on_depth_message(self, book: LocalOrderBook, msg: Dict, snapshot_limit: int):
+        try:
+            if msg.get('e') == 'depthUpdate' and not book.on_event(msg):
+                self._resync_order_book(book, snapshot_limit)
+        except Exception as e:
+            logger.exception(f"Error handling depth message: {e}")
+    
+    def _resync_order_book(self, book: LocalOrderBook, snapshot_limit: int):
+        """Mengambil snapshot di thread terpisah (event stream tetap di-buffer) sampai book sinkron"""
+        def sync():
+            while self.order_books.get(book.symbol) is book:
+                if not book.wait_buffered(ORDER_BOOK_RETRY_SECONDS):
+                    continue
+                try:
+                    snapshot = self.request('get_order_book', depth_request_weight(snapshot_limit), PRIORITY_REALTIME,
+                                            symbol=book.symbol, limit=snapshot_limit)
+                    if book.load_snapshot(snapshot):
+                        logger.info(f"Order book {book.symbol} synced at update {book.last_update_id}")
+                        return
+                except Exception as e:
+                    logger.error(f"Error fetching order book snapshot: {e}")
+                time.sleep(ORDER_BOOK_RETRY_SECONDS)
+        
+        threading.Thread(target=sync, name=f"order-book-{book.symbol}", daemon=True).start()
+    
+    def stop_order_book(self, symbol: str):
+        """Menghentikan order book lokal simbol"""
+        self.stop_realtime_analysis(f"{symbol.lower()}_depth")
+    
+    def get_realtime_analysis(self, socket_name: str, timeframe: Optional[str] = None) -> Tuple[pd.DataFrame, Dict]:
+        """Hasil analisis terakhir dari ring buffer stream real-time (atau salah satu timeframe stream multi-timeframe)"""
+        stream = self.realtime_streams.get(socket_name)
+        if stream is None:
+            return pd.DataFrame(), {}
+        if timeframe is not None:
+            return stream.get('timeframes', {}).get(INTERVAL_MAP.get(timeframe, timeframe), (pd.DataFrame(), {}))
+        _, df, analysis = stream['slot'].latest()
+        return df, analysis
+    
+    def get_realtime_result(self, socket_name: str) -> Tuple[int, pd.DataFrame, Dict]:
+        """Versi, DataFrame, dan analisis terakhir stream; versi 0 berarti belum ada hasil"""
+        stream = self.realtime_streams.get(socket_name)
+        if stream is None:
+            return 0, pd.DataFrame(), {}
+        return stream['slot'].latest()
+    
+    def export_metrics(self) -> str:
+        """Histogram latensi pipeline dalam format teks Prometheus"""
+        return REGISTRY.export()
+    
     def stop_realtime_analysis(self, socket_name: str):
         """Menghentikan analisis real-time"""
         if socket_name in self.active_sockets:
             try:
                 self.active_sockets[socket_name].stop()
                 del self.active_sockets[socket_name]
+                self.realtime_streams.pop(socket_name, None)
+                if socket_name.endswith('_depth'):
+                    self.order_books.pop(socket_name[:-len('_depth')].upper(), None)
+                if self.analysis_worker is not None:
+                    self.analysis_worker.discard(socket_name)
                 logger.info(f"Stopped real-time socket: {socket_name}")
             except Exception as e:
                 logger.error(f"Error stopping socket: {e}")
@@ -344,6 +893,9 @@ class CryptoTradingSystem:
         """Menghentikan semua analisis real-time"""
         for name in list(self.active_sockets.keys()):
             self.stop_realtime_analysis(name)
+        if getattr(self, 'analysis_worker', None) is not None:
+            self.analysis_worker.close()
+            self.analysis_worker = None
     
     def __del__(self):
         self.stop_all_realtime()
@@ -0,0 +1,135 @@
+import os
+import shutil
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from request_scheduler import REQUEST_SCHEDULER, PRIORITY_BULK
+
+logger = logging.getLogger("CryptoTrader")
+
+# Durasi satu candle per interval Binance (ms)
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 60 * 60_000,
+    '2h': 2 * 60 * 60_000,
+    '4h': 4 * 60 * 60_000,
+    '6h': 6 * 60 * 60_000,
+    '8h': 8 * 60 * 60_000,
+    '12h': 12 * 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+    '3d': 3 * 24 * 60 * 60_000,
+    '1w': 7 * 24 * 60 * 60_000
+}
+
+# Bobot request GET /api/v3/klines dan jumlah candle maksimum per request
+KLINES_REQUEST_WEIGHT = 2
+KLINES_PAGE_LIMIT = 1000
+
+# Rentang dengan halaman lebih sedikit dari ini tidak di-checkpoint (cukup diulang jika terputus)
+CHECKPOINT_MIN_PAGES = 4
+
+
+class KlineBackfiller:
+    """Backfill klines historis per halaman secara paralel, dapat dilanjutkan setelah terputus"""
+
+    def __init__(self, client, parse: Callable[[List], pd.DataFrame], max_workers: int = 4,
+                 checkpoint_dir: Optional[str] = "backfill_checkpoints",
+                 request: Optional[Callable[..., List]] = None):
+        self.client = client
+        # Pengganti client.get_klines yang sudah mengatur bobot sendiri; default lewat REQUEST_SCHEDULER
+        self.request = request or self._scheduled_request
+        self.parse = parse
+        self.max_workers = max_workers
+        # None: tanpa checkpoint (mis. isi celah real-time atau rentang interaktif kecil)
+        self.checkpoint_dir = checkpoint_dir
+
+    def _scheduled_request(self, **params) -> List:
+        """client.get_klines lewat penjadwal bobot bersama proses (anggaran per IP, prioritas bulk)"""
+        key = (type(self.client).__name__, bool(getattr(self.client, 'testnet', False)), 'get_klines',
+               tuple(sorted(params.items())))
+        return REQUEST_SCHEDULER.call(
+            lambda: self.client.get_klines(**params), KLINES_REQUEST_WEIGHT, PRIORITY_BULK, key,
+            response=lambda: getattr(self.client, 'response', None)
+        )
+
+    @staticmethod
+    def pages(start_ms: int, end_ms: int, interval: str) -> List[Tuple[int, int]]:
+        """Membagi rentang waktu menjadi halaman berisi paling banyak 1000 candle"""
+        span = INTERVAL_MS[interval] * KLINES_PAGE_LIMIT
+        # Selaraskan awal halaman ke batas candle agar tidak ada candle terpotong antar halaman
+        first = start_ms - start_ms % INTERVAL_MS[interval]
+        return [(page_start, min(page_start + span - 1, end_ms))
+                for page_start in range(first, end_ms + 1, span)]
+
+    def _checkpoint_path(self, symbol: str, interval: str, pages: List[Tuple[int, int]]) -> Optional[str]:
+        """Direktori checkpoint dari simbol, interval, dan awal halaman pertama, atau None jika tidak di-checkpoint
+
+        Kunci tidak memakai end_ms maupun jumlah halaman: backfill sampai "sekarang" yang
+        terputus dilanjutkan run berikutnya dari halaman yang sudah tersimpan walaupun
+        akhir rentangnya sudah maju (batas halaman tetap sama karena disejajarkan ke awal).
+        """
+        if self.checkpoint_dir is None or len(pages) < CHECKPOINT_MIN_PAGES:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{symbol.upper()}_{interval}_{pages[0][0]}")
+
+    def _fetch_page(self, symbol: str, interval: str, page: Tuple[int, int], checkpoint: Optional[str]) -> pd.DataFrame:
+        page_file = os.path.join(checkpoint, f"{page[0]}.pkl") if checkpoint else None
+        if page_file and os.path.exists(page_file):
+            return pd.read_pickle(page_file)
+
+        params = dict(symbol=symbol, interval=interval, startTime=page[0], endTime=page[1], limit=KLINES_PAGE_LIMIT)
+        df = self.parse(self.request(**params))
+
+        # Hanya halaman penuh yang semua candlenya sudah close yang disimpan (atomik) untuk run berikutnya;
+        # halaman terakhir bisa berbeda isinya antar run
+        full_page = page[1] - page[0] + 1 == INTERVAL_MS[interval] * KLINES_PAGE_LIMIT
+        if page_file and full_page and page[1] < time.time() * 1000:
+            df.to_pickle(page_file + ".tmp")
+            os.replace(page_file + ".tmp", page_file)
+        return df
+
+    def run(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> pd.DataFrame:
+        """Mengunduh seluruh rentang lalu menyambung dan menghapus duplikat berdasarkan open time"""
+        pages = self.pages(start_ms, end_ms, interval)
+        checkpoint = self._checkpoint_path(symbol, interval, pages)
+        if checkpoint:
+            os.makedirs(checkpoint, exist_ok=True)
+        logger.info(f"Backfilling {symbol} {interval}: {len(pages)} pages with {self.max_workers} workers")
+
+        frames = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_page, symbol, interval, page, checkpoint) for page in pages]
+            for future in as_completed(futures):
+                frames.append(future.result())
+
+        # Semua halaman selesai: checkpoint tidak diperlukan lagi, termasuk format lama (..._<jumlah halaman>)
+        if checkpoint:
+            name = os.path.basename(checkpoint)
+            for entry in os.listdir(self.checkpoint_dir):
+                if entry == name or entry.startswith(name + "_"):
+                    shutil.rmtree(os.path.join(self.checkpoint_dir, entry), ignore_errors=True)
+        return self.stitch(frames, start_ms, end_ms)
+
+    @staticmethod
+    def stitch(frames: List[pd.DataFrame], start_ms: int, end_ms: int) -> pd.DataFrame:
+        """Menyambung halaman (urutan bebas), memotong ke rentang, dan menghapus duplikat open time"""
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        ts = df['timestamp'].to_numpy()
+        in_range = (ts >= np.datetime64(start_ms, 'ms')) & (ts <= np.datetime64(end_ms, 'ms'))
+        return (df[in_range]
+                .sort_values('timestamp', kind='stable')
+                .drop_duplicates('timestamp', keep='last')
+                .reset_index(drop=True))
@@ -0,0 +1,279 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import batch_indicators as bi
+from macd_search import windowed_macd_fitness
+from indicator_kernel import ema, indicator_values, rolling_extreme, signal_masks, SIGNAL_THRESHOLDS, GRID_WINDOW
+from wavelet import CausalWaveletDenoiser
+
+logger = logging.getLogger("CryptoTrader")
+
+# Parameter aturan rekomendasi yang sama dengan calculate_indicators
+DEFAULT_PARAMS = {
+    'rsi_buy': SIGNAL_THRESHOLDS['rsi_buy'],
+    'rsi_sell': SIGNAL_THRESHOLDS['rsi_sell'],
+    'adx_min': SIGNAL_THRESHOLDS['adx_min'],
+    'volume_mult': SIGNAL_THRESHOLDS['volume_mult'],
+    'grid_window': GRID_WINDOW
+}
+
+# Parameter MACD walk-forward: dipilih ulang setiap MACD_REFIT_BARS candle dari MACD_FIT_BARS candle
+# sebelumnya (sama dengan limit default analisis live); tanpa riwayat minimal memakai parameter default
+MACD_REFIT_BARS = 100
+MACD_FIT_BARS = 500
+MACD_MIN_FIT_BARS = 100
+
+# Jumlah entry yang diselesaikan per blok agar memori jendela (entry x max_hold) tetap terbatas
+_RESOLVE_CHUNK = 4096
+
+
+def resolve_exits(high: np.ndarray, low: np.ndarray, close: np.ndarray, atr: np.ndarray,
+                  entries: np.ndarray, direction: int, sl_atr: float = 0.5, tp_atr: float = 1.5,
+                  max_hold: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+    """Mencari candle pertama yang menyentuh stop-loss atau take-profit untuk setiap entry
+
+    Entry terjadi di close candle sinyal; candle berikutnya diperiksa sampai `max_hold`.
+    Jika SL dan TP tersentuh di candle yang sama, SL dianggap lebih dulu (konservatif).
+    Tanpa sentuhan, posisi ditutup di close candle terakhir jendela. Mengembalikan
+    (indeks candle exit, harga exit).
+    """
+    n = len(close)
+    entry_price = close[entries]
+    stop = entry_price - direction * sl_atr * atr[entries]
+    target = entry_price + direction * tp_atr * atr[entries]
+
+    # Jendela baris t = candle t+1 .. t+max_hold (dipad NaN di ujung data)
+    pad = np.full(max_hold, np.nan)
+    high_windows = sliding_window_view(np.concatenate([high[1:], pad, [np.nan]]), max_hold)
+    low_windows = sliding_window_view(np.concatenate([low[1:], pad, [np.nan]]), max_hold)
+
+    exit_idx = np.empty(len(entries), dtype=np.int64)
+    exit_price = np.empty(len(entries))
+    for start in range(0, len(entries), _RESOLVE_CHUNK):
+        block = slice(start, start + _RESOLVE_CHUNK)
+        idx = entries[block]
+        highs, lows = high_windows[idx], low_windows[idx]
+        if direction > 0:
+            hit_stop = lows <= stop[block, None]
+            hit_target = highs >= target[block, None]
+        else:
+            hit_stop = highs >= stop[block, None]
+            hit_target = lows <= target[block, None]
+
+        first_stop = np.where(hit_stop.any(axis=1), hit_stop.argmax(axis=1), max_hold)
+        first_target = np.where(hit_target.any(axis=1), hit_target.argmax(axis=1), max_hold)
+        first = np.minimum(first_stop, first_target)
+        timeout = first == max_hold
+
+        timeout_idx = np.minimum(idx + max_hold, n - 1)
+        exit_idx[block] = np.where(timeout, timeout_idx, idx + 1 + first)
+        exit_price[block] = np.where(timeout, close[timeout_idx],
+                                     np.where(first_stop <= first_target, stop[block], target[block]))
+    return exit_idx, exit_price
+
+
+def _take_non_overlapping(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """Memilih entry berurutan dengan satu posisi terbuka; loop hanya sebanyak trade yang diambil"""
+    taken = []
+    i = 0
+    while i < len(entries):
+        taken.append(i)
+        # Entry berikutnya harus setelah candle exit posisi sebelumnya
+        i = int(np.searchsorted(entries, exits[i], side='right'))
+    return np.array(taken, dtype=np.int64)
+
+
+def trade_metrics(returns: np.ndarray, bars_held: np.ndarray, n_bars: int) -> Dict:
+    """PnL, win rate, drawdown, dan exposure dari daftar return per trade"""
+    if len(returns) == 0:
+        return {'trades': 0, 'win_rate': 0.0, 'total_return': 0.0, 'avg_return': 0.0,
+                'profit_factor': np.nan, 'max_drawdown': 0.0, 'exposure': 0.0}
+    equity = np.cumprod(np.concatenate([[1.0], 1 + returns]))
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    return {
+        'trades': len(returns),
+        'win_rate': float(np.mean(returns > 0)),
+        'total_return': float(equity[-1] - 1),
+        'avg_return': float(returns.mean()),
+        'profit_factor': float(gains / losses) if losses > 0 else np.inf,
+        'max_drawdown': float(drawdown.max()),
+        'exposure': float(bars_held.sum() / n_bars)
+    }
+
+
+def walk_forward_macd(close: np.ndarray, denoiser: CausalWaveletDenoiser, refit_bars: int = MACD_REFIT_BARS,
+                      fit_bars: int = MACD_FIT_BARS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Wavelet-MACD tanpa look-ahead: (parameter per candle, DIF, DEA) untuk satu series
+
+    Setiap `refit_bars` candle parameter dipilih ulang dari fitness `fit_bars` candle
+    sebelum segmen (seperti optimize_macd_params pada riwayat live); segmen dengan riwayat
+    kurang dari MACD_MIN_FIT_BARS memakai parameter default. Fitness semua jendela diambil
+    dari EMA seluruh series (windowed_macd_fitness), jadi tidak ada EMA per jendela. EMA
+    dan DEA dihitung atas seluruh series lalu dipilih per candle, dan DIF gabungannya
+    di-denoise kausal.
+    """
+    n = len(close)
+    starts = np.arange(0, n, refit_bars)
+    chosen = np.tile(bi.DEFAULT_MACD_PARAMS, (len(starts), 1))
+
+    fitted = np.flatnonzero(starts >= MACD_MIN_FIT_BARS)
+    if len(fitted):
+        ends = starts[fitted]
+        params, fitness = windowed_macd_fitness(close, ends - np.minimum(ends, fit_bars), ends,
+                                                bi.FAST_PERIODS, bi.SLOW_PERIODS, bi.SIGNAL_PERIODS)
+        best = np.argmax(fitness, axis=1)
+        found = np.isfinite(fitness[np.arange(len(fitted)), best])
+        chosen[fitted[found]] = np.array(params)[best[found]]
+    per_bar = np.repeat(chosen, np.diff(np.append(starts, n)), axis=0)
+
+    emas = {p: ema(close, p) for p in np.unique(chosen[:, :2])}
+    dif = np.full(n, np.nan)
+    for fast, slow in np.unique(chosen[:, :2], axis=0):
+        mask = (per_bar[:, 0] == fast) & (per_bar[:, 1] == slow)
+        dif[mask] = emas[fast][mask] - emas[slow][mask]
+
+    # Denoise mulai candle setelah NaN terakhir (pemanasan EMA segmen awal)
+    missing = np.flatnonzero(np.isnan(dif))
+    first = missing[-1] + 1 if len(missing) else 0
+    dif_deno = np.full(n, np.nan)
+    dif_deno[first:] = denoiser.denoise(dif[first:])
+
+    dea = np.full(n, np.nan)
+    for signal in np.unique(chosen[:, 2]):
+        mask = per_bar[:, 2] == signal
+        dea[mask] = ema(dif_deno, signal)[mask]
+    return per_bar, dif_deno, dea
+
+
+class Backtester:
+    """Backtest vektor aturan rekomendasi dengan stop 0.5xATR dan target 1.5xATR
+
+    Indikator dasar (EMA, RSI, ADX, ATR, volume SMA, Wavelet-MACD) dan hasil
+    first-touch setiap candle sinyal dihitung sekali lalu dipakai bersama oleh
+    semua set parameter yang diuji. Secara default tidak ada candle masa depan
+    yang dipakai: DIF di-denoise kausal dan parameter MACD dipilih walk-forward
+    (lihat walk_forward_macd). `lookahead=True` adalah mode lama untuk perbandingan:
+    wavelet atas seluruh riwayat dan parameter MACD dari fitness seluruh riwayat.
+    """
+
+    def __init__(self, df: pd.DataFrame, sl_atr: float = 0.5, tp_atr: float = 1.5,
+                 max_hold: int = 1000, fee: float = 0.0, lookahead: bool = False,
+                 macd_refit_bars: int = MACD_REFIT_BARS, macd_fit_bars: int = MACD_FIT_BARS):
+        self.sl_atr = sl_atr
+        self.tp_atr = tp_atr
+        self.max_hold = max_hold
+        self.fee = fee
+        self.lookahead = lookahead
+        self.macd_refit_bars = macd_refit_bars
+        self.macd_fit_bars = macd_fit_bars
+        self.denoiser = None if lookahead else CausalWaveletDenoiser()
+        self.ohlcv = {c: df[c].to_numpy(dtype=np.float64) for c in ('open', 'high', 'low', 'close', 'volume')}
+        self.n_bars = len(df)
+        # ATR dari calculate_indicators dipakai langsung jika sudah ada di DataFrame
+        self._atr = df['ATR'].to_numpy(dtype=np.float64) if 'ATR' in df.columns else None
+        self._base: Optional[Dict[str, np.ndarray]] = None
+        self._grid_cache: Dict[int, np.ndarray] = {}
+        # Cache first-touch per arah: indeks exit (-1 = belum dihitung) dan harga exit per candle entry
+        self._exit_idx = {side: np.full(self.n_bars, -1, dtype=np.int64) for side in (1, -1)}
+        self._exit_price = {side: np.zeros(self.n_bars) for side in (1, -1)}
+
+    @property
+    def atr(self) -> np.ndarray:
+        if self._atr is None:
+            self._atr = self._base_indicators()['ATR']
+        return self._atr
+
+    def _base_indicators(self) -> Dict[str, np.ndarray]:
+        if self._base is None:
+            o = self.ohlcv
+            if self.lookahead:
+                self._base = indicator_values(o['high'], o['low'], o['close'], o['volume'],
+                                              bi.select_macd_params(o['close'][None, :])[0], bi.batch_denoise())
+            else:
+                # MACD walk-forward diisi sendiri: parameter berganti per segmen
+                self._base = indicator_values(o['high'], o['low'], o['close'], o['volume'])
+                _, dif, dea = walk_forward_macd(o['close'], self.denoiser, self.macd_refit_bars, self.macd_fit_bars)
+                self._base.update(DIF=dif, DEA=dea, MACD=dif - dea)
+        return self._base
+
+    def _grid_center(self, window: int) -> np.ndarray:
+        window = min(window, self.n_bars)
+        if window not in self._grid_cache:
+            o = self.ohlcv
+            self._grid_cache[window] = (rolling_extreme(o['high'], window, True, np.empty(self.n_bars)) +
+                                        rolling_extreme(o['low'], window, False, np.empty(self.n_bars))) / 2
+        return self._grid_cache[window]
+
+    def signals(self, params: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Mask buy dan sell per candle untuk satu set parameter (aturan dari indicator_kernel.signal_masks)"""
+        p = {**DEFAULT_PARAMS, **params}
+        b = self._base_indicators()
+        center = self._grid_center(int(p['grid_window']))
+        values = {**b, 'GRID_LOW': center - b['ATR'], 'GRID_UP': center + b['ATR']}
+        o = self.ohlcv
+        s = signal_masks(o['open'], o['high'], o['low'], o['close'], o['volume'], values,
+                         {name: p[name] for name in SIGNAL_THRESHOLDS if name in p})
+        return s['buy'], s['sell'] & ~s['buy']
+
+    def _exits(self, entries: np.ndarray, direction: int) -> Tuple[np.ndarray, np.ndarray]:
+        """First-touch exit, dihitung sekali per candle sinyal lintas semua set parameter"""
+        exit_idx, exit_price = self._exit_idx[direction], self._exit_price[direction]
+        missing = entries[exit_idx[entries] < 0]
+        if len(missing):
+            o = self.ohlcv
+            exit_idx[missing], exit_price[missing] = resolve_exits(
+                o['high'], o['low'], o['close'], self.atr, missing, direction,
+                self.sl_atr, self.tp_atr, self.max_hold)
+        return exit_idx[entries], exit_price[entries]
+
+    def run_signals(self, buy: np.ndarray, sell: np.ndarray) -> Dict:
+        """Backtest mask sinyal buy/sell dengan satu posisi terbuka pada satu waktu"""
+        close = self.ohlcv['close']
+        entries = np.flatnonzero(buy | sell)
+        if len(entries) == 0:
+            return trade_metrics(np.empty(0), np.empty(0), self.n_bars)
+
+        direction = np.where(buy[entries], 1, -1)
+        exit_idx = np.empty(len(entries), dtype=np.int64)
+        exit_price = np.empty(len(entries))
+        for side in (1, -1):
+            mask = direction == side
+            if mask.any():
+                exit_idx[mask], exit_price[mask] = self._exits(entries[mask], side)
+
+        taken = _take_non_overlapping(entries, exit_idx)
+        entry_price = close[entries[taken]]
+        returns = direction[taken] * (exit_price[taken] - entry_price) / entry_price - 2 * self.fee
+        return trade_metrics(returns, exit_idx[taken] - entries[taken], self.n_bars)
+
+    def run(self, param_sets: Optional[List[Dict]] = None) -> pd.DataFrame:
+        """Backtest banyak set parameter sekaligus; satu baris hasil per set"""
+        param_sets = param_sets or [DEFAULT_PARAMS]
+        rows = []
+        for params in param_sets:
+            buy, sell = self.signals(params)
+            rows.append({**DEFAULT_PARAMS, **params, **self.run_signals(buy, sell)})
+        return pd.DataFrame(rows)
+
+
+def backtest_recommendations(df: pd.DataFrame, sl_atr: float = 0.5, tp_atr: float = 1.5,
+                             max_hold: int = 1000, fee: float = 0.0) -> Dict:
+    """Memutar ulang kolom RECOMMENDATION dan ATR hasil calculate_indicators"""
+    backtester = Backtester(df, sl_atr, tp_atr, max_hold, fee)
+    recommendation = df['RECOMMENDATION'].to_numpy()
+    return backtester.run_signals(recommendation == bi.RECOMMENDATION_BUY,
+                                  recommendation == bi.RECOMMENDATION_SELL)
+
+
+def parameter_grid(**choices) -> List[Dict]:
+    """Produk kartesius pilihan parameter, mis. parameter_grid(rsi_buy=[30, 40], adx_min=[15, 20, 25])"""
+    grid = [{}]
+    for name, values in choices.items():
+        grid = [{**params, name: value} for params in grid for value in values]
+    return grid
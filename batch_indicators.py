@@ -0,0 +1,50 @@
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from indicator_kernel import indicator_kernel
+from macd_search import batched_macd_fitness
+from wavelet import wavelet_denoise_batch, CausalWaveletDenoiser
+
+# Ruang parameter MACD yang sama dengan CryptoTradingSystem.optimize_macd_params
+FAST_PERIODS = [8, 9, 10, 11, 12]
+SLOW_PERIODS = [22, 24, 26, 28]
+SIGNAL_PERIODS = [7, 8, 9, 10]
+DEFAULT_MACD_PARAMS = (12, 26, 9)
+
+RECOMMENDATION_BUY = "BUY SEKARANG"
+RECOMMENDATION_SELL = "SELL SEKARANG"
+RECOMMENDATION_WAIT = "TUNGGU / NO TRADE"
+
+# Semua fungsi di modul ini bekerja pada array 2-D berbentuk (simbol x waktu); rumus indikator
+# berasal dari indicator_kernel
+
+
+def select_macd_params(close: np.ndarray) -> np.ndarray:
+    """Parameter MACD (fast, slow, signal) dengan fitness terbaik per baris; default jika tidak ada yang valid"""
+    params, fitness = batched_macd_fitness(close, FAST_PERIODS, SLOW_PERIODS, SIGNAL_PERIODS)
+    return np.array([params[i] if np.isfinite(row[i]) else DEFAULT_MACD_PARAMS
+                     for row, i in zip(fitness, np.argmax(fitness, axis=1))], dtype=int).reshape(len(close), 3)
+
+
+def batch_denoise(denoiser: Optional[CausalWaveletDenoiser] = None) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """Fungsi denoise untuk indicator_kernel: kausal (jendela geser) dengan `denoiser`, selain itu atas seluruh riwayat"""
+    if denoiser is not None:
+        return lambda dif, valid: denoiser.denoise(dif)
+    return lambda dif, valid: wavelet_denoise_batch(dif)
+
+
+def batch_indicators(ohlcv: Dict[str, np.ndarray],
+                     denoiser: Optional[CausalWaveletDenoiser] = None) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Pipeline indikator dan rekomendasi calculate_indicators untuk semua simbol dalam satu langkah
+
+    Mengembalikan (kolom indikator, sinyal) dengan setiap array berbentuk (simbol x waktu).
+    """
+    close = ohlcv['close']
+    macd_params = select_macd_params(close)
+    indicators, signals = indicator_kernel(ohlcv['open'], ohlcv['high'], ohlcv['low'], close, ohlcv['volume'],
+                                           macd_params, batch_denoise(denoiser))
+    indicators['MACD_PARAMS'] = macd_params
+    signals['recommendation'] = np.where(signals['buy'], RECOMMENDATION_BUY,
+                                         np.where(signals['sell'], RECOMMENDATION_SELL, RECOMMENDATION_WAIT))
+    return indicators, signals
@@ -0,0 +1,50 @@
+"""Benchmark: Backtester default (tanpa look-ahead, MACD walk-forward) vs mode lookahead=True
+
+Mengukur waktu dan puncak memori (tracemalloc) satu Backtester(df).run() per mode, termasuk
+indikator dasar, walk-forward MACD, denoise kausal, dan penyelesaian exit.
+
+Jalankan dari root repo:
+    python benchmarks/bench_backtest.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest import Backtester  # noqa: E402
+from synthetic import synthetic_frame  # noqa: E402
+
+MODES = [('default', False), ('lookahead', True)]
+
+
+def measure(df, lookahead: bool):
+    """(detik, puncak MB, jumlah trade) satu run dengan parameter default"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = Backtester(df, lookahead=lookahead).run()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return seconds, peak, int(result['trades'].iloc[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    logging.getLogger("CryptoTrader").setLevel(logging.WARNING)
+
+    print(f"{'bars':>9} {'mode':<10} {'seconds':>9} {'peak MB':>9} {'trades':>7}")
+    for n in args.sizes:
+        df = synthetic_frame(n)
+        for name, lookahead in MODES:
+            seconds, peak, trades = measure(df, lookahead)
+            print(f"{n:>9} {name:<10} {seconds:>9.2f} {peak:>9.0f} {trades:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark: kernel indikator NumPy gabungan vs panggilan ta/pandas per indikator
+
+Memeriksa kesetaraan nilai dan kondisi beli/jual terhadap implementasi ta lama sebelum mengukur waktu.
+
+Jalankan dari root repo:
+    python benchmarks/bench_indicator_kernel.py [--sizes 500 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import ta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicator_kernel import indicator_kernel, VALUE_ROWS  # noqa: E402
+from synthetic import synthetic_frame  # noqa: E402
+from wavelet import wavelet_denoise  # noqa: E402
+
+MACD_PARAMS = (12, 26, 9)
+SIGNALS = ['trend_up', 'trend_down', 'momentum_buy', 'momentum_sell', 'trend_strong', 'valid_volatility',
+           'volume_spike', 'bull_candle', 'bear_candle', 'macd_buy', 'macd_sell', 'grid_buy', 'grid_sell']
+
+# Toleransi relatif nilai (selisih pembulatan; DIF/MACD di sekitar nol dibandingkan secara absolut)
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+def legacy_indicators(df: pd.DataFrame):
+    """Implementasi lama calculate_indicators: satu panggilan ta/pandas per indikator"""
+    ema_fast = ta.trend.ema_indicator(df['close'], window=9)
+    ema_slow = ta.trend.ema_indicator(df['close'], window=21)
+    rsi = ta.momentum.rsi(df['close'], window=7)
+    adx = ta.trend.adx(df['high'], df['low'], df['close'], window=14)
+    atr = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=14)
+    vol_sma = ta.trend.sma_indicator(df['volume'], window=20)
+
+    p_fast, p_slow, p_signal = MACD_PARAMS
+    dif_values = (ta.trend.ema_indicator(df['close'], window=p_fast) -
+                  ta.trend.ema_indicator(df['close'], window=p_slow)).values
+    valid = ~np.isnan(dif_values)
+    dif_deno = np.full(len(dif_values), np.nan)
+    dif_deno[valid] = wavelet_denoise(dif_values[valid])
+    dea = ta.trend.ema_indicator(pd.Series(dif_deno), window=p_signal)
+
+    window = min(60, len(df))
+    center = (df['high'].rolling(window=window).max() + df['low'].rolling(window=window).min()) / 2
+    grid_low = center - atr
+    grid_up = center + atr
+
+    signals = {
+        'trend_up': ema_fast > ema_slow,
+        'trend_down': ema_fast < ema_slow,
+        'momentum_buy': (rsi < 40) & (rsi.diff() > 0),
+        'momentum_sell': (rsi > 60) & (rsi.diff() < 0),
+        'trend_strong': adx > 20,
+        'valid_volatility': (df['high'] - df['low']) > (0.8 * atr),
+        'volume_spike': df['volume'] > (1.5 * vol_sma),
+        'bull_candle': (df['close'] > df['open']) & (
+            (df['close'] - df['open']) > (df['close'].shift(1) - df['open'].shift(1))),
+        'bear_candle': (df['close'] < df['open']) & (
+            (df['open'] - df['close']) > (df['open'].shift(1) - df['close'].shift(1))),
+        'macd_buy': (pd.Series(dif_deno).shift(1) < dea.shift(1)) & (pd.Series(dif_deno) > dea),
+        'macd_sell': (pd.Series(dif_deno).shift(1) > dea.shift(1)) & (pd.Series(dif_deno) < dea),
+        'grid_buy': df['close'] <= grid_low,
+        'grid_sell': df['close'] >= grid_up
+    }
+    values = {
+        'EMA_FAST': ema_fast, 'EMA_SLOW': ema_slow, 'RSI': rsi, 'ADX': adx, 'ATR': atr, 'VOL_SMA': vol_sma,
+        'DIF': dif_deno, 'DEA': dea, 'MACD': pd.Series(dif_deno) - dea,
+        'CENTER': center, 'GRID_LOW': grid_low, 'GRID_UP': grid_up
+    }
+    return values, signals
+
+
+def kernel_indicators(df: pd.DataFrame):
+    columns = (df[c].to_numpy(dtype=np.float64) for c in ['open', 'high', 'low', 'close', 'volume'])
+    return indicator_kernel(*columns, MACD_PARAMS, lambda dif, valid: wavelet_denoise(dif))
+
+
+def check_parity(df: pd.DataFrame) -> float:
+    """Selisih relatif terbesar antar nilai; kondisi harus identik"""
+    legacy_values, legacy_signals = legacy_indicators(df)
+    values, signals = kernel_indicators(df)
+    worst = 0.0
+    for name in VALUE_ROWS:
+        expected = np.asarray(legacy_values[name], dtype=np.float64)
+        assert (np.isnan(expected) == np.isnan(values[name])).all(), name
+        mask = ~np.isnan(expected)
+        assert np.allclose(values[name][mask], expected[mask], rtol=RTOL, atol=ATOL), name
+        error = np.abs(values[name][mask] - expected[mask]) / np.maximum(np.abs(expected[mask]), 1.0)
+        worst = max(worst, float(error.max(initial=0.0)))
+    for name in SIGNALS:
+        assert (np.asarray(legacy_signals[name]) == signals[name]).all(), name
+    return worst
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'bars':>8} {'ta (s)':>9} {'kernel (s)':>11} {'speedup':>8}  max rel err")
+    for n in args.sizes:
+        df = synthetic_frame(n)
+        error = check_parity(df)
+        legacy = best_of(legacy_indicators, df, args.repeat)
+        kernel = best_of(kernel_indicators, df, args.repeat)
+        print(f"{n:>8} {legacy:>9.4f} {kernel:>11.4f} {legacy / kernel:>7.1f}x  {error:.1e}")
+
+
+if __name__ == '__main__':
+    main()
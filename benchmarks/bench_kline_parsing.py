@@ -0,0 +1,62 @@
+"""Micro-benchmark: decoder klines vektor vs loop dict per baris
+
+Jalankan dari root repo:
+    python benchmarks/bench_kline_parsing.py [--sizes 1000 100000 1000000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kline_parser import klines_to_frame  # noqa: E402
+from synthetic import synthetic_klines  # noqa: E402
+
+
+def legacy_klines_to_frame(klines):
+    """Implementasi lama get_klines: satu dict dan enam float() per candle"""
+    data = []
+    for k in klines:
+        data.append({
+            'timestamp': pd.to_datetime(k[0], unit='ms'),
+            'open': float(k[1]),
+            'high': float(k[2]),
+            'low': float(k[3]),
+            'close': float(k[4]),
+            'volume': float(k[5])
+        })
+    return pd.DataFrame(data)
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'list (s)':>10} {'json (s)':>10} {'speedup':>8}")
+    for n in args.sizes:
+        klines = synthetic_klines(n)
+        payload = json.dumps(klines)
+        # Loop lama sangat lambat di 1M baris, jadi cukup diukur sekali
+        legacy = best_of(legacy_klines_to_frame, klines, 1 if n >= 100_000 else args.repeat)
+        vectorized = best_of(klines_to_frame, klines, args.repeat)
+        from_json = best_of(klines_to_frame, payload, args.repeat)
+        print(f"{n:>10} {legacy:>12.4f} {vectorized:>10.4f} {from_json:>10.4f} {legacy / vectorized:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
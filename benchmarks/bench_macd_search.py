@@ -0,0 +1,83 @@
+"""Benchmark: pencarian MACD batch vs loop lama per kombinasi
+
+Jalankan dari root repo:
+    python benchmarks/bench_macd_search.py [--sizes 500 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import ta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from macd_search import batched_macd_fitness  # noqa: E402
+from synthetic import synthetic_ohlcv  # noqa: E402
+
+FAST_PERIODS = [8, 9, 10, 11, 12]
+SLOW_PERIODS = [22, 24, 26, 28]
+SIGNAL_PERIODS = [7, 8, 9, 10]
+
+
+def legacy_search(close):
+    """Implementasi lama optimize_macd_params: tiga EMA ta per kombinasi"""
+    best_fitness = -np.inf
+    best_params = (12, 26, 9)
+    for fast in FAST_PERIODS:
+        for slow in SLOW_PERIODS:
+            if slow <= fast:
+                continue
+            for signal in SIGNAL_PERIODS:
+                ema_fast = ta.trend.ema_indicator(pd.Series(close), window=fast)
+                ema_slow = ta.trend.ema_indicator(pd.Series(close), window=slow)
+                dif = ema_fast - ema_slow
+                dif = dif[dif.notna()]
+                if len(dif) == 0:
+                    continue
+                dea = ta.trend.ema_indicator(dif, window=signal)
+                macd = dif - dea
+                std = np.std(macd)
+                if std == 0:
+                    continue
+                fitness = np.mean(np.abs(macd)) / std
+                if fitness > best_fitness:
+                    best_fitness = fitness
+                    best_params = (fast, slow, signal)
+    return best_params
+
+
+def batched_search(close):
+    params, fitness = batched_macd_fitness(close, FAST_PERIODS, SLOW_PERIODS, SIGNAL_PERIODS)
+    return params[int(np.argmax(fitness))]
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'bars':>8} {'legacy (s)':>11} {'batched (s)':>12} {'speedup':>8}  params")
+    for n in args.sizes:
+        close = synthetic_ohlcv(n)['close']
+        legacy_params, params = legacy_search(close), batched_search(close)
+        assert legacy_params == params, (legacy_params, params)
+        legacy = best_of(legacy_search, close, args.repeat)
+        batched = best_of(batched_search, close, args.repeat)
+        print(f"{n:>8} {legacy:>11.4f} {batched:>12.4f} {legacy / batched:>7.1f}x  {params}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: pipeline realtime (start_realtime_analysis) dengan replay pasar lokal
+
+Jalankan dari root repo:
+    python benchmarks/bench_realtime_replay.py [--symbols 1 10 50] [--candles 200] [--speed 100]
+    python benchmarks/bench_realtime_replay.py --recording rekaman.npz
+
+Tanpa --speed pesan diputar secepat pipeline mampu menerima (mencari titik jenuh);
+dengan --speed, lag maksimum terhadap jadwal menunjukkan apakah penerimaan tertinggal.
+Analisis berjalan di worker latar: jumlah analisis di bawah jumlah candle close berarti
+worker jenuh dan candle close yang menumpuk digabung.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend  # noqa: E402
+from replay import MarketRecording, MarketReplay  # noqa: E402
+from synthetic import synthetic_klines  # noqa: E402
+
+HISTORY = 500
+
+
+def synthetic_recording(symbols: int, candles: int, updates_per_candle: int) -> MarketRecording:
+    recording = MarketRecording()
+    for i in range(symbols):
+        klines = synthetic_klines(HISTORY + candles, seed=i)
+        recording.extend_from_klines(f"SYN{i}USDT", '1m', klines, HISTORY, updates_per_candle)
+    return recording
+
+
+def replay_once(recording: MarketRecording, speed, limit: int) -> dict:
+    replay = MarketReplay(recording, speed)
+    system = backend.CryptoTradingSystem.with_client(replay.client(), replay.socket_manager())
+    reverse_interval = {v: k for k, v in backend.INTERVAL_MAP.items()}
+    names = [system.start_realtime_analysis(symbol, reverse_interval[interval], lambda msg: None, limit=limit)
+             for symbol, interval in recording.messages]
+    started = time.perf_counter()
+    replay.start()
+    replay.wait()
+    if system.analysis_worker is not None:
+        system.analysis_worker.wait_idle()
+    stats = dict(replay.stats)
+    stats['drain_seconds'] = time.perf_counter() - started - stats['seconds']
+    # Candle close yang menumpuk saat worker sibuk digabung menjadi satu analisis
+    stats['analyses'] = sum(system.get_realtime_result(name)[0] for name in names)
+    system.stop_all_realtime()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--candles', type=int, default=200, help="candle websocket per simbol")
+    parser.add_argument('--updates-per-candle', type=int, default=3,
+                        help="pesan candle belum close sebelum setiap candle close")
+    parser.add_argument('--speed', type=float, default=None, help="faktor percepatan (default: maksimum)")
+    parser.add_argument('--limit', type=int, default=300, help="panjang buffer realtime per simbol")
+    parser.add_argument('--recording', help="file .npz hasil MarketRecording.save sebagai ganti data sintetis")
+    args = parser.parse_args()
+
+    logging.getLogger("CryptoTrader").setLevel(logging.ERROR)
+
+    if args.recording:
+        runs = [('recording', MarketRecording.load(args.recording))]
+    else:
+        runs = [(f"{n} symbols", synthetic_recording(n, args.candles, args.updates_per_candle))
+                for n in args.symbols]
+
+    print(f"{'run':<14} {'messages':>9} {'closes':>7} {'analyses':>9} {'seconds':>9} {'msg/s':>9} "
+          f"{'avg handler':>12} {'max lag':>9} {'drain':>8}")
+    for name, recording in runs:
+        closes = sum(msg['k']['x'] for items in recording.messages.values() for _, msg in items)
+        stats = replay_once(recording, args.speed, args.limit)
+        average = stats['handler_seconds'] / max(stats['messages'], 1)
+        print(f"{name:<14} {stats['messages']:>9} {closes:>7} {stats['analyses']:>9} {stats['seconds']:>8.2f}s "
+              f"{stats['rate']:>9.0f} {average * 1000:>10.3f}ms {stats['max_lag_seconds']:>8.2f}s "
+              f"{stats['drain_seconds']:>7.2f}s")
+
+if __name__ == '__main__':
+    main()
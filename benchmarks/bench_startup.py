@@ -0,0 +1,84 @@
+"""Benchmark: waktu cold-start backend (import, konstruksi sistem offline, analisis pertama)
+
+Setiap percobaan berjalan di interpreter baru agar import tidak di-cache. Juga memeriksa bahwa
+import backend dan analisis offline tidak memuat binance dan tidak membuat file log.
+
+Jalankan dari root repo:
+    python benchmarks/bench_startup.py [--repeat 5] [--max-seconds 1.0]
+
+--max-seconds: keluar dengan status 1 jika median import + konstruksi melebihi batas.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dijalankan di proses anak; mencetak satu baris JSON berisi durasi setiap fase
+PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+import backend
+imported = time.perf_counter()
+system = backend.CryptoTradingSystem(offline=True)
+constructed = time.perf_counter()
+heavy = sorted(m for m in ('binance', 'pywt') if m in sys.modules)
+from synthetic import synthetic_frame
+df = synthetic_frame(500)
+ready = time.perf_counter()
+system.calculate_indicators(df)
+analyzed = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'construct': constructed - imported,
+    'first_analysis': analyzed - ready,
+    'loaded_at_startup': heavy,
+    'binance_loaded': 'binance' in sys.modules,
+    'log_file': os.path.exists('crypto_trading.log'),
+}))
+"""
+
+PHASES = ['import', 'construct', 'first_analysis']
+
+
+def probe(cwd: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'benchmarks')]))
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=None)
+    parser.add_argument('--workdir', default=None, help="direktori kerja proses anak (default: direktori sementara)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [probe(args.workdir or tmp) for _ in range(args.repeat)]
+
+    print(f"{'phase':>16} {'median (s)':>11} {'min (s)':>9}")
+    for phase in PHASES:
+        samples = [r[phase] for r in runs]
+        print(f"{phase:>16} {statistics.median(samples):>11.4f} {min(samples):>9.4f}")
+    print(f"modules loaded before first analysis: {runs[0]['loaded_at_startup'] or 'none'}")
+
+    failures = []
+    if any(r['binance_loaded'] for r in runs):
+        failures.append("offline analysis imported binance")
+    if any(r['log_file'] for r in runs):
+        failures.append("offline startup created crypto_trading.log")
+    startup = statistics.median(r['import'] + r['construct'] for r in runs)
+    if args.max_seconds is not None and startup > args.max_seconds:
+        failures.append(f"cold start {startup:.3f}s exceeds {args.max_seconds:.3f}s")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
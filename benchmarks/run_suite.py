@@ -0,0 +1,175 @@
+"""Suite benchmark offline untuk pipeline analisis, dengan perbandingan terhadap baseline
+
+Jalankan dari root repo:
+    python benchmarks/run_suite.py --output benchmarks/baseline.json
+    python benchmarks/run_suite.py --compare benchmarks/baseline.json [--threshold 0.2]
+
+Tanpa jaringan: klines sintetis, atau klines rekaman (file JSON respons REST) lewat --klines.
+Mode --compare keluar dengan status 1 jika ada kasus yang melambat melebihi threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend  # noqa: E402
+from chart_data import ChartSeries, LINE_COLUMNS  # noqa: E402
+from kline_parser import klines_to_frame  # noqa: E402
+from scanner import MarketScanner  # noqa: E402
+from synthetic import synthetic_klines  # noqa: E402
+from wavelet import wavelet_denoise, CausalWaveletDenoiser  # noqa: E402
+
+DEFAULT_SIZES = [500, 10_000, 1_000_000]
+DEFAULT_SYMBOLS = [1, 10, 100]
+
+
+def offline_system() -> backend.CryptoTradingSystem:
+    """CryptoTradingSystem tanpa koneksi Binance (hanya pipeline analisis)"""
+    return backend.CryptoTradingSystem(offline=True)
+
+
+def load_klines(path: str, n: int) -> list:
+    """Klines rekaman diulang (dengan open time digeser) sampai n baris"""
+    with open(path) as f:
+        recorded = json.load(f)
+    step = recorded[1][0] - recorded[0][0]
+    klines = []
+    while len(klines) < n:
+        shift = len(klines) * step
+        klines.extend([[k[0] + shift, *k[1:6], k[6] + shift, *k[7:]] for k in recorded[:n - len(klines)]])
+    return klines
+
+
+def measure(fn, setup=None, repeat: int = 3) -> dict:
+    """Waktu minimum dan rata-rata; setup (mis. salinan DataFrame) tidak ikut diukur"""
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return {'seconds': min(timings), 'mean': float(np.mean(timings)), 'repeat': repeat}
+
+
+def single_symbol_cases(klines: list, repeat: int):
+    """Kasus per simbol pada satu panjang riwayat"""
+    system = offline_system()
+    # Filter bank denoiser kausal dibangun sekali; yang diukur biaya per series
+    denoiser = CausalWaveletDenoiser()
+    df = klines_to_frame(klines)
+    close = df['close'].to_numpy()
+    dif = pd.Series(close).ewm(span=12, adjust=False).mean().to_numpy() - \
+        pd.Series(close).ewm(span=26, adjust=False).mean().to_numpy()
+
+    # Langkah parsing get_klines (respons REST -> DataFrame)
+    yield 'kline_parsing', lambda _: klines_to_frame(klines), None
+    yield 'calculate_indicators', lambda frame: system.calculate_indicators(frame), lambda: df.copy()
+    # Simbol memberi buffer ringkas yang dipakai ulang; memo MACD dikosongkan agar setara kasus di atas
+    yield 'calculate_indicators_compact', \
+        lambda frame: system.calculate_indicators(frame, 'BENCH', '1m', compact=True, reuse_buffer=True), \
+        lambda: system._macd_cache.clear() or df.copy()
+    yield 'optimize_macd_params', lambda _: system.optimize_macd_params(close), None
+    yield 'wavelet_denoise', lambda _: wavelet_denoise(dif), None
+    yield 'causal_wavelet_denoise', lambda _: denoiser.denoise(dif), None
+    # Downsampling grafik (OHLC per bucket + LTTB untuk setiap overlay) atas seluruh riwayat
+    chart_frame = df.assign(**{name: df['close'] for name in LINE_COLUMNS})
+    yield 'chart_downsample', lambda _: ChartSeries().update(chart_frame), None
+
+
+def run(sizes, symbol_counts, repeat: int, klines_path: str = None, max_cells: int = 2_000_000) -> list:
+    results = []
+
+    def record(name, bars, symbols, timing):
+        results.append({'name': name, 'bars': bars, 'symbols': symbols, **timing})
+        print(f"{name:<28} {bars:>9} {symbols:>7} {timing['seconds']:>10.4f}s")
+
+    print(f"{'case':<28} {'bars':>9} {'symbols':>7} {'best':>11}")
+    for n in sizes:
+        klines = load_klines(klines_path, n) if klines_path else synthetic_klines(n)
+        # Riwayat sangat panjang cukup diukur sekali
+        case_repeat = repeat if n <= 10_000 else 1
+        for name, fn, setup in single_symbol_cases(klines, case_repeat):
+            record(name, n, 1, measure(fn, setup, case_repeat))
+
+        # Banyak simbol: indikator batch (simbol x waktu) seperti pada scanner
+        frame = klines_to_frame(klines)
+        for count in symbol_counts:
+            if count * n > max_cells:
+                continue
+            stacked = MarketScanner.stack({f"S{i}": frame for i in range(count)}, n)
+            record('scanner_rank', n, count, measure(lambda _: MarketScanner.rank(stacked), None, case_repeat))
+    return results
+
+
+def metadata() -> dict:
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__
+    }
+
+
+def compare(results: list, baseline_path: str, threshold: float, min_delta: float = 0.002) -> int:
+    """Membandingkan dengan baseline; mengembalikan jumlah kasus yang melambat
+
+    Kasus dianggap melambat jika rasio melewati threshold dan selisihnya lebih dari
+    `min_delta` detik, agar jitter pada kasus sub-milidetik tidak ikut ditandai.
+    """
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['bars'], r['symbols']): r for r in json.load(f)['results']}
+
+    regressions = 0
+    print(f"\n{'case':<28} {'bars':>9} {'symbols':>7} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for r in results:
+        base = baseline.get((r['name'], r['bars'], r['symbols']))
+        if base is None:
+            continue
+        ratio = r['seconds'] / base['seconds'] if base['seconds'] > 0 else float('inf')
+        slower = ratio > 1 + threshold and r['seconds'] - base['seconds'] > min_delta
+        regressions += slower
+        print(f"{r['name']:<28} {r['bars']:>9} {r['symbols']:>7} {base['seconds']:>9.4f}s "
+              f"{r['seconds']:>9.4f}s {ratio:>6.2f}x{'  SLOWER' if slower else ''}")
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--symbols', type=int, nargs='+', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--klines', help="file JSON klines rekaman (format respons REST) sebagai ganti data sintetis")
+    parser.add_argument('--max-cells', type=int, default=2_000_000,
+                        help="lewati kasus multi-simbol dengan simbol x bar melebihi batas ini")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help="file hasil sebelumnya sebagai baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="batas perlambatan relatif (0.2 = 20%%)")
+    parser.add_argument('--min-delta', type=float, default=0.002,
+                        help="selisih absolut minimum (detik) agar perlambatan ditandai")
+    args = parser.parse_args()
+
+    # Log analisis per panggilan hanya menambah noise pada pengukuran
+    logging.getLogger("CryptoTrader").setLevel(logging.ERROR)
+
+    results = run(args.sizes, args.symbols, args.repeat, args.klines, args.max_cells)
+    with open(args.output, 'w') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold, args.min_delta):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
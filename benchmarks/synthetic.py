@@ -0,0 +1,47 @@
+"""Generator klines sintetis untuk benchmark tanpa jaringan"""
+import numpy as np
+import pandas as pd
+
+BASE_OPEN_TIME = 1_700_000_000_000
+
+
+def synthetic_ohlcv(n: int, seed: int = 0, step_ms: int = 60_000) -> dict:
+    """Random walk geometris dengan kolom OHLCV yang konsisten"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, n))
+    volume = rng.lognormal(3, 0.5, n)
+    return {
+        'timestamp': BASE_OPEN_TIME + step_ms * np.arange(n, dtype=np.int64),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    }
+
+
+def synthetic_frame(n: int, seed: int = 0, step_ms: int = 60_000) -> pd.DataFrame:
+    """DataFrame sintetis dengan format yang sama seperti hasil get_klines"""
+    columns = synthetic_ohlcv(n, seed, step_ms)
+    df = pd.DataFrame(columns)
+    df['timestamp'] = pd.to_datetime(columns['timestamp'], unit='ms')
+    return df
+
+
+def synthetic_klines(n: int, seed: int = 0, step_ms: int = 60_000) -> list:
+    """Klines mentah dengan format respons REST Binance (angka sebagai string)"""
+    c = synthetic_ohlcv(n, seed, step_ms)
+    ts = c['timestamp'].tolist()
+    fmt = lambda values: [f"{v:.8f}" for v in values]
+    opens, highs, lows, closes, volumes = (fmt(c[k]) for k in ('open', 'high', 'low', 'close', 'volume'))
+    quote = fmt(c['volume'] * c['close'])
+    taker = fmt(c['volume'] / 2)
+    taker_quote = fmt(c['volume'] * c['close'] / 2)
+    return [
+        [ts[i], opens[i], highs[i], lows[i], closes[i], volumes[i], ts[i] + step_ms - 1,
+         quote[i], 100 + i % 50, taker[i], taker_quote[i], "0"]
+        for i in range(n)
+    ]
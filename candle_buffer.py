@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from kline_parser import KLINE_COLUMNS, columns_to_frame
+
+
+def kline_message_columns(msg: Dict) -> Dict[str, np.ndarray]:
+    """Mengubah pesan websocket kline menjadi kolom satu baris dengan skema get_klines"""
+    k = msg['k']
+    return {
+        'timestamp': np.array([k['t']], dtype=np.int64),
+        'open': np.array([float(k['o'])]),
+        'high': np.array([float(k['h'])]),
+        'low': np.array([float(k['l'])]),
+        'close': np.array([float(k['c'])]),
+        'volume': np.array([float(k['v'])]),
+        'quote_volume': np.array([float(k['q'])]),
+        'taker_buy_volume': np.array([float(k['V'])]),
+        'trades': np.array([k['n']], dtype=np.int64)
+    }
+
+
+class CandleRingBuffer:
+    """Ring buffer candle berukuran tetap untuk satu stream simbol/interval"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in KLINE_COLUMNS.items()}
+        self._head = 0  # posisi tulis berikutnya
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        if self._count == 0:
+            return None
+        return int(self._columns['timestamp'][(self._head - 1) % self.capacity])
+
+    def extend(self, columns: Dict[str, np.ndarray]):
+        """Menambahkan candle berurutan; candle dengan open time sama dengan candle terakhir ditimpa"""
+        ts = np.asarray(columns['timestamp'], dtype=np.int64)
+        with self._lock:
+            for i in range(len(ts)):
+                last = self.last_open_time
+                if last is not None and ts[i] < last:
+                    continue
+                if last is not None and ts[i] == last:
+                    pos = (self._head - 1) % self.capacity
+                else:
+                    pos = self._head
+                    self._head = (self._head + 1) % self.capacity
+                    self._count = min(self._count + 1, self.capacity)
+                for name, values in self._columns.items():
+                    values[pos] = columns[name][i]
+
+    def extend_frame(self, df: pd.DataFrame):
+        """Menambahkan DataFrame hasil get_klines"""
+        if df.empty:
+            return
+        columns = {name: df[name].to_numpy() for name in KLINE_COLUMNS if name != 'timestamp'}
+        columns['timestamp'] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        self.extend(columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Salinan isi buffer dalam urutan kronologis"""
+        with self._lock:
+            if self._count < self.capacity:
+                columns = {name: values[:self._count].copy() for name, values in self._columns.items()}
+            else:
+                columns = {name: np.concatenate((values[self._head:], values[:self._head]))
+                           for name, values in self._columns.items()}
+        return columns_to_frame(columns)
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: tanpa kunci antar-proses, hanya satu proses yang boleh menulis penyimpanan
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from backfill import INTERVAL_MS
+from kline_parser import KLINE_COLUMNS, columns_to_frame
+
+logger = logging.getLogger("CryptoTrader")
+
+# Skema kolom candle: setiap kolom disimpan sebagai file biner mentah terpisah
+CANDLE_COLUMNS = KLINE_COLUMNS
+
+
+class CandleStore:
+    """Penyimpanan candle OHLCV lokal berbasis kolom (memory-mapped) per simbol dan interval
+
+    Beberapa instance dan proses (sesi app, daemon, CLI) boleh memakai direktori yang sama:
+    setiap seri punya file kunci (fcntl), eksklusif untuk menulis dan bersama untuk membaca.
+    """
+
+    def __init__(self, root_dir: str = "candle_store"):
+        self.root_dir = root_dir
+        self._lock = threading.RLock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol.upper()}_{interval}")
+
+    @contextmanager
+    def _series_lock(self, symbol: str, interval: str, shared: bool = False):
+        """Kunci thread dan antar-proses satu seri; dilepas saat file kunci ditutup (tidak reentrant)"""
+        with self._lock, open(self._series_dir(symbol, interval) + ".lock", 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+
+    def _column_path(self, symbol: str, interval: str, column: str) -> str:
+        return os.path.join(self._series_dir(symbol, interval), f"{column}.bin")
+
+    def _ensure_series(self, symbol: str, interval: str):
+        """Membuat direktori seri dan mereset seri jika skema kolom berubah"""
+        series_dir = self._series_dir(symbol, interval)
+        meta_path = os.path.join(series_dir, "meta.json")
+        schema = {name: np.dtype(dtype).str for name, dtype in CANDLE_COLUMNS.items()}
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f).get('columns') == schema:
+                    return
+            logger.warning(f"Candle store schema changed for {symbol} {interval}, resetting series")
+
+        os.makedirs(series_dir, exist_ok=True)
+        for column in CANDLE_COLUMNS:
+            open(self._column_path(symbol, interval, column), 'wb').close()
+        with open(meta_path, 'w') as f:
+            json.dump({'symbol': symbol.upper(), 'interval': interval, 'columns': schema}, f)
+
+    def length(self, symbol: str, interval: str) -> int:
+        """Jumlah candle yang tersimpan (kolom terpendek jika penulisan sempat terputus)"""
+        with self._series_lock(symbol, interval, shared=True):
+            return self._length(symbol, interval)
+
+    def _length(self, symbol: str, interval: str) -> int:
+        if not os.path.isdir(self._series_dir(symbol, interval)):
+            return 0
+        lengths = []
+        for column, dtype in CANDLE_COLUMNS.items():
+            path = self._column_path(symbol, interval, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    def _open_column(self, symbol: str, interval: str, column: str, length: int) -> np.ndarray:
+        if length == 0:
+            return np.empty(0, dtype=CANDLE_COLUMNS[column])
+        return np.memmap(self._column_path(symbol, interval, column),
+                         dtype=CANDLE_COLUMNS[column], mode='r', shape=(length,))
+
+    def first_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Open time (ms) candle tertua yang tersimpan"""
+        with self._series_lock(symbol, interval, shared=True):
+            n = self._length(symbol, interval)
+            if n == 0:
+                return None
+            return int(self._open_column(symbol, interval, 'timestamp', n)[0])
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Open time (ms) candle terbaru yang tersimpan"""
+        with self._series_lock(symbol, interval, shared=True):
+            n = self._length(symbol, interval)
+            if n == 0:
+                return None
+            return int(self._open_column(symbol, interval, 'timestamp', n)[-1])
+
+    def read(self, symbol: str, interval: str, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Membaca `limit` candle terakhir sebagai kolom NumPy (salinan dari memory-map)"""
+        with self._series_lock(symbol, interval, shared=True):
+            n = self._length(symbol, interval)
+            start = max(0, n - limit) if limit else 0
+            return {
+                column: np.array(self._open_column(symbol, interval, column, n)[start:])
+                for column in CANDLE_COLUMNS
+            }
+
+    def read_frame(self, symbol: str, interval: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Membaca candle tersimpan dalam format DataFrame yang sama dengan get_klines"""
+        return columns_to_frame(self.read(symbol, interval, limit))
+
+    def write(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]) -> bool:
+        """Menggabungkan candle baru ke penyimpanan berdasarkan open time (candle dengan open time sama ditimpa)
+
+        Candle tersimpan di luar rentang data baru tidak pernah dibuang. Data yang berjarak
+        lebih dari satu candle dari kepala/ekor seri ditolak agar seri tetap bersambung;
+        mengembalikan False jika ditolak.
+        """
+        new_ts = np.asarray(columns['timestamp'], dtype=np.int64)
+        if len(new_ts) == 0:
+            return True
+
+        # Urut berdasarkan open time; untuk open time ganda kemunculan terakhir yang dipakai
+        _, last_index = np.unique(new_ts[::-1], return_index=True)
+        order = len(new_ts) - 1 - last_index
+        new = {column: np.asarray(columns[column], dtype=dtype)[order]
+               for column, dtype in CANDLE_COLUMNS.items()}
+        new_ts = new['timestamp']
+        step = INTERVAL_MS.get(interval)
+
+        with self._series_lock(symbol, interval):
+            self._ensure_series(symbol, interval)
+            n = self._length(symbol, interval)
+            if n == 0:
+                self._append(symbol, interval, new, 0)
+                return True
+
+            stored_ts = np.array(self._open_column(symbol, interval, 'timestamp', n))
+            first_open, last_open = int(stored_ts[0]), int(stored_ts[-1])
+            if step is not None and (new_ts[0] > last_open + step or new_ts[-1] < first_open - step):
+                logger.warning(f"Candles for {symbol} {interval} not contiguous with stored series, not stored")
+                return False
+
+            if new_ts[0] > last_open:
+                # Jalur cepat: semua candle baru setelah candle terakhir, tambahkan di akhir file
+                self._append(symbol, interval, new, n)
+                return True
+
+            keep = int(np.searchsorted(stored_ts, new_ts[0], side='left'))
+            if new_ts[-1] >= last_open and np.isin(stored_ts[keep:], new_ts).all():
+                # Ekor tersimpan seluruhnya tercakup data baru: potong lalu tambahkan
+                self._append(symbol, interval, new, keep)
+                return True
+
+            position = np.minimum(np.searchsorted(stored_ts, new_ts, side='left'), n - 1)
+            if (stored_ts[position] == new_ts).all() and position[-1] - position[0] == len(new_ts) - 1:
+                # Semua candle baru sudah ada berurutan di dalam seri: timpa di tempat
+                self._overwrite(symbol, interval, new, int(position[0]))
+                return True
+
+            # Jalur lambat (data lebih tua dari awal seri atau candle baru di tengah): gabung dan tulis ulang
+            old = {column: np.array(self._open_column(symbol, interval, column, n))
+                   for column in CANDLE_COLUMNS}
+            merged_ts = np.concatenate([new_ts, old['timestamp']])
+            # np.unique mengambil kemunculan pertama, jadi data baru menang atas data lama
+            _, index = np.unique(merged_ts, return_index=True)
+            for column in CANDLE_COLUMNS:
+                merged = np.concatenate([new[column], old[column]])[index]
+                path = self._column_path(symbol, interval, column)
+                with open(path + ".tmp", 'wb') as f:
+                    f.write(merged.tobytes())
+                os.replace(path + ".tmp", path)
+            return True
+
+    def _append(self, symbol: str, interval: str, new: Dict[str, np.ndarray], keep: int):
+        """Memotong setiap kolom menjadi `keep` candle lalu menambahkan data baru"""
+        for column in CANDLE_COLUMNS:
+            with open(self._column_path(symbol, interval, column), 'r+b') as f:
+                f.truncate(keep * new[column].itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(new[column].tobytes())
+
+    def _overwrite(self, symbol: str, interval: str, new: Dict[str, np.ndarray], position: int):
+        """Menimpa candle mulai indeks `position` tanpa mengubah panjang seri"""
+        for column in CANDLE_COLUMNS:
+            with open(self._column_path(symbol, interval, column), 'r+b') as f:
+                f.seek(position * new[column].itemsize)
+                f.write(new[column].tobytes())
+
+    def write_frame(self, symbol: str, interval: str, df: pd.DataFrame) -> bool:
+        """Menyimpan DataFrame hasil get_klines"""
+        if df.empty:
+            return True
+        columns = {column: df[column].to_numpy() for column in CANDLE_COLUMNS if column != 'timestamp'}
+        columns['timestamp'] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        return self.write(symbol, interval, columns)
+
+    def clear(self, symbol: str, interval: str):
+        """Menghapus seluruh candle tersimpan untuk simbol dan interval"""
+        with self._series_lock(symbol, interval):
+            for column in CANDLE_COLUMNS:
+                path = self._column_path(symbol, interval, column)
+                if os.path.exists(path):
+                    open(path, 'wb').close()
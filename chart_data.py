@@ -0,0 +1,261 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Titik maksimum per trace yang dikirim ke browser
+DEFAULT_MAX_POINTS = 2000
+
+# Overlay garis yang digambar app (diturunkan dengan LTTB, bukan agregasi)
+LINE_COLUMNS = ['EMA_FAST', 'EMA_SLOW', 'GRID_UP', 'CENTER', 'GRID_LOW', 'RSI', 'MACD', 'DIF', 'DEA']
+
+_OHLC_COLUMNS = ['open', 'high', 'low', 'close']
+
+
+def bucket_edges(timestamps: np.ndarray, bucket_ms: int) -> np.ndarray:
+    """Indeks awal setiap bucket waktu (ditambah panjang data di akhir); bucket disejajarkan ke epoch"""
+    keys = timestamps // bucket_ms
+    return np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1, [len(keys)])).astype(np.int64)
+
+
+def ohlc_buckets(timestamps: np.ndarray, columns: Dict[str, np.ndarray], edges: np.ndarray) -> Dict[str, np.ndarray]:
+    """Satu candle per bucket: open pertama, high maksimum, low minimum, close terakhir"""
+    starts = edges[:-1]
+    if len(starts) == 0:
+        return {name: np.empty(0) for name in ['timestamp'] + _OHLC_COLUMNS}
+    return {
+        'timestamp': timestamps[starts],
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][edges[1:] - 1]
+    }
+
+
+def lttb_select(x: np.ndarray, y: np.ndarray, edges: np.ndarray, start_bucket: int = 0,
+                previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: satu indeks titik per bucket mulai dari `start_bucket`
+
+    `y` boleh 2-D (garis x waktu): semua garis diproses bersamaan dalam satu loop bucket.
+    Bucket pertama memakai titik pertamanya dan bucket terakhir titik terakhirnya; bucket
+    lain memilih titik yang membentuk segitiga terbesar dengan titik terpilih sebelumnya
+    (`previous`, per garis) dan rata-rata bucket berikutnya. NaN (mis. periode warm-up
+    indikator) tidak pernah menang kecuali seluruh kandidat NaN.
+    """
+    values = np.atleast_2d(y)
+    rows = np.arange(values.shape[0])
+    count = len(edges) - 1
+    selected = np.empty((len(rows), max(count - start_bucket, 0)), dtype=np.int64)
+    if selected.shape[1] == 0:
+        return selected[0] if y.ndim == 1 else selected
+
+    offset = int(edges[start_bucket])
+    starts = edges[start_bucket:-1] - offset
+    sizes = np.diff(edges[start_bucket:])
+    if (sizes == 1).all():
+        # Satu bar per bucket: semua titik terpilih
+        selected[:] = edges[start_bucket:-1]
+        return selected[0] if y.ndim == 1 else selected
+
+    # Rata-rata setiap bucket sekaligus (NaN ikut merambat seperti mean biasa)
+    x_mean = np.add.reduceat(x[offset:edges[-1]], starts) / sizes
+    y_mean = np.add.reduceat(values[:, offset:edges[-1]], starts, axis=1) / sizes
+    a = previous
+    for j, i in enumerate(range(start_bucket, count)):
+        lo, hi = edges[i], edges[i + 1]
+        if a is None or hi - lo == 1:
+            chosen = np.full(len(rows), lo)
+        elif i == count - 1:
+            chosen = np.full(len(rows), hi - 1)
+        else:
+            xa, ya = x[a], values[rows, a]
+            segment = values[:, lo:hi]
+            area = np.abs((xa - x_mean[j + 1])[:, None] * (segment - ya[:, None]) -
+                          (xa[:, None] - x[lo:hi]) * (y_mean[:, j + 1] - ya)[:, None])
+            # Luas selalu >= 0, jadi -1 menandai kandidat NaN
+            area = np.where(np.isnan(area), -1.0, area)
+            best = area.argmax(axis=1)
+            undefined = area[rows, best] < 0
+            if undefined.any():
+                # Titik sebelumnya/bucket berikutnya NaN: ambil titik valid pertama agar garis tetap tersambung
+                best[undefined] = (~np.isnan(segment[undefined])).argmax(axis=1)
+            chosen = lo + best
+        selected[:, j] = chosen
+        a = chosen
+    return selected[0] if y.ndim == 1 else selected
+
+
+def frame_columns(df: pd.DataFrame, lines: List[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Timestamp (ms) dan kolom float yang dibutuhkan grafik dari DataFrame hasil analisis"""
+    timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    columns = {name: df[name].to_numpy(dtype=np.float64) for name in _OHLC_COLUMNS + lines if name in df}
+    return timestamps, columns
+
+
+class ChartSeries:
+    """Data grafik terdownsample (OHLC per bucket, LTTB per garis) untuk riwayat panjang
+
+    Bucket disejajarkan ke waktu, jadi update real-time hanya menghitung ulang bucket mulai
+    bar pertama yang berubah (biasanya candle terakhir yang sedang terbentuk); riwayat yang
+    tidak cocok (simbol lain, mundur waktu) dibangun ulang.
+    """
+
+    def __init__(self, max_points: int = DEFAULT_MAX_POINTS, lines: Optional[List[str]] = None):
+        self.max_points = max_points
+        self.lines = list(lines or LINE_COLUMNS)
+        # Data resolusi penuh dalam buffer berkapasitas lebih (append tanpa menyalin seluruh riwayat);
+        # overlay disimpan sebagai satu array 2-D (garis x waktu) agar LTTB memproses semuanya sekaligus
+        self._size = 0
+        self._timestamps = np.empty(0, dtype=np.int64)
+        self._ohlc: Dict[str, np.ndarray] = {}
+        self._line_names: List[str] = []
+        self._values = np.empty((0, 0))
+        self.step_ms = 0
+        self.bucket_ms = 0
+        self._edges = np.zeros(1, dtype=np.int64)
+        self._candles: Dict[str, np.ndarray] = {}
+        self._selected = np.empty((0, 0), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        columns = {name: values[:self._size] for name, values in self._ohlc.items()}
+        columns.update({name: self._values[i, :self._size] for i, name in enumerate(self._line_names)})
+        return columns
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Menambahkan bar baru dari DataFrame analisis; mengembalikan jumlah bar yang diproses"""
+        if df.empty:
+            return 0
+        timestamps, columns = frame_columns(df, self.lines)
+        if self._size == 0 or timestamps[-1] < self.timestamps[-1] or \
+                timestamps[0] > self.timestamps[-1] or set(columns) != set(self.columns):
+            self._rebuild(timestamps, columns)
+            return len(timestamps)
+
+        new = self._first_changed(timestamps, columns)
+        if new == len(timestamps):
+            return 0
+        keep = int(np.searchsorted(self.timestamps, timestamps[new], side='left'))
+        self._store(keep, timestamps[new:], {name: values[new:] for name, values in columns.items()})
+
+        if self._bucket_count(self._size) > 2 * self.max_points:
+            # Riwayat tumbuh melewati dua kali target: bucket diperlebar
+            self._rebuild(self.timestamps, self.columns)
+        else:
+            self._refresh_tail(keep)
+        return len(timestamps) - new
+
+    def _first_changed(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]) -> int:
+        """Posisi bar pertama di data baru yang belum tersimpan atau nilainya berubah
+
+        Bukan hanya candle terakhir: denoising wavelet non-kausal mengubah DIF/DEA/MACD bar
+        lama (repaint) dan EMA dari ring buffer bergeser saat candle tertua keluar.
+        """
+        stored = self.timestamps
+        position = np.searchsorted(stored, timestamps)
+        clipped = np.minimum(position, len(stored) - 1)
+        same = (position < len(stored)) & (stored[clipped] == timestamps)
+        for name, values in self.columns.items():
+            old = values[clipped]
+            column = columns[name]
+            same &= (old == column) | (np.isnan(old) & np.isnan(column))
+        changed = np.flatnonzero(~same)
+        return int(changed[0]) if len(changed) else len(timestamps)
+
+    def _store(self, keep: int, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Menulis bar baru setelah `keep` bar pertama, menggandakan kapasitas bila perlu"""
+        size = keep + len(timestamps)
+        if size > len(self._timestamps):
+            capacity = max(size, 2 * len(self._timestamps))
+            grown = np.empty(capacity, dtype=np.int64)
+            grown[:keep] = self._timestamps[:keep]
+            self._timestamps = grown
+            for name in _OHLC_COLUMNS:
+                grown = np.empty(capacity)
+                grown[:keep] = self._ohlc[name][:keep]
+                self._ohlc[name] = grown
+            grown = np.empty((len(self._line_names), capacity))
+            grown[:, :keep] = self._values[:, :keep]
+            self._values = grown
+        self._timestamps[keep:size] = timestamps
+        for name in _OHLC_COLUMNS:
+            self._ohlc[name][keep:size] = columns[name]
+        for i, name in enumerate(self._line_names):
+            self._values[i, keep:size] = columns[name]
+        self._size = size
+
+    def _rebuild(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        self._size = 0
+        self._timestamps = np.empty(0, dtype=np.int64)
+        self._ohlc = {name: np.empty(0) for name in _OHLC_COLUMNS}
+        self._line_names = [name for name in self.lines if name in columns]
+        self._values = np.empty((len(self._line_names), 0))
+        self._store(0, timestamps, columns)
+
+        self.step_ms = int(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 60_000
+        self.bucket_ms = self.step_ms * max(1, math.ceil(len(timestamps) / self.max_points))
+        self._edges = np.zeros(1, dtype=np.int64)
+        self._candles = {}
+        self._selected = np.empty((len(self._line_names), 0), dtype=np.int64)
+        self._refresh_tail(0)
+
+    def _bucket_count(self, n: int) -> int:
+        return math.ceil(n * self.step_ms / self.bucket_ms) if self.bucket_ms else n
+
+    def _refresh_tail(self, first_changed: int):
+        """Menghitung ulang bucket mulai satu sebelum bucket yang memuat bar `first_changed`"""
+        old_edges = self._edges
+        # Pilihan LTTB sebuah bucket bergantung pada rata-rata bucket berikutnya
+        bucket = max(int(np.searchsorted(old_edges[:-1], first_changed, side='right')) - 2, 0)
+        start = int(old_edges[bucket]) if bucket < len(old_edges) - 1 else 0
+        timestamps = self.timestamps
+        tail_edges = bucket_edges(timestamps[start:], self.bucket_ms) + start
+        self._edges = np.concatenate((old_edges[:bucket], tail_edges))
+
+        tail = ohlc_buckets(timestamps[start:], {name: self._ohlc[name][start:self._size] for name in _OHLC_COLUMNS},
+                            tail_edges - start)
+        self._candles = {name: np.concatenate((self._candles[name][:bucket], values)) if self._candles else values
+                         for name, values in tail.items()}
+
+        kept = self._selected[:, :bucket]
+        previous = kept[:, -1] if kept.shape[1] else None
+        self._selected = np.concatenate(
+            (kept, lttb_select(timestamps, self._values[:, :self._size], self._edges, bucket, previous)), axis=1)
+
+    def view(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict:
+        """Data siap gambar untuk rentang waktu: {'candles': {...}, 'lines': {kolom: (x, y)}}
+
+        Rentang yang cukup lebar memakai bucket tersimpan; rentang sempit (zoom) diturunkan
+        ulang dari data resolusi penuh agar detailnya tetap terlihat.
+        """
+        timestamps = self.timestamps
+        if len(timestamps) == 0:
+            return {'candles': ohlc_buckets(timestamps, {}, np.zeros(1, dtype=np.int64)), 'lines': {}}
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+        hi = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='right'))
+
+        if self._bucket_count(hi - lo) >= self.max_points // 2:
+            # Bucket tersimpan yang beririsan dengan rentang
+            first = max(int(np.searchsorted(self._edges, lo, side='right')) - 1, 0)
+            last = int(np.searchsorted(self._edges, hi, side='left'))
+            candles = {name: values[first:last] for name, values in self._candles.items()}
+            selected = self._selected[:, first:last]
+        else:
+            bucket_ms = self.step_ms * max(1, math.ceil((hi - lo) / self.max_points))
+            edges = bucket_edges(timestamps[lo:hi], bucket_ms)
+            candles = ohlc_buckets(timestamps[lo:hi], {name: self._ohlc[name][lo:hi] for name in _OHLC_COLUMNS},
+                                   edges)
+            selected = lttb_select(timestamps[lo:hi], self._values[:, lo:hi], edges) + lo
+
+        candles['timestamp'] = candles['timestamp'].astype('datetime64[ms]')
+        lines = {name: (timestamps[idx].astype('datetime64[ms]'), self._values[i, idx])
+                 for i, (name, idx) in enumerate(zip(self._line_names, selected))}
+        return {'candles': candles, 'lines': lines}
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Label rekomendasi; posisi di daftar ini adalah kode int8 pada kolom RECOMMENDATION kategorikal
+RECOMMENDATION_LABELS = ["TUNGGU / NO TRADE", "BUY SEKARANG", "SELL SEKARANG"]
+
+# Kolom indikator yang ditambahkan calculate_indicators (urutan seperti pada mode biasa)
+INDICATOR_COLUMNS = ['EMA_FAST', 'EMA_SLOW', 'RSI', 'ADX', 'ATR', 'VOL_SMA', 'DIF', 'DEA', 'MACD',
+                     'CENTER', 'GRID_LOW', 'GRID_UP']
+
+# Kolom harga yang boleh diminta dalam frame ringkas (disimpan float32 juga)
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Kolom default frame ringkas
+COMPACT_COLUMNS = PRICE_COLUMNS + INDICATOR_COLUMNS + ['RECOMMENDATION']
+
+# Kategori kolom side pada tabel peringkat scanner
+SIDE_LABELS = ["BUY", "SELL"]
+
+
+def recommendation_codes(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    """Kode int8 rekomendasi per bar (indeks RECOMMENDATION_LABELS); beli didahulukan seperti np.where"""
+    codes = np.zeros(len(buy), dtype=np.int8)
+    codes[sell] = 2
+    codes[buy] = 1
+    return codes
+
+
+def recommendation_categorical(codes: np.ndarray) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, categories=RECOMMENDATION_LABELS)
+
+
+def compact_ranking(result: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Tabel peringkat scanner dalam tata letak ringkas (salinan baru, bukan view)
+
+    Kolom float menjadi float32, score int8, recommendation dan side kategorikal (kode int8);
+    `columns` memproyeksikan tabel dengan symbol selalu di depan.
+    """
+    columns = [c for c in (columns or result.columns) if c != 'symbol']
+    unknown = [c for c in columns if c not in result.columns]
+    if unknown:
+        raise ValueError(f"Unknown compact columns: {unknown}")
+    compact = {'symbol': result['symbol'].to_numpy()}
+    for name in columns:
+        values = result[name]
+        if name == 'recommendation':
+            compact[name] = pd.Categorical(values, categories=RECOMMENDATION_LABELS)
+        elif name == 'side':
+            compact[name] = pd.Categorical(values, categories=SIDE_LABELS)
+        elif name == 'score':
+            compact[name] = values.to_numpy(dtype=np.int8)
+        elif values.dtype == np.float64:
+            compact[name] = values.to_numpy(dtype=np.float32)
+        else:
+            compact[name] = values.to_numpy()
+    return pd.DataFrame(compact)
+
+
+class CompactFrameBuffer:
+    """Blok float32 kontigu (kolom x kapasitas) yang dipakai ulang untuk frame indikator ringkas
+
+    Frame yang dikembalikan adalah view ke blok ini tanpa salinan, jadi isinya berubah saat
+    buffer dipakai lagi; salin (df.copy()) jika frame perlu disimpan lebih lama dari itu.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None):
+        columns = list(columns or COMPACT_COLUMNS)
+        unknown = [c for c in columns if c not in PRICE_COLUMNS + INDICATOR_COLUMNS + ['RECOMMENDATION']]
+        if unknown:
+            raise ValueError(f"Unknown compact columns: {unknown}")
+        self.columns = columns
+        self.float_columns: List[str] = [c for c in columns if c != 'RECOMMENDATION']
+        self._block = np.empty((len(self.float_columns), 0), dtype=np.float32)
+
+    def frame(self, timestamps: np.ndarray, values: Dict[str, np.ndarray],
+              codes: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Mengisi blok dengan nilai kolom (float64 dikonversi ke float32) lalu membungkusnya sebagai DataFrame"""
+        n = len(timestamps)
+        if self._block.shape[1] < n:
+            # Kapasitas digandakan agar riwayat yang tumbuh sedikit demi sedikit tidak realokasi setiap panggilan
+            self._block = np.empty((len(self.float_columns), max(n, 2 * self._block.shape[1])), dtype=np.float32)
+        block = self._block[:, :n]
+        for i, name in enumerate(self.float_columns):
+            block[i] = values[name]
+
+        df = pd.DataFrame(block.T, columns=self.float_columns, copy=False)
+        df.insert(0, 'timestamp', timestamps)
+        if 'RECOMMENDATION' in self.columns:
+            df['RECOMMENDATION'] = recommendation_categorical(codes)
+        return df
@@ -0,0 +1,458 @@
+"""Daemon analisis headless: satu proses memegang koneksi Binance dan loop analisis per simbol,
+hasilnya diterbitkan ke banyak konsumen lewat HTTP/WebSocket lokal
+
+Jalankan:
+    python daemon.py BTCUSDT:M5 ETHUSDT:M15 [--host 127.0.0.1] [--port 8765] [--testnet]
+
+API (JSON):
+    GET    /streams                   daftar stream (versi, candle terakhir, jumlah konsumen)
+    POST   /streams                   {"symbol": "BTCUSDT", "interval": "M5", "client": id} -> {"stream": nama}
+    GET    /streams/{nama}?after=N&epoch=E&client=id
+                                      snapshot stream; 204 jika versinya masih (E, N)
+    DELETE /streams/{nama}?client=id  melepas lease klien (tanpa client: hentikan stream)
+    GET    /metrics                   histogram latensi (format Prometheus)
+    GET    /ws?streams=a,b            WebSocket: snapshot lalu delta setiap analisis baru
+
+Pesan WebSocket: {"type": "snapshot"|"delta", "stream", "seq", "analysis", "rows", ...}. `rows`
+berisi kolom ekor indikator; delta hanya membawa baris mulai baris pertama yang berubah
+(baris dengan timestamp >= baris pertama delta diganti, lihat daemon_client.apply_delta).
+seq naik satu per analisis; konsumen yang melihat seq meloncat mengirim {"op": "snapshot"}.
+`epoch` berbeda untuk setiap stream yang dimulai (juga setelah daemon restart), jadi seq yang
+mundur dengan epoch baru berarti hitungan versi dimulai ulang.
+Perintah konsumen: {"op": "subscribe"|"unsubscribe"|"snapshot", "streams": [nama, ...]}.
+
+Stream dari POST dengan "client" dipegang lease yang diperpanjang setiap polling klien itu;
+stream tanpa lease aktif maupun konsumen WebSocket dihentikan setelah LEASE_SECONDS. Stream
+dari baris perintah atau POST tanpa "client" berjalan sampai DELETE tanpa client.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from aiohttp import web, WSMsgType
+
+from async_backend import AsyncCryptoTradingSystem, stream_name
+from backend import INTERVAL_MAP
+from backfill import INTERVAL_MS
+from daemon_client import TAIL_COLUMNS, DEFAULT_TAIL
+from metrics import REGISTRY
+
+logger = logging.getLogger("CryptoTrader")
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Candle yang dianalisis per stream (ring buffer)
+DEFAULT_LIMIT = 500
+
+# Pesan yang boleh menumpuk untuk satu konsumen lambat sebelum diganti snapshot terbaru
+MAX_PENDING_MESSAGES = 256
+
+# Interval ping WebSocket (detik) untuk mendeteksi konsumen yang hilang
+WS_HEARTBEAT = 30.0
+
+# Lease stream klien polling (detik): klien yang berhenti polling melepas stream setelah ini
+LEASE_SECONDS = 60.0
+
+
+def to_jsonable(value):
+    """Nilai analysis (tipe numpy/pandas) menjadi tipe JSON; NaN menjadi null"""
+    if isinstance(value, dict):
+        return {key: to_jsonable(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return int(pd.Timestamp(value).value // 1_000_000)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _column_json(column: np.ndarray) -> List:
+    if column.dtype.kind == 'f':
+        return np.where(np.isnan(column), None, column).tolist()
+    return column.tolist()
+
+
+class StreamTopic:
+    """Hasil terakhir satu stream untuk konsumen: analysis dan ekor indikator, serta delta antar versi
+
+    Pesan di-serialisasi sekali per analysis dan dikirim apa adanya ke setiap konsumen,
+    sehingga biaya per analysis tidak tumbuh dengan jumlah konsumen selain pengiriman.
+    """
+
+    def __init__(self, name: str, symbol: str, interval: str, tail: int = DEFAULT_TAIL):
+        self.name = name
+        self.symbol = symbol
+        self.interval = interval
+        self.tail = tail
+        self.seq = 0
+        # Penanda instance stream: seq dimulai dari 1 lagi untuk stream baru/daemon yang di-restart
+        self.epoch = uuid.uuid4().hex
+        self.analysis: Dict = {}
+        self.rows: Dict[str, np.ndarray] = {}
+        self._snapshot: Optional[str] = None
+
+    @property
+    def candle_time(self) -> Optional[int]:
+        timestamps = self.rows.get('timestamp')
+        return int(timestamps[-1]) if timestamps is not None and len(timestamps) else None
+
+    def update(self, df: pd.DataFrame, analysis: Dict) -> str:
+        """Menyimpan hasil analisis baru; mengembalikan pesan delta (JSON)"""
+        rows = self._tail_columns(df)
+        start = self._first_changed(rows)
+        self.rows = rows
+        self.analysis = to_jsonable(analysis)
+        self.seq += 1
+        self._snapshot = None
+        return self._message('delta', start)
+
+    def snapshot(self) -> str:
+        """Pesan snapshot (JSON) versi terakhir, dibuat sekali per versi"""
+        if self._snapshot is None:
+            self._snapshot = self._message('snapshot', 0)
+        return self._snapshot
+
+    def info(self) -> Dict:
+        return {'stream': self.name, 'symbol': self.symbol, 'interval': self.interval,
+                'epoch': self.epoch, 'seq': self.seq, 'candle_time': self.candle_time}
+
+    def _message(self, kind: str, start: int) -> str:
+        return json.dumps({
+            'type': kind,
+            **self.info(),
+            'tail': self.tail,
+            'analysis': self.analysis,
+            'rows': {name: _column_json(column[start:]) for name, column in self.rows.items()}
+        })
+
+    def _tail_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        tail = df.iloc[-self.tail:]
+        rows = {'timestamp': tail['timestamp'].to_numpy('datetime64[ms]').astype(np.int64)}
+        for name in TAIL_COLUMNS:
+            if name in tail:
+                rows[name] = tail[name].to_numpy(dtype=np.float64)
+        if 'RECOMMENDATION' in tail:
+            rows['RECOMMENDATION'] = tail['RECOMMENDATION'].astype(str).to_numpy()
+        return rows
+
+    def _first_changed(self, rows: Dict[str, np.ndarray]) -> int:
+        """Posisi baris pertama yang baru atau nilainya berubah dibanding versi sebelumnya
+
+        Denoising wavelet non-kausal mengubah nilai bar lama (repaint), jadi delta
+        tidak selalu hanya bar terakhir.
+        """
+        previous = self.rows
+        timestamps = rows['timestamp']
+        if not previous or len(previous['timestamp']) == 0 or previous.keys() != rows.keys():
+            return 0
+        old_timestamps = previous['timestamp']
+        position = np.searchsorted(old_timestamps, timestamps)
+        clipped = np.minimum(position, len(old_timestamps) - 1)
+        same = (position < len(old_timestamps)) & (old_timestamps[clipped] == timestamps)
+        for name, column in rows.items():
+            old = previous[name][clipped]
+            if column.dtype.kind == 'f':
+                same &= (old == column) | (np.isnan(old) & np.isnan(column))
+            else:
+                same &= old == column
+        changed = np.flatnonzero(~same)
+        return int(changed[0]) if len(changed) else len(timestamps)
+
+
+class _Consumer:
+    """Satu koneksi WebSocket: stream yang diikuti dan pesan yang belum terkirim"""
+
+    def __init__(self, ws: web.WebSocketResponse):
+        self.ws = ws
+        self.streams: Set[str] = set()
+        self.pending = deque()
+        self.ready = asyncio.Event()
+
+    def push(self, text: str):
+        self.pending.append(text)
+        self.ready.set()
+
+
+class AnalysisDaemon:
+    """Menerbitkan hasil AsyncCryptoTradingSystem ke konsumen HTTP/WebSocket
+
+    Setiap stream (simbol, interval) dianalisis sekali per candle close apa pun jumlah
+    konsumennya. Konsumen WebSocket menerima snapshot saat berlangganan lalu delta berurutan;
+    konsumen yang tertinggal lebih dari `max_pending` pesan menerima snapshot terbaru sebagai
+    gantinya, sehingga konsumen lambat tidak menahan yang lain maupun loop analisis.
+    Stream yang dimulai klien polling dihentikan setelah lease semua kliennya habis.
+    """
+
+    def __init__(self, system: AsyncCryptoTradingSystem, tail: int = DEFAULT_TAIL, limit: int = DEFAULT_LIMIT,
+                 max_pending: int = MAX_PENDING_MESSAGES, lease_seconds: float = LEASE_SECONDS):
+        self.system = system
+        self.tail = tail
+        self.limit = limit
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.topics: Dict[str, StreamTopic] = {}
+        # Lease per stream (klien -> batas waktu monotonic); stream tanpa klien tidak pernah kedaluwarsa
+        self._leases: Dict[str, Dict[str, float]] = {}
+        self._pinned: Set[str] = set()
+        self._consumers: Set[_Consumer] = set()
+        # Subscribe/unsubscribe berurutan agar permintaan bersamaan untuk stream sama tidak dobel
+        self._lock = asyncio.Lock()
+        self.stats = {'published': 0, 'sent': 0, 'resyncs': 0}
+
+    async def start_stream(self, symbol: str, interval: str, client: Optional[str] = None) -> str:
+        """Mulai menganalisis simbol/interval (tidak berefek jika sudah berjalan); nama stream
+
+        Dengan `client`, stream dipegang lease klien itu; tanpa client stream berjalan terus.
+        """
+        binance_interval = INTERVAL_MAP.get(interval, interval)
+        if binance_interval not in INTERVAL_MS:
+            raise ValueError(f"Unknown interval: {interval}")
+        name = stream_name(symbol, binance_interval)
+        async with self._lock:
+            if name not in self.topics:
+                await self.system.subscribe([symbol], binance_interval, self._on_analysis, self.limit)
+                self.topics[name] = StreamTopic(name, symbol.upper(), binance_interval, self.tail)
+                # Hasil awal dari riwayat REST, tanpa menunggu candle close berikutnya
+                await self.system.refresh(name)
+            if client is None:
+                self._pinned.add(name)
+            else:
+                self.renew_lease(name, client)
+        return name
+
+    def renew_lease(self, name: str, client: str):
+        self._leases.setdefault(name, {})[client] = time.monotonic() + self.lease_seconds
+
+    async def release_lease(self, name: str, client: str) -> bool:
+        """Melepas lease klien; stream dihentikan jika tidak ada lagi yang memakainya"""
+        if name not in self.topics:
+            return False
+        self._leases.get(name, {}).pop(client, None)
+        await self.stop_stream(name, only_idle=True)
+        return True
+
+    def _idle(self, name: str) -> bool:
+        now = time.monotonic()
+        leases = self._leases.get(name, {})
+        for client in [c for c, expires in leases.items() if expires <= now]:
+            del leases[client]
+        return name not in self._pinned and not leases and \
+            not any(name in consumer.streams for consumer in self._consumers)
+
+    async def _expire_leases(self, app: web.Application):
+        """cleanup_ctx aiohttp: menghentikan stream yang lease-nya habis secara berkala"""
+        async def loop():
+            while True:
+                await asyncio.sleep(self.lease_seconds / 2)
+                for name in list(self.topics):
+                    try:
+                        if await self.stop_stream(name, only_idle=True):
+                            logger.info(f"Daemon stream {name} released: no active leases")
+                    except Exception as e:
+                        logger.error(f"Error releasing daemon stream {name}: {e}")
+
+        task = asyncio.create_task(loop())
+        yield
+        task.cancel()
+
+    async def stop_stream(self, name: str, only_idle: bool = False) -> bool:
+        """Menghentikan stream; only_idle hanya jika tidak ada lease aktif, pin, maupun konsumen WebSocket"""
+        async with self._lock:
+            if name not in self.topics or (only_idle and not self._idle(name)):
+                return False
+            self.topics.pop(name)
+            self._leases.pop(name, None)
+            self._pinned.discard(name)
+            await self.system.unsubscribe([name])
+        closed = json.dumps({'type': 'closed', 'stream': name})
+        for consumer in self._consumers:
+            if name in consumer.streams:
+                consumer.streams.discard(name)
+                consumer.push(closed)
+        logger.info(f"Daemon stream {name} stopped")
+        return True
+
+    def _on_analysis(self, name: str, df: pd.DataFrame, analysis: Dict):
+        topic = self.topics.get(name)
+        if topic is None or df.empty:
+            return
+        delta = topic.update(df, analysis)
+        self.stats['published'] += 1
+        for consumer in self._consumers:
+            if name in consumer.streams:
+                self._send(consumer, delta)
+
+    def _send(self, consumer: _Consumer, text: str):
+        if len(consumer.pending) < self.max_pending:
+            consumer.push(text)
+            return
+        # Konsumen tertinggal: buang delta yang belum terkirim, kirim keadaan terbaru sekali
+        self.stats['resyncs'] += 1
+        consumer.pending.clear()
+        for name in consumer.streams:
+            consumer.push(self.topics[name].snapshot())
+
+    def _subscribe(self, consumer: _Consumer, names: List[str]):
+        for name in names:
+            topic = self.topics.get(name)
+            if topic is None:
+                consumer.push(json.dumps({'type': 'error', 'stream': name, 'message': 'unknown stream'}))
+                continue
+            consumer.streams.add(name)
+            consumer.push(topic.snapshot())
+
+    async def _write(self, consumer: _Consumer):
+        while True:
+            await consumer.ready.wait()
+            consumer.ready.clear()
+            while consumer.pending:
+                await consumer.ws.send_str(consumer.pending.popleft())
+                self.stats['sent'] += 1
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=WS_HEARTBEAT)
+        await ws.prepare(request)
+        consumer = _Consumer(ws)
+        self._consumers.add(consumer)
+        writer = asyncio.create_task(self._write(consumer))
+        try:
+            self._subscribe(consumer, [n for n in request.query.get('streams', '').split(',') if n])
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    command = json.loads(msg.data)
+                    op = command['op']
+                    names = command.get('streams') or [command['stream']]
+                except (ValueError, KeyError, TypeError):
+                    consumer.push(json.dumps({'type': 'error', 'message': 'invalid command'}))
+                    continue
+                if op == 'subscribe':
+                    self._subscribe(consumer, names)
+                elif op == 'unsubscribe':
+                    consumer.streams.difference_update(names)
+                elif op == 'snapshot':
+                    self._subscribe(consumer, [n for n in names if n in consumer.streams])
+                else:
+                    consumer.push(json.dumps({'type': 'error', 'message': f"unknown op: {op}"}))
+        finally:
+            self._consumers.discard(consumer)
+            writer.cancel()
+        return ws
+
+    async def handle_list(self, request: web.Request) -> web.Response:
+        return web.json_response([
+            {**topic.info(), 'consumers': sum(name in c.streams for c in self._consumers)}
+            for name, topic in self.topics.items()
+        ])
+
+    async def handle_start(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+            client = body.get('client')
+            name = await self.start_stream(str(body['symbol']), str(body['interval']),
+                                           str(client) if client is not None else None)
+        except (ValueError, KeyError, TypeError) as e:
+            raise web.HTTPBadRequest(text=f"Invalid stream request: {e}")
+        return web.json_response({'stream': name}, status=201)
+
+    async def handle_snapshot(self, request: web.Request) -> web.Response:
+        topic = self.topics.get(request.match_info['name'])
+        if topic is None:
+            raise web.HTTPNotFound(text="unknown stream")
+        try:
+            after = int(request.query.get('after', -1))
+        except ValueError:
+            raise web.HTTPBadRequest(text="after must be an integer")
+        client = request.query.get('client')
+        if client:
+            self.renew_lease(topic.name, client)
+        # Hanya versi yang sama persis yang dilewati: epoch lain berarti stream/daemon dimulai ulang
+        if topic.seq == after and request.query.get('epoch', topic.epoch) == topic.epoch:
+            return web.Response(status=204)
+        return web.Response(text=topic.snapshot(), content_type='application/json')
+
+    async def handle_stop(self, request: web.Request) -> web.Response:
+        name, client = request.match_info['name'], request.query.get('client')
+        found = await self.release_lease(name, client) if client else await self.stop_stream(name)
+        if not found:
+            raise web.HTTPNotFound(text="unknown stream")
+        return web.Response(status=204)
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=REGISTRY.export(), content_type='text/plain', charset='utf-8')
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/streams', self.handle_list),
+            web.post('/streams', self.handle_start),
+            web.get('/streams/{name}', self.handle_snapshot),
+            web.delete('/streams/{name}', self.handle_stop),
+            web.get('/metrics', self.handle_metrics),
+            web.get('/ws', self.handle_ws),
+        ])
+        app.cleanup_ctx.append(self._expire_leases)
+        return app
+
+
+def parse_stream(spec: str):
+    """'BTCUSDT:M5' -> ('BTCUSDT', 'M5')"""
+    symbol, _, interval = spec.partition(':')
+    return symbol.upper(), interval or 'M5'
+
+
+async def run(streams: List[str], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, testnet: bool = False,
+              causal_wavelet: bool = False, tail: int = DEFAULT_TAIL, limit: int = DEFAULT_LIMIT,
+              journal_dir: Optional[str] = None):
+    # Data pasar publik tidak butuh API key; key dari environment jika tersedia
+    system = await AsyncCryptoTradingSystem.create(
+        os.environ.get('BINANCE_API_KEY'), os.environ.get('BINANCE_API_SECRET'), testnet=testnet,
+        causal_wavelet=causal_wavelet, journal_dir=journal_dir
+    )
+    daemon = AnalysisDaemon(system, tail=tail, limit=limit)
+    runner = web.AppRunner(daemon.make_app())
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        logger.info(f"Analysis daemon listening on http://{host}:{port}")
+        for spec in streams:
+            await daemon.start_stream(*parse_stream(spec))
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await system.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('streams', nargs='*', help="SIMBOL:INTERVAL, mis. BTCUSDT:M5")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--testnet', action='store_true')
+    parser.add_argument('--causal-wavelet', action='store_true')
+    parser.add_argument('--tail', type=int, default=DEFAULT_TAIL)
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--journal-dir', default=None, help="catat setiap analisis ke jurnal keputusan")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.streams, args.host, args.port, args.testnet, args.causal_wavelet, args.tail, args.limit,
+                        args.journal_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
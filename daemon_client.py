@@ -0,0 +1,130 @@
+import json
+import logging
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from compact_frame import PRICE_COLUMNS, INDICATOR_COLUMNS
+
+logger = logging.getLogger("CryptoTrader")
+
+# Kolom ekor indikator yang diterbitkan daemon per stream (ditambah timestamp ms dan RECOMMENDATION)
+TAIL_COLUMNS = PRICE_COLUMNS + INDICATOR_COLUMNS
+
+# Jumlah bar ekor indikator per stream
+DEFAULT_TAIL = 200
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+DEFAULT_TIMEOUT = 10.0
+
+
+def rows_to_frame(rows: Dict[str, List]) -> pd.DataFrame:
+    """Kolom ekor dari pesan daemon (timestamp ms, null untuk NaN) menjadi DataFrame seperti calculate_indicators"""
+    if not rows.get('timestamp'):
+        return pd.DataFrame()
+    df = pd.DataFrame({'timestamp': pd.to_datetime(rows['timestamp'], unit='ms')})
+    for name, values in rows.items():
+        if name == 'timestamp':
+            continue
+        df[name] = values if name == 'RECOMMENDATION' else pd.Series(values, dtype='float64')
+    return df
+
+
+def apply_delta(rows: Dict[str, List], delta: Dict[str, List], tail: int = DEFAULT_TAIL) -> Dict[str, List]:
+    """Menggabungkan baris pesan delta ke kolom ekor: baris dengan timestamp >= baris pertama delta diganti"""
+    if not delta.get('timestamp'):
+        return rows
+    keep = bisect_left(rows.get('timestamp', []), delta['timestamp'][0])
+    return {name: (rows.get(name, [])[:keep] + values)[-tail:] for name, values in delta.items()}
+
+
+class DaemonClient:
+    """Klien HTTP (stdlib) daemon analisis untuk konsumen yang polling, mis. Streamlit
+
+    Antarmuka stream real-time sama dengan CryptoTradingSystem (start_realtime_analysis,
+    get_realtime_result, stop_realtime_analysis), jadi UI bisa memakai salah satunya.
+    Stream dimiliki daemon dan dibagi semua konsumen; klien memegang lease yang diperpanjang
+    setiap polling dan dilepas saat berhenti, sehingga daemon bisa menghentikan stream
+    yang tidak dipakai lagi.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = DEFAULT_TIMEOUT):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.client_id = uuid.uuid4().hex
+        # (epoch, seq, offset versi) terakhir yang sudah diterima per stream: daemon tidak mengirim ulang hasil yang sama
+        self._versions: Dict[str, Tuple[str, int, int]] = {}
+        # Simbol/interval per stream untuk memulai ulang stream yang hilang (daemon restart)
+        self._streams: Dict[str, Tuple[str, str]] = {}
+
+    def _call(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Optional[Dict]]:
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'} if data else {})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = response.read()
+            return response.status, json.loads(payload) if payload else None
+
+    def streams(self) -> List[Dict]:
+        """Stream yang sedang dianalisis daemon beserta versi terakhirnya"""
+        try:
+            return self._call('GET', '/streams')[1] or []
+        except Exception as e:
+            logger.error(f"Error listing daemon streams: {e}")
+            return []
+
+    def start_realtime_analysis(self, symbol: str, interval: str, callback=None, limit: int = 500) -> Optional[str]:
+        """Meminta daemon mengikuti simbol/interval (tidak berefek jika sudah berjalan); nama stream atau None"""
+        try:
+            name = self._call('POST', '/streams', {'symbol': symbol, 'interval': interval,
+                                                   'client': self.client_id})[1]['stream']
+            self._streams[name] = (symbol, interval)
+            return name
+        except Exception as e:
+            logger.error(f"Failed to start daemon stream: {e}")
+            return None
+
+    def get_realtime_result(self, socket_name: str) -> Tuple[int, pd.DataFrame, Dict]:
+        """Versi, DataFrame ekor, dan analisis terakhir stream
+
+        Jika belum ada versi baru sejak panggilan sebelumnya, daemon membalas 204 dan hasilnya
+        berupa versi yang sama dengan DataFrame/analisis kosong (pemanggil membandingkan versi).
+        Versi selalu naik: seq stream dengan epoch baru (daemon restart) dimulai lagi dari 1,
+        jadi ditambahkan ke versi terakhir yang sudah dikembalikan.
+        """
+        epoch, after, offset = self._versions.get(socket_name, ('', 0, 0))
+        try:
+            query = urllib.parse.urlencode({'after': after, 'epoch': epoch, 'client': self.client_id})
+            status, snapshot = self._call('GET', f"/streams/{urllib.parse.quote(socket_name)}?{query}")
+            if status == 204 or snapshot is None:
+                return offset + after, pd.DataFrame(), {}
+            if snapshot['epoch'] != epoch:
+                offset += after
+            self._versions[socket_name] = (snapshot['epoch'], snapshot['seq'], offset)
+            return offset + snapshot['seq'], rows_to_frame(snapshot['rows']), snapshot['analysis']
+        except urllib.error.HTTPError as e:
+            logger.error(f"Daemon stream {socket_name} unavailable: HTTP {e.code}")
+            if e.code == 404 and socket_name in self._streams:
+                # Daemon di-restart tanpa stream ini: minta lagi, hasilnya datang di polling berikutnya
+                self.start_realtime_analysis(*self._streams[socket_name])
+        except Exception as e:
+            logger.error(f"Error fetching daemon result: {e}")
+        return 0, pd.DataFrame(), {}
+
+    def stop_realtime_analysis(self, socket_name: str):
+        """Melepas lease stream; daemon menghentikannya hanya jika tidak ada konsumen lain"""
+        self._versions.pop(socket_name, None)
+        self._streams.pop(socket_name, None)
+        try:
+            query = urllib.parse.urlencode({'client': self.client_id})
+            self._call('DELETE', f"/streams/{urllib.parse.quote(socket_name)}?{query}")
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                logger.error(f"Error releasing daemon stream {socket_name}: HTTP {e.code}")
+        except Exception as e:
+            logger.error(f"Error releasing daemon stream {socket_name}: {e}")
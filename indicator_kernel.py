@@ -0,0 +1,311 @@
+import math
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+# Periode indikator calculate_indicators
+EMA_FAST_WINDOW = 9
+EMA_SLOW_WINDOW = 21
+RSI_WINDOW = 7
+ADX_WINDOW = 14
+ATR_WINDOW = 14
+VOLUME_WINDOW = 20
+GRID_WINDOW = 60
+
+# Ambang aturan rekomendasi (Backtester boleh mengganti per set parameter)
+SIGNAL_THRESHOLDS = {
+    'rsi_buy': 40,
+    'rsi_sell': 60,
+    'adx_min': 20,
+    'volatility_atr': 0.8,
+    'volume_mult': 1.5
+}
+
+# Urutan baris blok nilai dan blok kondisi (satu alokasi masing-masing per panggilan)
+VALUE_ROWS = ['EMA_FAST', 'EMA_SLOW', 'RSI', 'ADX', 'ATR', 'VOL_SMA', 'DIF', 'DEA', 'MACD',
+              'CENTER', 'GRID_LOW', 'GRID_UP']
+SIGNAL_ROWS = ['trend_up', 'trend_down', 'momentum_buy', 'momentum_sell', 'trend_strong', 'valid_volatility',
+               'volume_spike', 'bull_candle', 'bear_candle', 'macd_buy', 'macd_sell', 'grid_buy', 'grid_sell',
+               'buy', 'sell']
+
+# Blok rekurensi dipilih agar decay^-panjang_blok tetap <= 1e30 (jauh dari overflow float64)
+_BLOCK_EXPONENT = 30 * math.log(10)
+_MAX_BLOCK = 4096
+
+
+def linear_recurrence(x: np.ndarray, decay: float, scale: float, seed, out: np.ndarray) -> np.ndarray:
+    """out[..., t] = decay * out[..., t-1] + scale * x[..., t] dengan out[..., -1] = seed, tanpa loop per elemen
+
+    Sumbu terakhir adalah waktu; `seed` skalar atau satu nilai per baris. Deret dibagi menjadi
+    blok; di dalam blok rekurensi diselesaikan dengan cumsum berskala decay^-k, lalu nilai akhir
+    setiap blok diteruskan ke blok berikutnya (satu loop per blok untuk semua baris).
+    """
+    n = x.shape[-1]
+    if n == 0:
+        return out
+    if decay == 0:
+        np.multiply(x, scale, out=out)
+        return out
+    block = int(min(n, _MAX_BLOCK, max(1, _BLOCK_EXPONENT // -math.log(decay))))
+    n_blocks = -(-n // block)
+    lead = x.shape[:-1]
+
+    padded = np.zeros(lead + (n_blocks * block,))
+    np.multiply(x, scale, out=padded[..., :n])
+    blocks = padded.reshape(lead + (n_blocks, block))
+    k = np.arange(block)
+    decay_k = decay ** k
+    blocks /= decay_k
+    np.cumsum(blocks, axis=-1, out=blocks)
+    blocks *= decay_k
+
+    # Nilai sebelum setiap blok: rekurensi antar blok dengan decay^panjang_blok
+    starts = np.empty(lead + (n_blocks,))
+    decay_block = decay ** block
+    previous = np.broadcast_to(np.asarray(seed, dtype=np.float64), lead)
+    last = blocks[..., -1]
+    for i in range(n_blocks):
+        starts[..., i] = previous
+        previous = last[..., i] + decay_block * previous
+    blocks += starts[..., None] * (decay_k * decay)
+    out[...] = padded[..., :n]
+    return out
+
+
+def ema(values: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    """Setara ta.trend.ema_indicator (ewm span, adjust=False, min_periods=window) per baris; NaN awal dilewati
+
+    Baris dengan indeks nilai valid pertama yang sama dihitung bersama dalam satu rekurensi.
+    """
+    out = np.empty(values.shape) if out is None else out
+    out[...] = np.nan
+    n = values.shape[-1]
+    rows = values.reshape(-1, n)
+    target = out.reshape(-1, n)
+    valid = ~np.isnan(rows)
+    firsts = np.where(valid.any(axis=1), valid.argmax(axis=1), -1)
+    alpha = 2.0 / (window + 1)
+    for first in np.unique(firsts[firsts >= 0]):
+        group = np.flatnonzero(firsts == first)
+        if len(group) == len(rows):
+            # Semua baris mulai di indeks yang sama: rekurensi langsung ke `out` tanpa salinan
+            target[:, first] = rows[:, first]
+            linear_recurrence(rows[:, first + 1:], 1 - alpha, alpha, rows[:, first], target[:, first + 1:])
+            target[:, first:first + window - 1] = np.nan
+            continue
+        result = np.empty((len(group), n - first))
+        result[:, 0] = rows[group, first]
+        linear_recurrence(rows[group, first + 1:], 1 - alpha, alpha, result[:, 0], result[:, 1:])
+        result[:, :window - 1] = np.nan
+        target[group, first:] = result
+    return out
+
+
+def _wilder_sum(x: np.ndarray, window: int, out: np.ndarray) -> np.ndarray:
+    """Jumlah Wilder ta.trend.ADXIndicator: out[W] = sum(x[1..W]), out[t] = out[t-1] * (1 - 1/W) + x[t]"""
+    out[..., :window] = np.nan
+    if x.shape[-1] <= window:
+        return out
+    seed = x[..., 1:window + 1].sum(axis=-1)
+    out[..., window] = seed
+    linear_recurrence(x[..., window + 1:], 1 - 1.0 / window, 1.0, seed, out[..., window + 1:])
+    return out
+
+
+def _wilder_mean(x: np.ndarray, window: int, start: int, out: np.ndarray) -> np.ndarray:
+    """Rata-rata Wilder: out[start] = mean(x[start-W+1..start]), lalu out[t] = (out[t-1] * (W-1) + x[t]) / W; nol sebelumnya"""
+    out[..., :start] = 0.0
+    if x.shape[-1] <= start:
+        return out
+    seed = x[..., start - window + 1:start + 1].mean(axis=-1)
+    out[..., start] = seed
+    linear_recurrence(x[..., start + 1:], (window - 1) / window, 1.0 / window, seed, out[..., start + 1:])
+    return out
+
+
+def rolling_extreme(values: np.ndarray, window: int, maximum: bool, out: np.ndarray) -> np.ndarray:
+    """Rolling max/min (NaN sebelum window terisi) dengan algoritma van Herk/Gil-Werman: O(n) untuk window berapa pun"""
+    n = values.shape[-1]
+    out[..., :window - 1] = np.nan
+    if n < window:
+        return out
+    lead = values.shape[:-1]
+    accumulate = np.maximum.accumulate if maximum else np.minimum.accumulate
+    n_blocks = -(-n // window)
+    padded = np.full(lead + (n_blocks * window,), -np.inf if maximum else np.inf)
+    padded[..., :n] = values
+    blocks = padded.reshape(lead + (n_blocks, window))
+    prefix = accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    combine = np.maximum if maximum else np.minimum
+    combine(suffix[..., :n - window + 1], prefix[..., window - 1:n], out=out[..., window - 1:])
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int, out: np.ndarray) -> np.ndarray:
+    """Setara rolling(window).mean() (NaN sebelum window terisi)"""
+    out[..., :window - 1] = np.nan
+    if values.shape[-1] >= window:
+        np.lib.stride_tricks.sliding_window_view(values, window, axis=-1).sum(axis=-1, out=out[..., window - 1:])
+        out[..., window - 1:] /= window
+    return out
+
+
+def indicator_values(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                     macd_params=None,
+                     denoise: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """Semua nilai indikator calculate_indicators (VALUE_ROWS) dalam satu lintasan NumPy
+
+    Input berbentuk (waktu,) untuk satu seri atau (simbol x waktu); hasil ditulis ke satu blok
+    float64 (VALUE_ROWS x input). true range dan directional movement dihitung sekali untuk ATR dan ADX.
+    `macd_params` adalah (fast, slow, signal) atau satu baris per simbol; baris dengan periode sama
+    dihitung bersama. `denoise(dif, valid)` menerima bagian DIF yang valid (satu seri, atau baris
+    dengan periode slow sama) beserta mask waktunya dan mengembalikan DIF ter-denoise. Tanpa
+    `macd_params` DIF, DEA, dan MACD dibiarkan NaN untuk diisi pemanggil.
+    """
+    n = close.shape[-1]
+    block = np.empty((len(VALUE_ROWS),) + close.shape)
+    v = dict(zip(VALUE_ROWS, block))
+    work = np.empty((6,) + close.shape)
+    tr, pos, neg, tr_sum, pos_sum, neg_sum = work
+
+    # Trend dan momentum
+    ema(close, EMA_FAST_WINDOW, v['EMA_FAST'])
+    ema(close, EMA_SLOW_WINDOW, v['EMA_SLOW'])
+
+    change = np.empty(close.shape)
+    change[..., 0] = 0.0
+    np.subtract(close[..., 1:], close[..., :-1], out=change[..., 1:])
+    up = np.maximum(change, 0.0)
+    down = np.maximum(-change, 0.0)
+    alpha = 1.0 / RSI_WINDOW
+    ema_up = linear_recurrence(up, 1 - alpha, alpha, 0.0, np.empty(close.shape))
+    ema_down = linear_recurrence(down, 1 - alpha, alpha, 0.0, np.empty(close.shape))
+    rsi = v['RSI']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(ema_up, ema_down, out=rsi)
+        np.copyto(rsi, np.where(ema_down == 0, 100.0, 100 - 100 / (1 + rsi)))
+    rsi[..., :RSI_WINDOW - 1] = np.nan
+
+    # True range (candle pertama: high - low) dan directional movement, dipakai ATR dan ADX
+    np.subtract(high, low, out=tr)
+    prev_close = close[..., :-1]
+    np.subtract(np.maximum(high[..., 1:], prev_close), np.minimum(low[..., 1:], prev_close), out=tr[..., 1:])
+    move_up = np.empty(close.shape)
+    move_down = np.empty(close.shape)
+    move_up[..., 0] = move_down[..., 0] = 0.0
+    np.subtract(high[..., 1:], high[..., :-1], out=move_up[..., 1:])
+    np.subtract(low[..., :-1], low[..., 1:], out=move_down[..., 1:])
+    np.copyto(pos, np.where((move_up > move_down) & (move_up > 0), move_up, 0.0))
+    np.copyto(neg, np.where((move_down > move_up) & (move_down > 0), move_down, 0.0))
+
+    _wilder_mean(tr, ATR_WINDOW, ATR_WINDOW - 1, v['ATR'])
+
+    # ADX seperti ta.trend.ADXIndicator: jumlah Wilder TR/DM mulai candle ke-1..W
+    _wilder_sum(tr, ADX_WINDOW, tr_sum)
+    _wilder_sum(pos, ADX_WINDOW, pos_sum)
+    _wilder_sum(neg, ADX_WINDOW, neg_sum)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(tr_sum != 0, 100 * (pos_sum / tr_sum), 0.0)
+        di_neg = np.where(tr_sum != 0, 100 * (neg_sum / tr_sum), 0.0)
+        di_total = di_pos + di_neg
+        dx = np.where(di_total != 0, 100 * np.abs((di_pos - di_neg) / di_total), 0.0)
+    _wilder_mean(dx, ADX_WINDOW, 2 * ADX_WINDOW - 1, v['ADX'])
+
+    rolling_mean(volume, VOLUME_WINDOW, v['VOL_SMA'])
+
+    # Wavelet-MACD
+    if macd_params is None:
+        block[VALUE_ROWS.index('DIF'):VALUE_ROWS.index('MACD') + 1] = np.nan
+    else:
+        macd_values(close, macd_params, denoise, v['DIF'], v['DEA'])
+        np.subtract(v['DIF'], v['DEA'], out=v['MACD'])
+
+    # Dynamic Grid Trading (buffer TR/DM tidak dipakai lagi setelah ADX)
+    window = min(GRID_WINDOW, n)
+    center = v['CENTER']
+    np.add(rolling_extreme(high, window, True, tr), rolling_extreme(low, window, False, pos), out=center)
+    center /= 2
+    np.subtract(center, v['ATR'], out=v['GRID_LOW'])
+    np.add(center, v['ATR'], out=v['GRID_UP'])
+    return v
+
+
+def macd_values(close: np.ndarray, macd_params, denoise: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                dif: np.ndarray, dea: np.ndarray) -> None:
+    """DIF ter-denoise dan DEA ke `dif`/`dea`; parameter (fast, slow, signal) satu untuk seri atau per baris"""
+    n = close.shape[-1]
+    params = np.asarray(macd_params, dtype=np.int64).reshape(-1, 3)
+    close_rows = close.reshape(-1, n)
+    dif_rows = dif.reshape(-1, n)
+    dea_rows = dea.reshape(-1, n)
+    for fast, slow in np.unique(params[:, :2], axis=0):
+        group = np.flatnonzero((params[:, 0] == fast) & (params[:, 1] == slow))
+        dif_rows[group] = ema(close_rows[group], fast) - ema(close_rows[group], slow)
+
+    # Denoise hanya bagian valid (NaN awal akan merusak dekomposisi); baris dengan slow sama punya mask sama
+    for slow in np.unique(params[:, 1]):
+        group = np.flatnonzero(params[:, 1] == slow)
+        valid = ~np.isnan(dif_rows[group[0]])
+        cells = np.ix_(group, np.flatnonzero(valid))
+        denoised = denoise(dif_rows[cells][0] if close.ndim == 1 else dif_rows[cells], valid)
+        dif_rows[cells] = denoised
+
+    for signal in np.unique(params[:, 2]):
+        group = np.flatnonzero(params[:, 2] == signal)
+        dea_rows[group] = ema(dif_rows[group], signal)
+
+
+def indicator_kernel(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                     macd_params, denoise: Callable[[np.ndarray, np.ndarray], np.ndarray]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Semua indikator dan kondisi beli/jual calculate_indicators: (indicator_values, signal_masks)
+
+    Dipakai calculate_indicators (satu seri) dan batch_indicators (simbol x waktu).
+    Nilai setara dengan implementasi ta sebelumnya (selisih pembulatan floating point).
+    """
+    v = indicator_values(high, low, close, volume, macd_params, denoise)
+    return v, signal_masks(open_, high, low, close, volume, v)
+
+
+def signal_masks(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                 values: Dict[str, np.ndarray], thresholds: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """Kondisi beli/jual (SIGNAL_ROWS) dari nilai indikator; sumbu terakhir adalah waktu
+
+    Satu-satunya implementasi aturan rekomendasi: dipakai indicator_kernel (satu seri),
+    batch_indicators (simbol x waktu), dan Backtester (ambang dari set parameter). `values`
+    butuh EMA_FAST, EMA_SLOW, RSI, ADX, ATR, VOL_SMA, DIF, DEA, GRID_LOW, dan GRID_UP.
+    Perbandingan dengan NaN bernilai False seperti pada versi pandas.
+    """
+    t = SIGNAL_THRESHOLDS if thresholds is None else {**SIGNAL_THRESHOLDS, **thresholds}
+    v = values
+    flags = np.zeros((len(SIGNAL_ROWS),) + close.shape, dtype=bool)
+    s = dict(zip(SIGNAL_ROWS, flags))
+    rsi, dif, dea = v['RSI'], v['DIF'], v['DEA']
+    body = close - open_
+    with np.errstate(invalid='ignore'):
+        np.greater(v['EMA_FAST'], v['EMA_SLOW'], out=s['trend_up'])
+        np.less(v['EMA_FAST'], v['EMA_SLOW'], out=s['trend_down'])
+        rsi_rising = np.zeros(close.shape, dtype=bool)
+        rsi_falling = np.zeros(close.shape, dtype=bool)
+        np.greater(rsi[..., 1:], rsi[..., :-1], out=rsi_rising[..., 1:])
+        np.less(rsi[..., 1:], rsi[..., :-1], out=rsi_falling[..., 1:])
+        np.logical_and(rsi < t['rsi_buy'], rsi_rising, out=s['momentum_buy'])
+        np.logical_and(rsi > t['rsi_sell'], rsi_falling, out=s['momentum_sell'])
+        np.greater(v['ADX'], t['adx_min'], out=s['trend_strong'])
+        np.greater(high - low, t['volatility_atr'] * v['ATR'], out=s['valid_volatility'])
+        np.greater(volume, t['volume_mult'] * v['VOL_SMA'], out=s['volume_spike'])
+        np.logical_and(close[..., 1:] > open_[..., 1:], body[..., 1:] > body[..., :-1], out=s['bull_candle'][..., 1:])
+        np.logical_and(close[..., 1:] < open_[..., 1:], -body[..., 1:] > -body[..., :-1], out=s['bear_candle'][..., 1:])
+        np.logical_and(dif[..., :-1] < dea[..., :-1], dif[..., 1:] > dea[..., 1:], out=s['macd_buy'][..., 1:])
+        np.logical_and(dif[..., :-1] > dea[..., :-1], dif[..., 1:] < dea[..., 1:], out=s['macd_sell'][..., 1:])
+        np.less_equal(close, v['GRID_LOW'], out=s['grid_buy'])
+        np.greater_equal(close, v['GRID_UP'], out=s['grid_sell'])
+
+    buy, sell = s['buy'], s['sell']
+    np.logical_or(s['macd_buy'], s['grid_buy'], out=buy)
+    for name in ('trend_up', 'momentum_buy', 'trend_strong', 'valid_volatility', 'volume_spike', 'bull_candle'):
+        buy &= s[name]
+    np.logical_or(s['macd_sell'], s['grid_sell'], out=sell)
+    for name in ('trend_down', 'momentum_sell', 'trend_strong', 'valid_volatility', 'volume_spike', 'bear_candle'):
+        sell &= s[name]
+    return s
@@ -0,0 +1,275 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: tanpa kunci antar-proses, hanya satu proses yang boleh menulis jurnal
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from compact_frame import RECOMMENDATION_LABELS
+
+logger = logging.getLogger("CryptoTrader")
+
+# Sub-sinyal boolean dict analysis (urutan kolom jurnal)
+SIGNAL_FIELDS = ['trend_up', 'trend_down', 'momentum_buy', 'momentum_sell', 'trend_strong', 'valid_volatility',
+                 'volume_spike', 'bull_candle', 'bear_candle', 'macd_buy', 'macd_sell', 'grid_buy', 'grid_sell']
+
+# Nilai float dict analysis; fitur order book opsional (NaN jika tidak ada)
+VALUE_FIELDS = ['last_close', 'atr', 'stop_loss_buy', 'take_profit_buy', 'stop_loss_sell', 'take_profit_sell',
+                'book_spread_bps', 'book_imbalance']
+
+# Skema kolom jurnal: setiap kolom disimpan sebagai file biner mentah terpisah per partisi bulan
+JOURNAL_COLUMNS = {
+    'candle_time': np.int64,
+    'recorded_at': np.int64,
+    # Kode kamus (lihat meta.json) dan indeks RECOMMENDATION_LABELS
+    'symbol': np.int32,
+    'interval': np.int16,
+    'recommendation': np.int8,
+    **{name: np.float64 for name in VALUE_FIELDS},
+    **{name: np.bool_ for name in SIGNAL_FIELDS}
+}
+
+# Baris yang ditampung sebelum ditulis, dan jeda maksimum sebelum baris tertunda ditulis (detik)
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_SECONDS = 5.0
+
+
+def _recommendation_code(label: str) -> int:
+    # Label tak dikenal disimpan sebagai -1 (NaN saat dibaca) alih-alih menggagalkan analisis
+    return RECOMMENDATION_LABELS.index(label) if label in RECOMMENDATION_LABELS else -1
+
+
+class DecisionJournal:
+    """Jurnal keputusan append-only berbasis kolom: satu baris per dict analysis
+
+    Baris ditampung di memori dan ditulis thread latar per batch (ukuran `batch_size`
+    atau setiap `flush_seconds`), jadi thread analisis tidak pernah menunggu disk.
+    Data dipartisi per bulan UTC dari open time candle (`YYYY-MM/<kolom>.bin`); simbol
+    dan interval disimpan sebagai kode kamus di meta.json. Query rentang waktu hanya
+    membuka partisi yang relevan lewat memory-map, tanpa mengurai teks log.
+
+    Beberapa proses (mis. app dan daemon) boleh memakai direktori yang sama: setiap
+    penulisan memegang kunci file (fcntl) dan membaca ulang meta.json sebelum membuat
+    kode kamus baru, jadi kode dari proses lain tidak tertimpa.
+    """
+
+    def __init__(self, root_dir: str = "decision_journal", batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        self.root_dir = root_dir
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._schema = {name: np.dtype(dtype).str for name, dtype in JOURNAL_COLUMNS.items()}
+        os.makedirs(self.root_dir, exist_ok=True)
+        with self._file_lock(shared=True):
+            self._dictionaries = self._load_meta()
+        self._pending: List[Dict] = []
+        self._closed = False
+        self._condition = threading.Condition()
+        # Penulisan file (thread latar, flush, dan read) berurutan
+        self._io_lock = threading.RLock()
+        self._thread = threading.Thread(target=self._run, name="decision-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        """Kunci antar-proses direktori jurnal; dilepas saat file kunci ditutup"""
+        with open(os.path.join(self.root_dir, "journal.lock"), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+
+    def _load_meta(self) -> Dict[str, List[str]]:
+        meta_path = os.path.join(self.root_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('columns') != self._schema:
+                raise ValueError(f"Decision journal schema mismatch in {self.root_dir}")
+            return {'symbol': meta['symbol'], 'interval': meta['interval']}
+        return {'symbol': [], 'interval': []}
+
+    def _save_meta(self):
+        meta_path = os.path.join(self.root_dir, "meta.json")
+        with open(meta_path + ".tmp", 'w') as f:
+            json.dump({'columns': self._schema, **self._dictionaries}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def record(self, analysis: Dict, interval: str, candle_time) -> None:
+        """Menambahkan satu dict analysis ke antrean tulis (tidak menyentuh disk)"""
+        if not analysis or 'recommendation' not in analysis:
+            return
+        row = {
+            'candle_time': int(pd.Timestamp(candle_time).value // 1_000_000),
+            'recorded_at': int(time.time() * 1000),
+            'symbol': str(analysis.get('symbol', '')).upper(),
+            'interval': interval,
+            'recommendation': _recommendation_code(str(analysis['recommendation'])),
+            **{name: float(analysis.get(name, np.nan)) for name in VALUE_FIELDS},
+            **{name: bool(analysis.get(name, False)) for name in SIGNAL_FIELDS}
+        }
+        with self._condition:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._pending) >= self.batch_size or self._closed,
+                                         self.flush_seconds)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self):
+        """Menulis semua baris tertunda sekarang"""
+        with self._io_lock:
+            with self._condition:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                self._write(rows)
+            except Exception as e:
+                logger.exception(f"Error writing decision journal: {e}")
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _code(self, field: str, value: str) -> int:
+        values = self._dictionaries[field]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def _write(self, rows: List[Dict]):
+        with self._file_lock():
+            # Proses lain bisa sudah menambah simbol/interval: kode baru dibuat dari kamus terbaru
+            self._dictionaries = self._load_meta()
+            self._append(rows)
+
+    def _append(self, rows: List[Dict]):
+        known = {field: len(values) for field, values in self._dictionaries.items()}
+        columns = {}
+        for name, dtype in JOURNAL_COLUMNS.items():
+            if name in self._dictionaries:
+                columns[name] = np.array([self._code(name, row[name]) for row in rows], dtype=dtype)
+            else:
+                columns[name] = np.array([row[name] for row in rows], dtype=dtype)
+        # Kamus ditulis sebelum data agar kode di file selalu bisa diterjemahkan
+        if any(len(values) != known[field] for field, values in self._dictionaries.items()):
+            self._save_meta()
+
+        months = columns['candle_time'].astype('datetime64[ms]').astype('datetime64[M]')
+        for month in np.unique(months):
+            mask = months == month
+            partition = self._partition_dir(str(month))
+            os.makedirs(partition, exist_ok=True)
+            # Penulisan yang terputus bisa meninggalkan kolom tidak sama panjang: potong ke yang terpendek
+            length = self._length(partition)
+            for name, dtype in JOURNAL_COLUMNS.items():
+                with open(os.path.join(partition, f"{name}.bin"), 'ab') as f:
+                    f.truncate(length * np.dtype(dtype).itemsize)
+                    f.write(columns[name][mask].tobytes())
+
+    def _partition_dir(self, month: str) -> str:
+        return os.path.join(self.root_dir, month)
+
+    def _partitions(self) -> List[str]:
+        return sorted(d for d in os.listdir(self.root_dir) if os.path.isdir(os.path.join(self.root_dir, d)))
+
+    @staticmethod
+    def _length(partition: str) -> int:
+        lengths = []
+        for name, dtype in JOURNAL_COLUMNS.items():
+            path = os.path.join(partition, f"{name}.bin")
+            lengths.append(os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0)
+        return min(lengths)
+
+    def read(self, start=None, end=None, symbol: Optional[str] = None, interval: Optional[str] = None,
+             latest_only: bool = False) -> pd.DataFrame:
+        """Riwayat keputusan dengan open time candle dalam [start, end] sebagai DataFrame
+
+        latest_only menyisakan keputusan terakhir per (simbol, interval, candle) jika candle
+        yang sama dianalisis lebih dari sekali.
+        """
+        self.flush()
+        start_ms = int(pd.Timestamp(start).value // 1_000_000) if start is not None else None
+        end_ms = int(pd.Timestamp(end).value // 1_000_000) if end is not None else None
+        first_month = str(np.datetime64(start_ms, 'ms').astype('datetime64[M]')) if start_ms is not None else None
+        last_month = str(np.datetime64(end_ms, 'ms').astype('datetime64[M]')) if end_ms is not None else None
+
+        with self._io_lock, self._file_lock(shared=True):
+            self._dictionaries = self._load_meta()
+            symbols, intervals = list(self._dictionaries['symbol']), list(self._dictionaries['interval'])
+            symbol_code = symbols.index(symbol.upper()) if symbol and symbol.upper() in symbols else None
+            interval_code = intervals.index(interval) if interval and interval in intervals else None
+            if (symbol and symbol_code is None) or (interval and interval_code is None):
+                return pd.DataFrame(columns=list(JOURNAL_COLUMNS))
+
+            parts = []
+            for month in self._partitions():
+                if (first_month and month < first_month) or (last_month and month > last_month):
+                    continue
+                partition = self._partition_dir(month)
+                n = self._length(partition)
+                if n == 0:
+                    continue
+                data = {name: np.memmap(os.path.join(partition, f"{name}.bin"), dtype=dtype, mode='r', shape=(n,))
+                        for name, dtype in JOURNAL_COLUMNS.items()}
+                mask = np.ones(n, dtype=bool)
+                if start_ms is not None:
+                    mask &= data['candle_time'] >= start_ms
+                if end_ms is not None:
+                    mask &= data['candle_time'] <= end_ms
+                if symbol_code is not None:
+                    mask &= data['symbol'] == symbol_code
+                if interval_code is not None:
+                    mask &= data['interval'] == interval_code
+                parts.append({name: np.array(column[mask]) for name, column in data.items()})
+                del data
+
+        if not parts:
+            return pd.DataFrame(columns=list(JOURNAL_COLUMNS))
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in JOURNAL_COLUMNS}
+        df = pd.DataFrame(columns)
+        df['candle_time'] = pd.to_datetime(df['candle_time'], unit='ms')
+        df['recorded_at'] = pd.to_datetime(df['recorded_at'], unit='ms')
+        df['symbol'] = pd.Categorical.from_codes(df['symbol'], categories=symbols)
+        df['interval'] = pd.Categorical.from_codes(df['interval'], categories=intervals)
+        df['recommendation'] = pd.Categorical.from_codes(df['recommendation'], categories=RECOMMENDATION_LABELS)
+        df = df.sort_values(['candle_time', 'recorded_at'], kind='stable')
+        if latest_only:
+            df = df.drop_duplicates(['symbol', 'interval', 'candle_time'], keep='last')
+        return df.reset_index(drop=True)
+
+
+_journals: Dict[str, DecisionJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def open_journal(root_dir: str = "decision_journal") -> DecisionJournal:
+    """Satu DecisionJournal per direktori dalam proses (dibagi semua CryptoTradingSystem/sesi)"""
+    key = os.path.abspath(root_dir)
+    with _journals_lock:
+        if key not in _journals:
+            _journals[key] = DecisionJournal(root_dir)
+        return _journals[key]
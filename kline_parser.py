@@ -0,0 +1,56 @@
+import json
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+# Posisi field dalam satu baris kline Binance:
+# [open time, open, high, low, close, volume, close time, quote volume,
+#  jumlah trade, taker buy base volume, taker buy quote volume, ignore]
+_FLOAT_FIELDS = {
+    'open': 1,
+    'high': 2,
+    'low': 3,
+    'close': 4,
+    'volume': 5,
+    'quote_volume': 7,
+    'taker_buy_volume': 9
+}
+_FLOAT_INDEX = list(_FLOAT_FIELDS.values())
+
+KLINE_COLUMNS = {
+    'timestamp': np.int64,  # open time dalam milidetik
+    **{name: np.float64 for name in _FLOAT_FIELDS},
+    'trades': np.int64
+}
+
+
+def decode_klines(klines: Union[List, str, bytes]) -> Dict[str, np.ndarray]:
+    """Decode klines mentah (list atau payload JSON) menjadi kolom NumPy bertipe dalam satu langkah"""
+    if isinstance(klines, (str, bytes, bytearray)):
+        klines = json.loads(klines)
+
+    if len(klines) == 0:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in KLINE_COLUMNS.items()}
+
+    raw = np.array(klines, dtype=object)
+    # Satu konversi string -> float64 untuk semua kolom harga/volume sekaligus
+    values = raw[:, _FLOAT_INDEX].astype(np.float64)
+
+    columns = {'timestamp': raw[:, 0].astype(np.int64)}
+    for i, name in enumerate(_FLOAT_FIELDS):
+        columns[name] = np.ascontiguousarray(values[:, i])
+    columns['trades'] = raw[:, 8].astype(np.int64)
+    return columns
+
+
+def columns_to_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Membangun DataFrame klines dari kolom hasil decode (timestamp dikonversi sekali)"""
+    df = pd.DataFrame(columns, copy=False)
+    df['timestamp'] = pd.to_datetime(columns['timestamp'], unit='ms')
+    return df
+
+
+def klines_to_frame(klines: Union[List, str, bytes]) -> pd.DataFrame:
+    """Mengubah respons klines mentah Binance menjadi DataFrame"""
+    return columns_to_frame(decode_klines(klines))
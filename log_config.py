@@ -0,0 +1,81 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+LOG_FILE = "crypto_trading.log"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Catatan dari baris kode yang sama: paling banyak REPEAT_BURST per REPEAT_WINDOW detik
+REPEAT_BURST = 5
+REPEAT_WINDOW = 60.0
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+class RepeatFilter(logging.Filter):
+    """Membatasi catatan berulang per lokasi pemanggil (file, baris)
+
+    Pesan f-string berbeda isinya setiap panggilan, jadi pengulangan dikenali dari lokasi
+    kodenya, bukan teksnya. Jumlah catatan yang dibuang dilaporkan pada catatan pertama
+    yang lolos di jendela berikutnya.
+    """
+
+    def __init__(self, burst: int = REPEAT_BURST, window: float = REPEAT_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # (path, baris) -> [awal jendela, catatan lolos, catatan dibuang]
+        self._sites: Dict[Tuple[str, int], List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            suppressed = 0
+            if site is None or record.created - site[0] >= self.window:
+                suppressed = site[2] if site is not None else 0
+                site = self._sites[key] = [record.created, 0, 0]
+            if site[1] >= self.burst:
+                site[2] += 1
+                return False
+            site[1] += 1
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+def configure_logging(level: int = logging.INFO, log_file: Optional[str] = LOG_FILE):
+    """Konfigurasi logging (file + konsol) sekali per proses
+
+    Thread pemanggil hanya memasukkan catatan ke antrean; format dan tulis ke file/konsol
+    dikerjakan thread QueueListener, jadi I/O log tidak pernah menahan thread analisis.
+    Dipanggil saat sistem dibuat, bukan saat modul di-import, sehingga import tidak membuat
+    file log. Tidak melakukan apa-apa jika root logger sudah dikonfigurasi oleh aplikasi.
+    """
+    global _listener
+    with _lock:
+        root = logging.getLogger()
+        if _listener is not None or root.handlers:
+            return
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            handlers.insert(0, logging.FileHandler(log_file))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        records = queue.SimpleQueue()
+        queue_handler = QueueHandler(records)
+        queue_handler.addFilter(RepeatFilter())
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Menulis catatan yang masih di antrean sebelum proses keluar
+        atexit.register(_listener.stop)
@@ -0,0 +1,195 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from macd_search import macd_fitness
+from wavelet import wavelet_denoise
+
+logger = logging.getLogger("CryptoTrader")
+
+# Ruang parameter Wavelet-MACD: (batas bawah, batas atas) untuk gen integer
+FAST_RANGE = (3, 30)
+SLOW_RANGE = (10, 100)
+SIGNAL_RANGE = (3, 30)
+LEVEL_RANGE = (1, 5)
+WAVELETS = ['haar', 'db2', 'db4', 'db6', 'db8', 'sym4', 'sym6', 'coif2']
+THRESHOLD_MODES = ['soft', 'hard', 'garrote']
+
+# Genome: (fast, slow, signal, indeks wavelet, level, indeks mode threshold)
+Genome = Tuple[int, int, int, int, int, int]
+
+# State per proses worker: view ke harga di shared memory dan cache EMA
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_close: Optional[np.ndarray] = None
+_worker_ema_cache: Dict[int, np.ndarray] = {}
+
+
+def _attach_shared_close(name: str, length: int):
+    """Initializer worker: memetakan array harga dari shared memory tanpa menyalin"""
+    global _worker_shm, _worker_close
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_close = np.ndarray((length,), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_ema_cache.clear()
+
+
+def _ema(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values).ewm(span=window, min_periods=window, adjust=False).mean().to_numpy()
+
+
+def _close_ema(window: int) -> np.ndarray:
+    if window not in _worker_ema_cache:
+        _worker_ema_cache[window] = _ema(_worker_close, window)
+    return _worker_ema_cache[window]
+
+
+def evaluate_genome(genome: Genome) -> float:
+    """Fitness satu genome: signal-to-noise MACD dari DIF yang sudah di-denoise wavelet"""
+    import pywt
+    fast, slow, signal, wavelet_idx, level, mode_idx = genome
+    try:
+        dif = _close_ema(fast) - _close_ema(slow)
+        dif = dif[~np.isnan(dif)]
+        wavelet = WAVELETS[wavelet_idx]
+        level = min(level, pywt.dwt_max_level(len(dif), wavelet))
+        if level < 1:
+            return -np.inf
+        dif = wavelet_denoise(dif, wavelet, level, THRESHOLD_MODES[mode_idx])
+        macd = dif - _ema(dif, signal)
+        return float(macd_fitness(macd[None, :])[0])
+    except Exception:
+        return -np.inf
+
+
+class MacdEvolutionOptimizer:
+    """Optimasi parameter Wavelet-MACD dengan genetic algorithm dan evaluasi fitness paralel
+
+    Harga diletakkan sekali di shared memory; setiap worker proses membaca tanpa
+    salinan dan menyimpan cache EMA per periode. Pencarian berhenti lebih awal jika
+    fitness terbaik tidak membaik selama `patience` generasi. Dengan `seed` yang sama
+    hasilnya dapat direproduksi, berapa pun jumlah worker.
+    """
+
+    def __init__(self, population_size: int = 64, generations: int = 100, patience: int = 10,
+                 tolerance: float = 1e-6, mutation_rate: float = 0.2, elite: int = 4,
+                 tournament_size: int = 3, seed: Optional[int] = None, max_workers: Optional[int] = None):
+        self.population_size = population_size
+        self.generations = generations
+        self.patience = patience
+        self.tolerance = tolerance
+        self.mutation_rate = mutation_rate
+        self.elite = elite
+        self.tournament_size = tournament_size
+        self.seed = seed
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _repair(genome: List[int]) -> Genome:
+        """Memaksa genome ke dalam batas ruang parameter dan slow > fast"""
+        fast = int(np.clip(genome[0], *FAST_RANGE))
+        slow = int(np.clip(genome[1], max(SLOW_RANGE[0], fast + 1), SLOW_RANGE[1]))
+        signal = int(np.clip(genome[2], *SIGNAL_RANGE))
+        wavelet_idx = int(genome[3]) % len(WAVELETS)
+        level = int(np.clip(genome[4], *LEVEL_RANGE))
+        mode_idx = int(genome[5]) % len(THRESHOLD_MODES)
+        return fast, slow, signal, wavelet_idx, level, mode_idx
+
+    def _random_genome(self, rng: np.random.Generator) -> Genome:
+        return self._repair([
+            rng.integers(FAST_RANGE[0], FAST_RANGE[1] + 1),
+            rng.integers(SLOW_RANGE[0], SLOW_RANGE[1] + 1),
+            rng.integers(SIGNAL_RANGE[0], SIGNAL_RANGE[1] + 1),
+            rng.integers(len(WAVELETS)),
+            rng.integers(LEVEL_RANGE[0], LEVEL_RANGE[1] + 1),
+            rng.integers(len(THRESHOLD_MODES))
+        ])
+
+    def _tournament(self, rng: np.random.Generator, population: List[Genome], fitness: np.ndarray) -> Genome:
+        contenders = rng.integers(len(population), size=self.tournament_size)
+        return population[contenders[np.argmax(fitness[contenders])]]
+
+    def _offspring(self, rng: np.random.Generator, parent_a: Genome, parent_b: Genome) -> Genome:
+        # Uniform crossover lalu mutasi per gen
+        child = [a if rng.random() < 0.5 else b for a, b in zip(parent_a, parent_b)]
+        steps = (3, 6, 3)
+        for i in range(3):
+            if rng.random() < self.mutation_rate:
+                child[i] += int(round(rng.normal(0, steps[i])))
+        if rng.random() < self.mutation_rate:
+            child[3] = rng.integers(len(WAVELETS))
+        if rng.random() < self.mutation_rate:
+            child[4] += rng.choice([-1, 1])
+        if rng.random() < self.mutation_rate:
+            child[5] = rng.integers(len(THRESHOLD_MODES))
+        return self._repair(child)
+
+    def optimize(self, close: np.ndarray) -> Dict:
+        """Mencari parameter Wavelet-MACD terbaik untuk deret harga close"""
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        evaluated: Dict[Genome, float] = {}
+
+        workers = self.max_workers or os.cpu_count() or 1
+
+        shm = shared_memory.SharedMemory(create=True, size=close.nbytes)
+        try:
+            np.ndarray(close.shape, dtype=np.float64, buffer=shm.buf)[:] = close
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_close,
+                                     initargs=(shm.name, len(close))) as executor:
+
+                def evaluate(population: List[Genome]) -> np.ndarray:
+                    # Genome yang sudah pernah dievaluasi tidak dikirim ulang ke worker
+                    pending = list(dict.fromkeys(g for g in population if g not in evaluated))
+                    chunksize = max(1, len(pending) // (4 * workers))
+                    for genome, value in zip(pending, executor.map(evaluate_genome, pending, chunksize=chunksize)):
+                        evaluated[genome] = value
+                    return np.array([evaluated[g] for g in population])
+
+                population = [self._random_genome(rng) for _ in range(self.population_size)]
+                fitness = evaluate(population)
+                best_fitness = -np.inf
+                stale = 0
+                generation = 0
+
+                for generation in range(1, self.generations + 1):
+                    order = np.argsort(-fitness, kind='stable')
+                    if fitness[order[0]] > best_fitness + self.tolerance:
+                        best_fitness = fitness[order[0]]
+                        stale = 0
+                    else:
+                        stale += 1
+                        if stale >= self.patience:
+                            logger.info(f"MACD evolution plateaued after {generation} generations")
+                            break
+
+                    next_population = [population[i] for i in order[:self.elite]]
+                    while len(next_population) < self.population_size:
+                        parent_a = self._tournament(rng, population, fitness)
+                        parent_b = self._tournament(rng, population, fitness)
+                        next_population.append(self._offspring(rng, parent_a, parent_b))
+                    population = next_population
+                    fitness = evaluate(population)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        # Urutan evaluasi deterministik untuk seed yang sama, jadi hasil seri juga deterministik
+        best = max(evaluated, key=evaluated.get)
+        fast, slow, signal, wavelet_idx, level, mode_idx = best
+        result = {
+            'fast': fast,
+            'slow': slow,
+            'signal': signal,
+            'wavelet': WAVELETS[wavelet_idx],
+            'level': level,
+            'mode': THRESHOLD_MODES[mode_idx],
+            'fitness': evaluated[best],
+            'generations': generation,
+            'evaluations': len(evaluated)
+        }
+        logger.info(f"Evolved Wavelet-MACD params: {result}")
+        return result
@@ -0,0 +1,117 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from indicator_kernel import ema
+
+
+def ema_matrix(values: np.ndarray, window: int) -> np.ndarray:
+    """EMA setiap baris (series x waktu), setara ta.trend.ema_indicator per series"""
+    return ema(values, window)
+
+
+def macd_fitness(macd: np.ndarray) -> np.ndarray:
+    """Fitness signal-to-noise mean(|MACD|) / std(MACD) per baris, mengabaikan NaN awal
+
+    Semua baris dihitung sekaligus; baris tanpa nilai valid atau dengan std nol bernilai -inf.
+    """
+    valid = ~np.isnan(macd)
+    count = valid.sum(axis=-1)
+    values = np.where(valid, macd, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = values.sum(axis=-1) / count
+        deviation = np.where(valid, values - mean[..., None], 0.0)
+        std = np.sqrt(np.einsum('...t,...t->...', deviation, deviation) / count)
+        fitness = np.abs(values).sum(axis=-1) / count / std
+    return np.where((count > 0) & (std > 0), fitness, -np.inf)
+
+
+def batched_macd_fitness(close: np.ndarray, fast_periods: Sequence[int], slow_periods: Sequence[int],
+                         signal_periods: Sequence[int]) -> Tuple[List[Tuple[int, int, int]], np.ndarray]:
+    """Fitness semua kombinasi (fast, slow, signal) dengan EMA bersama dan DIF sebagai array 2-D
+
+    Setiap EMA fast/slow dihitung sekali, seluruh DIF disusun sebagai matriks
+    (pasangan x waktu) dan setiap periode signal diterapkan ke semua DIF sekaligus.
+    Urutan kombinasi sama dengan loop fast -> slow -> signal. `close` boleh berupa
+    satu series (waktu,) atau banyak simbol (simbol x waktu); fitness berbentuk
+    (kombinasi,) atau (simbol x kombinasi).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    single = close.ndim == 1
+    close = np.atleast_2d(close)
+    n_series, n_bars = close.shape
+
+    periods = sorted(set(fast_periods) | set(slow_periods))
+    emas = {p: ema_matrix(close, p) for p in periods}
+
+    pairs = [(fast, slow) for fast in fast_periods for slow in slow_periods if slow > fast]
+    if not pairs:
+        return [], np.empty(0 if single else (n_series, 0))
+    # Baris berurutan (pasangan, simbol)
+    dif = np.concatenate([emas[fast] - emas[slow] for fast, slow in pairs])
+
+    fitness = np.empty((len(pairs), n_series, len(signal_periods)))
+    for j, signal in enumerate(signal_periods):
+        fitness[:, :, j] = macd_fitness(dif - ema_matrix(dif, signal)).reshape(len(pairs), n_series)
+
+    params = [(fast, slow, signal) for fast, slow in pairs for signal in signal_periods]
+    fitness = fitness.transpose(1, 0, 2).reshape(n_series, len(params))
+    return params, fitness[0] if single else fitness
+
+
+def _window_sums(values: np.ndarray, boundaries: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Jumlah values[..., start:end] setiap jendela; `starts`/`ends` adalah posisi di `boundaries`
+
+    Satu lintasan reduceat menjumlah potongan antar batas jendela, lalu prefix sum atas
+    potongan (bukan atas setiap bar) memberi jumlah setiap jendela.
+    """
+    # Potongan terakhir reduceat berjalan sampai akhir series; tidak dipakai jika batas terakhir < panjang series
+    closed = boundaries[-1] == values.shape[-1]
+    pieces = np.add.reduceat(values, boundaries[:-1] if closed else boundaries, axis=-1)
+    prefix = np.zeros(values.shape[:-1] + (len(boundaries),))
+    np.cumsum(pieces if closed else pieces[..., :-1], axis=-1, out=prefix[..., 1:])
+    return prefix[..., ends] - prefix[..., starts]
+
+
+def windowed_macd_fitness(close: np.ndarray, starts: np.ndarray, ends: np.ndarray, fast_periods: Sequence[int],
+                          slow_periods: Sequence[int], signal_periods: Sequence[int]) -> Tuple[List[Tuple[int, int, int]], np.ndarray]:
+    """Fitness semua kombinasi pada banyak jendela [start, end) satu series: (params, jendela x kombinasi)
+
+    EMA, DIF, dan DEA dihitung sekali atas seluruh series (kausal: nilai bar t hanya memakai
+    bar <= t), lalu mean(|MACD|) dan std(MACD) setiap jendela diambil dari prefix sum, sehingga
+    biayanya O(panjang series) per kombinasi berapa pun jumlah dan panjang jendelanya. Bedanya
+    dengan batched_macd_fitness pada potongan jendela hanya pemanasan EMA: di sini EMA sudah
+    berjalan sejak awal series. Urutan kombinasi sama dengan batched_macd_fitness.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    starts, ends = np.asarray(starts), np.asarray(ends)
+    emas = {p: ema(close, p) for p in sorted(set(fast_periods) | set(slow_periods))}
+    params = [(fast, slow, signal) for fast in fast_periods for slow in slow_periods if slow > fast
+              for signal in signal_periods]
+    columns = {combination: i for i, combination in enumerate(params)}
+    boundaries = np.unique(np.concatenate([starts, ends]))
+    start_pos, end_pos = np.searchsorted(boundaries, starts), np.searchsorted(boundaries, ends)
+
+    fitness = np.empty((len(starts), len(params)))
+    # DIF dengan periode slow sama punya pemanasan sama, jadi DEA-nya dihitung sebagai satu blok 2-D
+    for slow in slow_periods:
+        fasts = [fast for fast in fast_periods if fast < slow]
+        if not fasts:
+            continue
+        dif = np.stack([emas[fast] for fast in fasts]) - emas[slow]
+        for signal in signal_periods:
+            macd = dif - ema(dif, signal)
+            # NaN hanya di pemanasan awal: MACD valid mulai bar slow + signal - 2
+            first = slow + signal - 2
+            macd[:, :first] = 0.0
+            count = np.clip(ends - np.maximum(starts, first), 0, None)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = _window_sums(macd, boundaries, start_pos, end_pos) / count
+                variance = _window_sums(np.square(macd), boundaries, start_pos, end_pos) / count - mean * mean
+                std = np.sqrt(np.maximum(variance, 0.0))
+                np.abs(macd, out=macd)
+                values = np.where((count > 0) & (std > 0),
+                                  _window_sums(macd, boundaries, start_pos, end_pos) / count / std, -np.inf)
+            for row, fast in enumerate(fasts):
+                fitness[:, columns[(fast, slow, signal)]] = values[row]
+    return params, fitness
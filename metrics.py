@@ -0,0 +1,171 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Batas bucket default (detik) untuk durasi tahap pipeline
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Latensi candle close -> rekomendasi mencakup jaringan websocket, jadi rentangnya lebih lebar
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Histogram kumulatif ala Prometheus dengan label opsional"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per kombinasi label: [hitungan per bucket (+Inf terakhir), jumlah nilai]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        """Mencatat satu nilai; label diberikan berurutan sesuai labelnames"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels: str) -> "Span":
+        """Context manager yang mencatat durasi blok"""
+        return Span(self, labels)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def export(self) -> List[str]:
+        """Baris format teks Prometheus untuk histogram ini"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            pairs = [f'{k}="{v}"' for k, v in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                bucket_labels = ','.join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Span:
+    """Mengukur durasi blok `with` dan mencatatnya ke histogram (serta ke StageTimer induknya, jika ada)"""
+
+    __slots__ = ('histogram', 'labels', 'start', 'timer')
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...], timer: Optional["StageTimer"] = None):
+        self.histogram = histogram
+        self.labels = labels
+        self.timer = timer
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed, *self.labels)
+        if self.timer is not None:
+            self.timer.nested += elapsed
+        return False
+
+
+class StageTimer:
+    """Mencatat durasi tahap berurutan: setiap lap(nama) mengukur sejak lap sebelumnya
+
+    Tahap bersarang diukur dengan time(nama) dan dikurangkan dari lap yang memuatnya,
+    sehingga jumlah semua tahap sama dengan total tanpa dihitung dua kali.
+    """
+
+    __slots__ = ('histogram', 'last', 'nested')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.last = time.perf_counter()
+        self.nested = 0.0
+
+    def time(self, stage: str) -> Span:
+        return Span(self.histogram, (stage,), self)
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.histogram.observe(now - self.last - self.nested, stage)
+        self.last = now
+        self.nested = 0.0
+
+
+class MetricsRegistry:
+    """Kumpulan histogram dalam proses yang bisa diekspor sebagai teks Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help_text, labelnames, buckets)
+            return self._metrics[name]
+
+    def export(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.export()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'crypto_indicator_stage_seconds', 'Durasi setiap tahap calculate_indicators', ['stage'])
+RECOMMENDATION_SECONDS = REGISTRY.histogram(
+    'crypto_recommendation_step_seconds', 'Durasi langkah get_trading_recommendation', ['step'])
+SIGNAL_LATENCY_SECONDS = REGISTRY.histogram(
+    'crypto_kline_close_to_recommendation_seconds',
+    'Latensi dari close time candle websocket sampai analisis selesai', ['interval'], LATENCY_BUCKETS)
+APP_RENDER_SECONDS = REGISTRY.histogram(
+    'crypto_app_render_seconds', 'Durasi satu run skrip Streamlit')
+
+
+def observe_kline_latency(msg: Dict, interval: str):
+    """Latensi close time candle (ms epoch di pesan kline) sampai sekarang"""
+    close_time = msg['k']['T'] + 1
+    SIGNAL_LATENCY_SECONDS.observe(time.time() - close_time / 1000, interval)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.export().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 9108, host: str = '127.0.0.1', registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """Menjalankan endpoint /metrics untuk scrape Prometheus di thread daemon"""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry or REGISTRY})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,166 @@
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("CryptoTrader")
+
+# Jumlah level teratas untuk fitur kedalaman/imbalance
+DEFAULT_FEATURE_LEVELS = 10
+
+# Batas event yang di-buffer selama belum sinkron; event tertua dibuang (snapshot berikutnya divalidasi ulang)
+MAX_BUFFERED_EVENTS = 10_000
+
+
+class BookSide:
+    """Level harga satu sisi order book dalam list terurut (array dinamis) dengan pencarian bisect
+
+    Kunci disimpan naik dengan level terbaik di ujung list (bid: harga, ask: -harga), jadi
+    update di sekitar harga terbaik, yang paling sering terjadi, hanya menggeser sedikit elemen.
+    """
+
+    def __init__(self, best_is_highest: bool):
+        self._sign = 1.0 if best_is_highest else -1.0
+        self._keys: List[float] = []
+        self._quantities: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._quantities.clear()
+
+    def set(self, price: float, quantity: float):
+        """Mengganti kuantitas sebuah level (nilai absolut); kuantitas 0 menghapus level"""
+        key = self._sign * price
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            if quantity == 0:
+                del self._keys[i]
+                del self._quantities[i]
+            else:
+                self._quantities[i] = quantity
+        elif quantity != 0:
+            self._keys.insert(i, key)
+            self._quantities.insert(i, quantity)
+
+    def load(self, levels: List[List[str]]):
+        """Mengisi ulang dari level snapshot REST ([harga, kuantitas] string)"""
+        pairs = sorted((self._sign * float(p), float(q)) for p, q in levels if float(q) != 0)
+        self._keys = [k for k, _ in pairs]
+        self._quantities = [q for _, q in pairs]
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self._keys:
+            return None
+        return self._sign * self._keys[-1], self._quantities[-1]
+
+    def top(self, n: int) -> List[Tuple[float, float]]:
+        """N level terbaik, dari yang terbaik"""
+        start = max(len(self._keys) - n, 0)
+        return [(self._sign * k, q) for k, q in zip(reversed(self._keys[start:]), reversed(self._quantities[start:]))]
+
+    def depth(self, n: int) -> float:
+        """Total kuantitas N level terbaik"""
+        return sum(self._quantities[-n:]) if n > 0 else 0.0
+
+
+class LocalOrderBook:
+    """Order book lokal yang disinkronkan dari snapshot REST dan stream diff-depth Binance
+
+    Urutan sinkronisasi (aturan Binance): event stream di-buffer sampai snapshot dimuat;
+    event dengan u <= lastUpdateId dibuang, event pertama yang dipakai harus memenuhi
+    U <= lastUpdateId + 1 <= u, dan setiap event berikutnya harus bersambung (U = u sebelumnya + 1).
+    Celah urutan membuat book tidak sinkron sampai snapshot baru dimuat.
+    """
+
+    def __init__(self, symbol: str, feature_levels: int = DEFAULT_FEATURE_LEVELS):
+        self.symbol = symbol.upper()
+        self.feature_levels = feature_levels
+        self.bids = BookSide(best_is_highest=True)
+        self.asks = BookSide(best_is_highest=False)
+        self.last_update_id = 0
+        self.synced = False
+        self._buffer = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self._lock = threading.Lock()
+        # Diset saat ada event di buffer: snapshot baru berguna setelah stream mulai mengalir
+        self._buffered = threading.Event()
+
+    def on_event(self, msg: Dict) -> bool:
+        """Memproses satu event depthUpdate; False jika terdeteksi celah dan snapshot baru diperlukan"""
+        with self._lock:
+            if not self.synced:
+                self._buffer.append(msg)
+                self._buffered.set()
+                return True
+            if self._apply(msg):
+                return True
+            logger.warning(f"Order book {self.symbol} sequence gap "
+                           f"(local {self.last_update_id}, event {msg['U']}..{msg['u']}), resyncing")
+            self.synced = False
+            self._buffer.clear()
+            self._buffer.append(msg)
+            self._buffered.set()
+            return False
+
+    def load_snapshot(self, snapshot: Dict) -> bool:
+        """Memuat snapshot REST lalu menerapkan event yang di-buffer; False jika snapshot terlalu lama"""
+        with self._lock:
+            last_update_id = int(snapshot['lastUpdateId'])
+            if self._buffer and last_update_id < self._buffer[0]['U'] - 1:
+                # Snapshot lebih tua dari event pertama yang di-buffer: ambil snapshot lagi
+                return False
+            self.bids.load(snapshot['bids'])
+            self.asks.load(snapshot['asks'])
+            self.last_update_id = last_update_id
+            buffered = list(self._buffer)
+            self._buffer.clear()
+            self._buffered.clear()
+            for msg in buffered:
+                if not self._apply(msg):
+                    return False
+            self.synced = True
+            return True
+
+    def wait_buffered(self, timeout: Optional[float] = None) -> bool:
+        """Menunggu sampai ada event stream di buffer (sebelum mengambil snapshot)"""
+        return self._buffered.wait(timeout)
+
+    def _apply(self, msg: Dict) -> bool:
+        if msg['u'] <= self.last_update_id:
+            return True
+        if msg['U'] > self.last_update_id + 1:
+            return False
+        for price, quantity in msg['b']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in msg['a']:
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = msg['u']
+        return True
+
+    def top(self, n: int = DEFAULT_FEATURE_LEVELS) -> Dict[str, List[Tuple[float, float]]]:
+        with self._lock:
+            return {'bids': self.bids.top(n), 'asks': self.asks.top(n)}
+
+    def features(self) -> Dict:
+        """Spread dan imbalance kedalaman N level teratas; {} jika book belum sinkron"""
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+            if not self.synced or bid is None or ask is None:
+                return {}
+            bid_depth = self.bids.depth(self.feature_levels)
+            ask_depth = self.asks.depth(self.feature_levels)
+        mid = (bid[0] + ask[0]) / 2
+        total = bid_depth + ask_depth
+        return {
+            'best_bid': bid[0],
+            'best_ask': ask[0],
+            'spread': ask[0] - bid[0],
+            'spread_bps': (ask[0] - bid[0]) / mid * 10_000,
+            'bid_depth': bid_depth,
+            'ask_depth': ask_depth,
+            # -1 (semua di sisi ask) .. 1 (semua di sisi bid)
+            'imbalance': (bid_depth - ask_depth) / total if total > 0 else 0.0
+        }
@@ -0,0 +1,330 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backfill import INTERVAL_MS
+
+logger = logging.getLogger("CryptoTrader")
+
+# Field harga/volume pesan kline websocket (string di payload Binance)
+_MESSAGE_FLOATS = ['o', 'h', 'l', 'c', 'v', 'q', 'V']
+_MESSAGE_INTS = ['t', 'T', 'n', 'E']
+
+StreamKey = Tuple[str, str]
+
+
+class MarketRecording:
+    """Rekaman respons REST klines dan pesan kline websocket per (simbol, interval)
+
+    Pesan disimpan kolumnar (satu array per field) sehingga file kecil dan replay
+    ribuan pesan per detik tidak perlu mem-parse JSON per pesan.
+    """
+
+    def __init__(self):
+        # Baris klines REST unik per stream (open time -> baris mentah)
+        self.klines: Dict[StreamKey, Dict[int, list]] = {}
+        # Pesan websocket per stream: daftar (waktu terima, pesan)
+        self.messages: Dict[StreamKey, List[Tuple[float, Dict]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(symbol: str, interval: str) -> StreamKey:
+        return symbol.upper(), interval
+
+    def add_klines(self, symbol: str, interval: str, klines: list):
+        with self._lock:
+            rows = self.klines.setdefault(self._key(symbol, interval), {})
+            for k in klines:
+                rows[int(k[0])] = list(k)
+
+    def add_message(self, symbol: str, interval: str, msg: Dict, received: Optional[float] = None):
+        with self._lock:
+            self.messages.setdefault(self._key(symbol, interval), []).append(
+                (time.time() if received is None else received, msg))
+
+    @classmethod
+    def from_klines(cls, symbol: str, interval: str, klines: list, history: int = 500,
+                    updates_per_candle: int = 0) -> "MarketRecording":
+        """Rekaman sintetis dari klines REST: `history` candle pertama sebagai riwayat REST,
+        sisanya sebagai pesan websocket (opsional dengan update candle belum close sebelumnya)"""
+        recording = cls()
+        recording.extend_from_klines(symbol, interval, klines, history, updates_per_candle)
+        return recording
+
+    def extend_from_klines(self, symbol: str, interval: str, klines: list, history: int = 500,
+                           updates_per_candle: int = 0):
+        step = INTERVAL_MS[interval]
+        self.add_klines(symbol, interval, klines[:history])
+        for k in klines[history:]:
+            open_time = int(k[0])
+            for i in range(updates_per_candle):
+                event = open_time + (i + 1) * step // (updates_per_candle + 1)
+                self.add_message(symbol, interval, _kline_message(symbol, interval, k, event, False), event / 1000)
+            close_event = open_time + step
+            self.add_message(symbol, interval, _kline_message(symbol, interval, k, close_event, True), close_event / 1000)
+            # Setelah candle close, REST juga mengenal candle tersebut (untuk backfill celah)
+            self.add_klines(symbol, interval, [k])
+
+    def save(self, path: str):
+        """Menyimpan rekaman ke satu file .npz terkompresi"""
+        arrays = {}
+        streams = []
+        with self._lock:
+            for i, (key, items) in enumerate(sorted(self.messages.items())):
+                streams.append(list(key))
+                arrays[f"{i}_received"] = np.array([r for r, _ in items], dtype=np.float64)
+                arrays[f"{i}_x"] = np.array([m['k']['x'] for _, m in items], dtype=bool)
+                for name in _MESSAGE_INTS:
+                    source = (lambda m: m['E']) if name == 'E' else (lambda m, n=name: m['k'][n])
+                    arrays[f"{i}_{name}"] = np.array([source(m) for _, m in items], dtype=np.int64)
+                for name in _MESSAGE_FLOATS:
+                    arrays[f"{i}_{name}"] = np.array([float(m['k'][name]) for _, m in items], dtype=np.float64)
+            rest = [[list(key), sorted(rows.values())] for key, rows in sorted(self.klines.items())]
+        payload = json.dumps({'streams': streams, 'rest': rest}).encode()
+        arrays['meta'] = np.frombuffer(gzip.compress(payload), dtype=np.uint8)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "MarketRecording":
+        recording = cls()
+        with np.load(path) as data:
+            meta = json.loads(gzip.decompress(data['meta'].tobytes()))
+            for (symbol, interval), rows in meta['rest']:
+                recording.add_klines(symbol, interval, rows)
+            for i, (symbol, interval) in enumerate(meta['streams']):
+                columns = {name: data[f"{i}_{name}"] for name in _MESSAGE_INTS + _MESSAGE_FLOATS + ['x', 'received']}
+                items = recording.messages.setdefault(cls._key(symbol, interval), [])
+                for j in range(len(columns['received'])):
+                    k = {name: int(columns[name][j]) for name in ('t', 'T', 'n')}
+                    k.update({name: repr(float(columns[name][j])) for name in _MESSAGE_FLOATS})
+                    k.update({'s': symbol, 'i': interval, 'x': bool(columns['x'][j])})
+                    items.append((float(columns['received'][j]),
+                                  {'e': 'kline', 'E': int(columns['E'][j]), 's': symbol, 'k': k}))
+        return recording
+
+    def attach(self, system):
+        """Merekam semua request klines dan pesan kline yang diterima sebuah CryptoTradingSystem"""
+        system.client = RecordingClient(system.client, self)
+        system.socket_manager = RecordingSocketManager(system.socket_manager, self)
+
+
+def _kline_message(symbol: str, interval: str, k: list, event_ms: int, closed: bool) -> Dict:
+    """Pesan kline websocket Binance dari satu baris klines REST"""
+    return {
+        'e': 'kline',
+        'E': int(event_ms),
+        's': symbol.upper(),
+        'k': {
+            't': int(k[0]), 'T': int(k[6]), 's': symbol.upper(), 'i': interval,
+            'o': k[1], 'h': k[2], 'l': k[3], 'c': k[4], 'v': k[5],
+            'n': int(k[8]), 'x': closed, 'q': k[7], 'V': k[9], 'Q': k[10]
+        }
+    }
+
+
+class RecordingClient:
+    """Meneruskan request ke client asli dan merekam respons get_klines"""
+
+    def __init__(self, client, recording: MarketRecording):
+        self._client = client
+        self._recording = recording
+
+    def get_klines(self, **params):
+        klines = self._client.get_klines(**params)
+        self._recording.add_klines(params['symbol'], params['interval'], klines)
+        return klines
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _RecordingSocket:
+    def __init__(self, socket, recording: MarketRecording, symbol: str, interval: str):
+        self._socket = socket
+        self._recording = recording
+        self._key = (symbol, interval)
+
+    def start(self):
+        self._socket.start()
+
+    def stop(self):
+        self._socket.stop()
+
+    def add_listener(self, callback: Callable):
+        def listener(msg):
+            if msg.get('e') == 'kline':
+                self._recording.add_message(*self._key, msg)
+            callback(msg)
+        self._socket.add_listener(listener)
+
+
+class RecordingSocketManager:
+    """Membungkus socket manager agar setiap pesan kline ikut direkam"""
+
+    def __init__(self, socket_manager, recording: MarketRecording):
+        self._socket_manager = socket_manager
+        self._recording = recording
+
+    def kline_socket(self, symbol: str, interval: str):
+        return _RecordingSocket(self._socket_manager.kline_socket(symbol=symbol, interval=interval),
+                                self._recording, symbol, interval)
+
+    def __getattr__(self, name):
+        return getattr(self._socket_manager, name)
+
+
+class MarketReplay:
+    """Memutar ulang rekaman sebagai pengganti Binance: ReplayClient dan ReplaySocketManager
+
+    Satu thread pemutar mengirim pesan semua stream berurutan waktu terima ke listener
+    socket yang cocok; pemutaran dimulai dengan start() setelah stream berlangganan.
+    `speed` 1.0 = waktu nyata, 100.0 = 100x lebih cepat, None = secepat listener
+    mampu memproses. Listener dipanggil langsung di thread pemutar,
+    jadi pipeline yang jenuh terlihat sebagai lag terhadap jadwal.
+    """
+
+    def __init__(self, recording: MarketRecording, speed: Optional[float] = 1.0):
+        self.recording = recording
+        self.speed = speed
+        self._listeners: Dict[StreamKey, List[Callable]] = {}
+        self._lock = threading.Lock()
+        # Urutan global semua pesan
+        events = [(received, key, msg) for key, items in recording.messages.items() for received, msg in items]
+        events.sort(key=lambda e: e[0])
+        self._events = events
+        # Jam replay (ms): REST hanya melihat candle yang sudah dibuka pada waktu ini
+        self.clock_ms = int(events[0][2]['E']) if events else int(time.time() * 1000)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {'messages': 0, 'seconds': 0.0, 'handler_seconds': 0.0, 'max_handler_seconds': 0.0,
+                      'max_lag_seconds': 0.0}
+
+    def client(self) -> "ReplayClient":
+        return ReplayClient(self)
+
+    def socket_manager(self) -> "ReplaySocketManager":
+        return ReplaySocketManager(self)
+
+    def _subscribe(self, key: StreamKey, callback: Callable):
+        with self._lock:
+            self._listeners.setdefault(key, []).append(callback)
+
+    def _unsubscribe(self, key: StreamKey, callbacks: List[Callable]):
+        with self._lock:
+            remaining = [c for c in self._listeners.get(key, []) if c not in callbacks]
+            self._listeners[key] = remaining
+
+    def start(self):
+        """Mulai memutar di thread latar"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="market-replay", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Menunggu pemutaran selesai; True jika selesai"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """Memutar semua pesan (blocking)"""
+        if not self._events:
+            return
+        stats = self.stats
+        first = self._events[0][0]
+        started = time.perf_counter()
+        for received, key, msg in self._events:
+            if self._stop.is_set():
+                break
+            if self.speed:
+                due = (received - first) / self.speed
+                wait = due - (time.perf_counter() - started)
+                if wait > 0:
+                    time.sleep(wait)
+                else:
+                    stats['max_lag_seconds'] = max(stats['max_lag_seconds'], -wait)
+
+            self.clock_ms = max(self.clock_ms, int(msg['E']))
+            with self._lock:
+                listeners = list(self._listeners.get(key, ()))
+            handler_start = time.perf_counter()
+            for callback in listeners:
+                try:
+                    callback(msg)
+                except Exception as e:
+                    logger.error(f"Replay listener failed: {e}")
+            elapsed = time.perf_counter() - handler_start
+            stats['messages'] += 1
+            stats['handler_seconds'] += elapsed
+            stats['max_handler_seconds'] = max(stats['max_handler_seconds'], elapsed)
+        stats['seconds'] = time.perf_counter() - started
+        stats['rate'] = stats['messages'] / stats['seconds'] if stats['seconds'] > 0 else float('inf')
+        logger.info(f"Replay finished: {stats['messages']} messages in {stats['seconds']:.2f}s "
+                    f"({stats['rate']:.0f} msg/s)")
+
+
+class ReplayClient:
+    """Pengganti Client.get_klines yang melayani klines rekaman sampai jam replay"""
+
+    def __init__(self, replay: MarketReplay):
+        self._replay = replay
+        self._open_times: Dict[StreamKey, np.ndarray] = {}
+        self._rows: Dict[StreamKey, list] = {}
+        for key, rows in replay.recording.klines.items():
+            ordered = sorted(rows)
+            self._open_times[key] = np.array(ordered, dtype=np.int64)
+            self._rows[key] = [rows[t] for t in ordered]
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500, startTime: Optional[int] = None,
+                   endTime: Optional[int] = None, **kwargs) -> list:
+        key = MarketRecording._key(symbol, interval)
+        open_times = self._open_times.get(key)
+        if open_times is None:
+            return []
+        rows = self._rows[key]
+        # Candle yang belum dibuka menurut jam replay belum "ada" di bursa
+        end = int(np.searchsorted(open_times, self._replay.clock_ms, side='right'))
+        if endTime is not None:
+            end = min(end, int(np.searchsorted(open_times, endTime, side='right')))
+        if startTime is not None:
+            start = int(np.searchsorted(open_times, startTime, side='left'))
+            return rows[start:min(start + limit, end)]
+        return rows[max(0, end - limit):end]
+
+
+class _ReplaySocket:
+    def __init__(self, replay: MarketReplay, key: StreamKey):
+        self._replay = replay
+        self._key = key
+        self._callbacks: List[Callable] = []
+
+    def start(self):
+        # Pemutaran dimulai lewat MarketReplay.start() setelah semua stream berlangganan,
+        # agar pesan awal tidak terkirim sebelum listener terpasang
+        pass
+
+    def stop(self):
+        self._replay._unsubscribe(self._key, self._callbacks)
+
+    def add_listener(self, callback: Callable):
+        self._callbacks.append(callback)
+        self._replay._subscribe(self._key, callback)
+
+
+class ReplaySocketManager:
+    """Pengganti BinanceSocketManager.kline_socket yang dilayani MarketReplay"""
+
+    def __init__(self, replay: MarketReplay):
+        self._replay = replay
+
+    def kline_socket(self, symbol: str, interval: str) -> _ReplaySocket:
+        return _ReplaySocket(self._replay, MarketRecording._key(symbol, interval))
@@ -0,0 +1,314 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger("CryptoTrader")
+
+# Prioritas request (angka kecil dilayani lebih dulu)
+PRIORITY_REALTIME = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BULK = 2
+
+# Batas bobot request per menit per IP dan porsi yang boleh dipakai (sisanya cadangan untuk proses lain/selisih hitung)
+MAX_WEIGHT_PER_MINUTE = 1200
+WEIGHT_UTILIZATION = 0.9
+
+# Header bobot terpakai yang dikirim Binance pada setiap respons REST
+USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+
+# Percobaan ulang setelah 429 dan jeda default jika respons tidak membawa Retry-After (detik)
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER = 60.0
+
+# Request bulk yang boleh antre sebelum pemanggil baru ditolak, dan lama tunggu maksimum sebelum ditolak (detik)
+MAX_PENDING_BULK = 64
+MAX_WAIT_SECONDS = 120.0
+
+# Interval cek ulang antrean untuk pemanggil asyncio, yang tidak bisa menunggu threading.Condition (detik)
+ASYNC_POLL_SECONDS = 0.02
+
+
+class RequestThrottled(Exception):
+    """Request ditolak karena anggaran bobot/antrean penuh atau IP sedang dibatasi Binance"""
+
+
+def depth_request_weight(limit: int) -> int:
+    """Bobot GET /api/v3/depth menurut limit"""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+class _Ticket:
+    """Satu request dalam antrean; request identik yang datang belakangan menunggu hasilnya"""
+
+    __slots__ = ('key', 'weight', 'priority', 'started', 'event', 'value', 'error')
+
+    def __init__(self, key: Optional[Hashable], weight: int, priority: int):
+        self.key = key
+        self.weight = weight
+        self.priority = priority
+        self.started = False
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestScheduler:
+    """Penjadwal semua request REST Binance dalam proses berdasarkan bobot dan prioritas
+
+    Bobot dibatasi token bucket (`budget` bobot per menit, terisi merata) yang dicocokkan dengan
+    bobot terpakai menurut header `x-mbx-used-weight-1m` pada jendela menit yang sama, sehingga
+    request dari proses lain dengan IP yang sama ikut diperhitungkan. Antrean diurutkan menurut
+    prioritas lalu urutan datang; request dengan key sama yang belum selesai digabung menjadi satu.
+    429 membuat semua request menunggu Retry-After lalu diulang; 418 (IP diblokir) dan antrean
+    bulk yang penuh ditolak dengan RequestThrottled agar pemanggil mundur alih-alih memperpanjang ban.
+    """
+
+    def __init__(self, max_weight_per_minute: int = MAX_WEIGHT_PER_MINUTE, utilization: float = WEIGHT_UTILIZATION,
+                 max_pending_bulk: int = MAX_PENDING_BULK, max_wait: float = MAX_WAIT_SECONDS):
+        self.budget = max(int(max_weight_per_minute * utilization), 1)
+        self.max_pending_bulk = max_pending_bulk
+        self.max_wait = max_wait
+        self._tokens = float(self.budget)
+        self._refilled_at = time.monotonic()
+        # Bobot terpakai menurut server pada menit (epoch // 60) tertentu
+        self._server_used = 0
+        self._server_minute = 0
+        self._blocked_until = 0.0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._pending: Dict[Hashable, _Ticket] = {}
+        self._cond = threading.Condition()
+        self.stats = {'requests': 0, 'coalesced': 0, 'retries': 0, 'rejected': 0, 'weight': 0}
+
+    def call(self, fn: Callable[[], Any], weight: int, priority: int = PRIORITY_INTERACTIVE,
+             key: Optional[Hashable] = None, response: Optional[Callable[[], Any]] = None) -> Any:
+        """Menjalankan fn() setelah mendapat giliran dan anggaran bobot; `response()` mengembalikan respons HTTP terakhir (untuk header)"""
+        ticket, leader = self._join(key, weight, priority)
+        if not leader:
+            ticket.event.wait()
+            return self._result(ticket)
+
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                self._acquire(ticket)
+                try:
+                    ticket.value = fn()
+                    self._observe(response)
+                    return ticket.value
+                except Exception as e:
+                    self._observe(response)
+                    if not self._should_retry(e, attempt):
+                        raise
+        except BaseException as e:
+            ticket.error = e
+            raise
+        finally:
+            self._finish(ticket)
+
+    async def call_async(self, fn: Callable[[], Awaitable], weight: int, priority: int = PRIORITY_INTERACTIVE,
+                         key: Optional[Hashable] = None, response: Optional[Callable[[], Any]] = None) -> Any:
+        """Seperti call untuk coroutine (mis. AsyncClient): antrean dan anggaran bobot yang sama, menunggu tanpa memblokir event loop"""
+        ticket, leader = self._join(key, weight, priority)
+        if not leader:
+            while not ticket.event.is_set():
+                await asyncio.sleep(ASYNC_POLL_SECONDS)
+            return self._result(ticket)
+
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                await self._acquire_async(ticket)
+                try:
+                    ticket.value = await fn()
+                    self._observe(response)
+                    return ticket.value
+                except Exception as e:
+                    self._observe(response)
+                    if not self._should_retry(e, attempt):
+                        raise
+        except BaseException as e:
+            ticket.error = e
+            raise
+        finally:
+            self._finish(ticket)
+
+    def _join(self, key: Optional[Hashable], weight: int, priority: int) -> Tuple[_Ticket, bool]:
+        """Ticket baru (leader) atau ticket request identik yang belum selesai untuk ditunggu hasilnya"""
+        with self._cond:
+            ticket = self._pending.get(key) if key is not None else None
+            if ticket is not None:
+                self.stats['coalesced'] += 1
+                if priority < ticket.priority and not ticket.started:
+                    # Request prioritas tinggi yang menumpang menaikkan prioritas request yang sudah antre
+                    ticket.priority = priority
+                    heapq.heappush(self._queue, (priority, next(self._sequence), ticket))
+                    self._cond.notify_all()
+                return ticket, False
+            if priority >= PRIORITY_BULK and self._bulk_pending() >= self.max_pending_bulk:
+                self.stats['rejected'] += 1
+                raise RequestThrottled("Too many pending bulk requests")
+            ticket = _Ticket(key, weight, priority)
+            if key is not None:
+                self._pending[key] = ticket
+            return ticket, True
+
+    @staticmethod
+    def _result(ticket: _Ticket) -> Any:
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.value
+
+    def _finish(self, ticket: _Ticket):
+        with self._cond:
+            if ticket.key is not None and self._pending.get(ticket.key) is ticket:
+                del self._pending[ticket.key]
+        ticket.event.set()
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """429: tahan semua request selama Retry-After lalu ulangi; 418 atau percobaan terakhir: RequestThrottled"""
+        status = getattr(error, 'status_code', None)
+        if status not in (418, 429):
+            return False
+        retry_after = self._retry_after(error)
+        self._block(retry_after, status)
+        if status == 418 or attempt == MAX_RETRIES:
+            raise RequestThrottled(f"Binance rate limit (HTTP {status}), retry after {retry_after:.0f}s") from error
+        self.stats['retries'] += 1
+        return True
+
+    def _bulk_pending(self) -> int:
+        return sum(1 for _, _, t in self._queue if not t.started and t.priority >= PRIORITY_BULK)
+
+    def _enqueue(self, ticket: _Ticket) -> float:
+        """Memasukkan ticket ke antrean (dipanggil dengan _cond); mengembalikan batas waktu tunggu"""
+        ticket.started = False
+        heapq.heappush(self._queue, (ticket.priority, next(self._sequence), ticket))
+        return time.monotonic() + self.max_wait
+
+    def _try_acquire(self, ticket: _Ticket, deadline: float) -> Optional[float]:
+        """Satu langkah acquire (dipanggil dengan _cond): None jika ticket mendapat giliran dan bobot, selain itu lama tunggu"""
+        self._drop_stale()
+        now = time.monotonic()
+        if self._queue[0][2] is ticket:
+            wait = self._wait_for(ticket.weight, now)
+            if wait <= 0:
+                heapq.heappop(self._queue)
+                ticket.started = True
+                self._tokens -= ticket.weight
+                self._server_used += ticket.weight
+                self.stats['requests'] += 1
+                self.stats['weight'] += ticket.weight
+                return None
+        else:
+            wait = None
+        if now >= deadline or (wait is not None and now + wait > deadline):
+            self.stats['rejected'] += 1
+            if now < self._blocked_until:
+                raise RequestThrottled(f"REST requests paused by Binance rate limit for {self._blocked_until - now:.0f}s")
+            raise RequestThrottled(f"Request weight budget exhausted for {self.max_wait:.0f}s")
+        return wait if wait is not None else deadline - now
+
+    def _release(self, ticket: _Ticket):
+        """Penutup acquire (dipanggil dengan _cond): ticket yang ditolak dikeluarkan dari antrean"""
+        if not ticket.started:
+            # Entri di heap dibuang saat mencapai depan
+            ticket.started = True
+        self._cond.notify_all()
+
+    def _acquire(self, ticket: _Ticket):
+        """Menunggu sampai ticket berada di depan antrean dan bobotnya muat dalam anggaran"""
+        with self._cond:
+            deadline = self._enqueue(ticket)
+            try:
+                while True:
+                    wait = self._try_acquire(ticket, deadline)
+                    if wait is None:
+                        return
+                    self._cond.wait(wait)
+            finally:
+                self._release(ticket)
+
+    async def _acquire_async(self, ticket: _Ticket):
+        """Seperti _acquire tanpa memblokir event loop: lock hanya dipegang sebentar per langkah"""
+        with self._cond:
+            deadline = self._enqueue(ticket)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(ticket, deadline)
+                if wait is None:
+                    return
+                # Tidak dibangunkan Condition: cek ulang paling lambat setiap ASYNC_POLL_SECONDS
+                await asyncio.sleep(min(wait, ASYNC_POLL_SECONDS))
+        finally:
+            with self._cond:
+                self._release(ticket)
+
+    def _drop_stale(self):
+        # Entri usang: ticket yang sudah jalan/ditolak atau entri lama dari ticket yang prioritasnya dinaikkan
+        while self._queue and (self._queue[0][2].started or self._queue[0][0] != self._queue[0][2].priority):
+            heapq.heappop(self._queue)
+
+    def _wait_for(self, weight: int, now: float) -> float:
+        """Lama tunggu (detik) sampai bobot muat di token bucket dan di jendela menit server; 0 jika muat"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._tokens = min(self.budget, self._tokens + (now - self._refilled_at) * self.budget / 60)
+        self._refilled_at = now
+        weight = min(weight, self.budget)
+        wait = max((weight - self._tokens) * 60 / self.budget, 0.0)
+
+        epoch = time.time()
+        if int(epoch // 60) != self._server_minute:
+            self._server_minute = int(epoch // 60)
+            self._server_used = 0
+        if self._server_used + weight > self.budget:
+            wait = max(wait, 60 - epoch % 60 + 0.05)
+        return wait
+
+    def _observe(self, response: Optional[Callable[[], Any]]):
+        """Mencocokkan hitungan lokal dengan bobot terpakai yang dilaporkan server"""
+        resp = response() if response is not None else None
+        used = getattr(resp, 'headers', {}).get(USED_WEIGHT_HEADER) if resp is not None else None
+        if used is None:
+            return
+        with self._cond:
+            minute = int(time.time() // 60)
+            if minute != self._server_minute:
+                self._server_minute = minute
+                self._server_used = 0
+            # Respons bersamaan bisa datang tidak berurutan: bobot terpakai dalam satu menit hanya naik
+            self._server_used = max(self._server_used, int(used))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> float:
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            return float(headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER
+
+    def _block(self, seconds: float, status: int):
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._cond.notify_all()
+        logger.warning(f"Binance rate limit hit (HTTP {status}), pausing REST requests for {seconds:.0f}s")
+
+    def blocked_for(self) -> float:
+        """Sisa waktu (detik) semua request ditahan karena 429/418"""
+        with self._cond:
+            return max(self._blocked_until - time.monotonic(), 0.0)
+
+
+# Anggaran bobot berlaku per IP: satu penjadwal untuk semua CryptoTradingSystem dalam proses
+REQUEST_SCHEDULER = RequestScheduler()
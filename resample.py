@@ -0,0 +1,120 @@
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from backfill import INTERVAL_MS
+from candle_buffer import CandleRingBuffer
+from kline_parser import KLINE_COLUMNS, columns_to_frame
+
+# Candle mingguan Binance dibuka hari Senin 00:00 UTC; epoch (1970-01-01) jatuh pada hari Kamis
+_WEEK_OFFSET_MS = 4 * 24 * 60 * 60_000
+
+# Timeframe yang dibangun dari feed M1
+DEFAULT_TIMEFRAMES = ['3m', '5m', '15m', '30m', '1h', '4h', '1d']
+
+_SUM_COLUMNS = ['volume', 'quote_volume', 'taker_buy_volume', 'trades']
+
+
+def bucket_start(open_time: np.ndarray, interval: str) -> np.ndarray:
+    """Open time candle timeframe `interval` yang memuat setiap open time (ms)"""
+    step = INTERVAL_MS[interval]
+    offset = _WEEK_OFFSET_MS if interval == '1w' else 0
+    return (open_time - offset) // step * step + offset
+
+
+def resample_columns(columns: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """Agregasi OHLCV kolom candle berurutan ke timeframe lebih tinggi dengan reduceat"""
+    open_time = np.asarray(columns['timestamp'], dtype=np.int64)
+    if len(open_time) == 0:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in KLINE_COLUMNS.items()}
+
+    buckets = bucket_start(open_time, interval)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(buckets)])) - 1
+
+    result = {
+        'timestamp': buckets[starts],
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends]
+    }
+    for name in _SUM_COLUMNS:
+        result[name] = np.add.reduceat(columns[name], starts)
+    return {name: result[name].astype(dtype, copy=False) for name, dtype in KLINE_COLUMNS.items()}
+
+
+def resample_frame(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Resample DataFrame hasil get_klines ke timeframe lebih tinggi"""
+    if df.empty:
+        return df
+    columns = {name: df[name].to_numpy() for name in KLINE_COLUMNS if name != 'timestamp'}
+    columns['timestamp'] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    return columns_to_frame(resample_columns(columns, interval))
+
+
+class MultiTimeframeAggregator:
+    """Membangun candle beberapa timeframe dari satu feed candle M1 yang sudah close
+
+    Setiap timeframe disimpan di CandleRingBuffer sendiri. Candle terakhir bisa
+    masih parsial (belum semua menit masuk) dan diperbarui setiap kali candle M1
+    baru close, sama seperti candle yang sedang terbentuk pada respons REST.
+    """
+
+    def __init__(self, timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, capacity: int = 500):
+        self.timeframes = list(timeframes)
+        self.capacity = capacity
+        self.buffers = {tf: CandleRingBuffer(capacity) for tf in self.timeframes}
+        # Candle terakhir (mungkin parsial) per timeframe sebagai kolom satu baris
+        self._partial: Dict[str, Dict[str, np.ndarray]] = {}
+        self._last_open_time: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def seed(self, timeframe: str, df: pd.DataFrame):
+        """Mengisi riwayat candle timeframe yang sudah close (mis. dari get_klines timeframe itu)"""
+        self.buffers[timeframe].extend_frame(df)
+
+    def update(self, columns: Dict[str, np.ndarray]):
+        """Menambahkan candle M1 yang sudah close (satu atau banyak baris berurutan)"""
+        open_time = np.asarray(columns['timestamp'], dtype=np.int64)
+        with self._lock:
+            # Candle M1 yang sudah pernah masuk tidak boleh terhitung dua kali
+            fresh = open_time > self._last_open_time if self._last_open_time is not None else slice(None)
+            columns = {name: np.asarray(columns[name])[fresh] for name in KLINE_COLUMNS}
+            if len(columns['timestamp']) == 0:
+                return
+            self._last_open_time = int(columns['timestamp'][-1])
+
+            for tf in self.timeframes:
+                bars = resample_columns(columns, tf)
+                partial = self._partial.get(tf)
+                if partial is not None and bars['timestamp'][0] == partial['timestamp'][0]:
+                    # Gabungkan dengan candle parsial yang sedang terbentuk
+                    bars['open'][0] = partial['open'][0]
+                    bars['high'][0] = max(bars['high'][0], partial['high'][0])
+                    bars['low'][0] = min(bars['low'][0], partial['low'][0])
+                    for name in _SUM_COLUMNS:
+                        bars[name][0] += partial[name][0]
+                self.buffers[tf].extend(bars)
+                self._partial[tf] = {name: values[-1:].copy() for name, values in bars.items()}
+
+    def update_frame(self, df: pd.DataFrame):
+        """Menambahkan DataFrame candle M1 (mis. riwayat awal atau hasil backfill celah)"""
+        if df.empty:
+            return
+        columns = {name: df[name].to_numpy() for name in KLINE_COLUMNS if name != 'timestamp'}
+        columns['timestamp'] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        self.update(columns)
+
+    def is_closed(self, timeframe: str) -> bool:
+        """Apakah candle terakhir timeframe sudah lengkap (menit terakhirnya sudah close)"""
+        partial = self._partial.get(timeframe)
+        if partial is None:
+            return False
+        return self._last_open_time + INTERVAL_MS['1m'] >= partial['timestamp'][0] + INTERVAL_MS[timeframe]
+
+    def frame(self, timeframe: str) -> pd.DataFrame:
+        """Candle timeframe dalam urutan kronologis, termasuk candle parsial terakhir"""
+        return self.buffers[timeframe].to_frame()
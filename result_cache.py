@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger("CryptoTrader")
+
+# Jumlah hasil yang disimpan di memori (LRU)
+RESULT_CACHE_SIZE = 256
+
+
+class _Flight:
+    """Satu komputasi yang sedang berjalan; permintaan lain dengan key sama menunggu hasilnya"""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """Cache hasil analisis bersama untuk semua sesi/pemanggil dalam satu proses
+
+    Entri kedaluwarsa pada waktu yang ditentukan pemanggil (mis. close candle berikutnya)
+    dan dibuang secara LRU jika melebihi `max_entries`. Permintaan bersamaan untuk key
+    yang sama berbagi satu komputasi (single-flight). Tier disk opsional menyimpan hasil
+    dengan pickle agar proses lain atau restart bisa memakainya sampai kedaluwarsa.
+    Nilai yang dikembalikan dibagi antar pemanggil, jadi tidak boleh diubah.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = None
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'shared': 0}
+        self.set_disk_dir(disk_dir)
+
+    def set_disk_dir(self, disk_dir: Optional[str]):
+        """Mengaktifkan (atau mematikan dengan None) tier disk"""
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self.disk_dir = disk_dir
+
+    def get_or_compute(self, key: Hashable, expires_at: float, compute: Callable[[], Any],
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Hasil untuk key dari memori/disk, atau hasil compute() yang lalu disimpan sampai `expires_at` (epoch detik)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            stored = self._load_disk(key, now)
+            if stored is not None:
+                expires_at, value = stored
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                self._remember(key, expires_at, value)
+            else:
+                with self._lock:
+                    self.stats['misses'] += 1
+                value = compute()
+                if expires_at > time.time() and (cacheable is None or cacheable(value)):
+                    self._remember(key, expires_at, value)
+                    self._save_disk(key, expires_at, value)
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _remember(self, key: Hashable, expires_at: float, value: Any):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: Hashable) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".pkl")
+
+    def _load_disk(self, key: Hashable, now: float) -> Optional[Tuple[float, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable result cache file {path}: {e}")
+            stored_key, expires_at, value = None, 0.0, None
+        if stored_key != key or expires_at <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return expires_at, value
+
+    def _save_disk(self, key: Hashable, expires_at: float, value: Any):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write result cache file {path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache bersama semua CryptoTradingSystem dalam proses (mis. semua sesi Streamlit)
+RESULT_CACHE = ResultCache()
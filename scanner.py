@@ -0,0 +1,130 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from batch_indicators import batch_indicators, RECOMMENDATION_BUY, RECOMMENDATION_SELL
+from compact_frame import compact_ranking
+from request_scheduler import PRIORITY_BULK
+from wavelet import CausalWaveletDenoiser
+
+logger = logging.getLogger("CryptoTrader")
+
+# Bobot GET /api/v3/exchangeInfo tanpa filter simbol
+EXCHANGE_INFO_WEIGHT = 20
+
+BUY_SIGNALS = ['trend_up', 'momentum_buy', 'trend_strong', 'valid_volatility', 'volume_spike', 'bull_candle']
+SELL_SIGNALS = ['trend_down', 'momentum_sell', 'trend_strong', 'valid_volatility', 'volume_spike', 'bear_candle']
+
+
+class MarketScanner:
+    """Scanner multi-simbol: fetch paralel lalu indikator dihitung sekaligus sebagai array (simbol x waktu)
+
+    Request scanner berprioritas bulk di penjadwal request sistem, jadi tidak mendahului
+    gap-fill real-time dan analisis interaktif.
+    """
+
+    def __init__(self, system, max_workers: int = 8):
+        self.system = system
+        self.max_workers = max_workers
+
+    def usdt_symbols(self) -> List[str]:
+        """Semua pasangan spot USDT yang sedang diperdagangkan"""
+        return self.usdt_pairs(self.system.request('get_exchange_info', EXCHANGE_INFO_WEIGHT, PRIORITY_BULK))
+
+    @staticmethod
+    def usdt_pairs(info: Dict) -> List[str]:
+        """Memfilter respons exchangeInfo menjadi pasangan spot USDT yang aktif"""
+        return sorted(
+            s['symbol'] for s in info['symbols']
+            if s.get('quoteAsset') == 'USDT' and s.get('status') == 'TRADING'
+            and s.get('isSpotTradingAllowed', True)
+        )
+
+    def _fetch(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        return self.system.get_klines(symbol, interval, limit, priority=PRIORITY_BULK)
+
+    def fetch(self, symbols: List[str], interval: str, limit: int) -> Dict[str, pd.DataFrame]:
+        """Mengambil klines semua simbol secara paralel dengan anggaran bobot request"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = executor.map(lambda s: self._fetch(s, interval, limit), symbols)
+            return dict(zip(symbols, frames))
+
+    @staticmethod
+    def stack(frames: Dict[str, pd.DataFrame], limit: int) -> Dict[str, np.ndarray]:
+        """Menyusun OHLCV menjadi array (simbol x waktu); simbol yang riwayatnya kurang atau tidak sejajar dibuang"""
+        usable = {s: df for s, df in frames.items() if len(df) >= limit}
+        if not usable:
+            return {'symbols': np.array([], dtype=object)}
+
+        # Sejajarkan pada candle terakhir yang paling umum di antara simbol
+        last_times = pd.Series({s: df['timestamp'].iloc[-1] for s, df in usable.items()})
+        common_last = last_times.mode().iloc[0]
+        symbols = [s for s in usable if last_times[s] == common_last]
+
+        stacked = {'symbols': np.array(symbols, dtype=object)}
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            stacked[column] = np.stack([usable[s][column].to_numpy()[-limit:] for s in symbols])
+        stacked['timestamp'] = usable[symbols[0]]['timestamp'].to_numpy()[-limit:]
+        return stacked
+
+    @staticmethod
+    def rank(stacked: Dict[str, np.ndarray], denoiser: Optional[CausalWaveletDenoiser] = None) -> pd.DataFrame:
+        """Evaluasi indikator semua simbol sekaligus dan urutkan berdasarkan kekuatan sinyal candle terakhir
+
+        `denoiser` (mis. causal_denoiser sistem) membuat DIF di-denoise kausal seperti calculate_indicators.
+        """
+        if len(stacked['symbols']) == 0:
+            return pd.DataFrame()
+
+        indicators, signals = batch_indicators(stacked, denoiser=denoiser)
+        last = {name: values[:, -1] for name, values in signals.items()}
+        close = stacked['close'][:, -1]
+        atr = indicators['ATR'][:, -1]
+
+        buy_score = np.sum([last[k] for k in BUY_SIGNALS], axis=0) + (last['macd_buy'] | last['grid_buy'])
+        sell_score = np.sum([last[k] for k in SELL_SIGNALS], axis=0) + (last['macd_sell'] | last['grid_sell'])
+        side_buy = buy_score >= sell_score
+
+        result = pd.DataFrame({
+            'symbol': stacked['symbols'],
+            'recommendation': last['recommendation'],
+            'score': np.where(side_buy, buy_score, sell_score),
+            'side': np.where(side_buy, 'BUY', 'SELL'),
+            'last_close': close,
+            'rsi': indicators['RSI'][:, -1],
+            'adx': indicators['ADX'][:, -1],
+            'atr': atr,
+            'stop_loss': np.where(side_buy, close - 0.5 * atr, close + 0.5 * atr),
+            'take_profit': np.where(side_buy, close + 1.5 * atr, close - 1.5 * atr),
+            **{name: last[name] for name in BUY_SIGNALS + SELL_SIGNALS + ['macd_buy', 'macd_sell', 'grid_buy', 'grid_sell']}
+        })
+
+        # Sinyal aktif di atas, lalu skor dan kekuatan trend
+        result['active'] = result['recommendation'].isin([RECOMMENDATION_BUY, RECOMMENDATION_SELL])
+        result = result.sort_values(['active', 'score', 'adx'], ascending=False, kind='stable')
+        return result.reset_index(drop=True)
+
+    @staticmethod
+    def finish(result: pd.DataFrame, only_signals: bool = False, compact: bool = False,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Filter sinyal aktif lalu (opsional) proyeksi ke tata letak ringkas compact_ranking"""
+        if result.empty:
+            return result
+        if only_signals:
+            result = result[result['active']].reset_index(drop=True)
+        return compact_ranking(result, columns) if compact else result
+
+    def scan(self, interval: str, limit: int = 200, symbols: Optional[List[str]] = None,
+             only_signals: bool = False, compact: bool = False,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Scan seluruh pasangan USDT (atau daftar simbol) dan kembalikan tabel peringkat"""
+        symbols = symbols or self.usdt_symbols()
+        logger.info(f"Scanning {len(symbols)} symbols @ {interval}")
+        stacked = self.stack(self.fetch(symbols, interval, limit), limit)
+        result = self.rank(stacked, getattr(self.system, 'causal_denoiser', None))
+        active = int(result['active'].sum()) if not result.empty else 0
+        logger.info(f"Scan completed: {active} active signals")
+        return self.finish(result, only_signals, compact, columns)
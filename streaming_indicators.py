@@ -0,0 +1,302 @@
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicator_kernel import (ema, signal_masks, VALUE_ROWS, SIGNAL_ROWS, EMA_FAST_WINDOW, EMA_SLOW_WINDOW,
+                              RSI_WINDOW, ADX_WINDOW, ATR_WINDOW, VOLUME_WINDOW, GRID_WINDOW)
+from wavelet import wavelet_denoise, CausalWaveletDenoiser
+
+NAN = float('nan')
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+class _Ema:
+    """EMA rekursif, setara ta.trend.ema_indicator (ewm span, adjust=False)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.count = 0
+        self.state = NAN
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        self.state = x if self.count == 1 else self.alpha * x + (1 - self.alpha) * self.state
+        return self.state if self.count >= self.window else NAN
+
+
+class _Rsi:
+    """RSI dengan smoothing Wilder, setara ta.momentum.rsi"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 1.0 / window
+        self.count = 0
+        self.prev_close = NAN
+        self.avg_up = 0.0
+        self.avg_down = 0.0
+
+    def update(self, close: float) -> float:
+        diff = close - self.prev_close if self.count > 0 else 0.0
+        self.prev_close = close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+
+        self.count += 1
+        self.avg_up = self.alpha * up + (1 - self.alpha) * self.avg_up
+        self.avg_down = self.alpha * down + (1 - self.alpha) * self.avg_down
+
+        if self.count < self.window:
+            return NAN
+        if self.avg_down == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_up / self.avg_down)
+
+
+class _WilderMean:
+    """Rata-rata Wilder yang dimulai dengan rata-rata `window` nilai valid pertama (nol sebelumnya)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.sum = 0.0
+        self.state = 0.0
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        if self.count < self.window:
+            self.sum += x
+            return 0.0
+        if self.count == self.window:
+            self.state = (self.sum + x) / self.window
+        else:
+            self.state = (self.state * (self.window - 1) + x) / self.window
+        return self.state
+
+
+class _Adx:
+    """ADX Wilder, setara ta.trend.adx termasuk penjajaran outputnya (nol sebelum 2*window-1)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.tr_sum = 0.0
+        self.pos_sum = 0.0
+        self.neg_sum = 0.0
+        self.dx = _WilderMean(window)
+        self.prev_high = NAN
+        self.prev_low = NAN
+
+    def update(self, high: float, low: float, true_range: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.prev_high, self.prev_low = high, low
+            return 0.0
+
+        diff_up = high - self.prev_high
+        diff_down = self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        pos = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+
+        # Jumlah awal dari candle ke-1..window, setelah itu smoothing Wilder
+        w = self.window
+        if self.count <= w + 1:
+            self.tr_sum += true_range
+            self.pos_sum += pos
+            self.neg_sum += neg
+            if self.count < w + 1:
+                return 0.0
+        else:
+            self.tr_sum = self.tr_sum * (1 - 1.0 / w) + true_range
+            self.pos_sum = self.pos_sum * (1 - 1.0 / w) + pos
+            self.neg_sum = self.neg_sum * (1 - 1.0 / w) + neg
+
+        di_pos = 100 * self.pos_sum / self.tr_sum if self.tr_sum != 0 else 0.0
+        di_neg = 100 * self.neg_sum / self.tr_sum if self.tr_sum != 0 else 0.0
+        di_total = di_pos + di_neg
+        dx = 100 * abs((di_pos - di_neg) / di_total) if di_total != 0 else 0.0
+        # Candle ke-(window+1)..2*window mengisi rata-rata DX pertama
+        return self.dx.update(dx)
+
+
+class _Sma:
+    """Rata-rata bergerak sederhana dengan jumlah berjalan"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.sum = 0.0
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        self.sum += x
+        if len(self.values) > self.window:
+            self.sum -= self.values.popleft()
+        return self.sum / self.window if len(self.values) == self.window else NAN
+
+
+class _RollingExtreme:
+    """Rolling max/min O(1) amortized dengan monotonic deque"""
+
+    def __init__(self, window: int, maximum: bool = True):
+        self.window = window
+        self.maximum = maximum
+        self.count = 0
+        self.candidates = deque()
+
+    def update(self, x: float) -> float:
+        candidates = self.candidates
+        if self.maximum:
+            while candidates and candidates[-1][1] <= x:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= x:
+                candidates.pop()
+        candidates.append((self.count, x))
+        self.count += 1
+        if candidates[0][0] <= self.count - 1 - self.window:
+            candidates.popleft()
+        return candidates[0][1] if self.count >= self.window else NAN
+
+
+class StreamingIndicators:
+    """Mesin indikator inkremental O(1) per candle close untuk jalur real-time
+
+    Menjaga state rekursif setiap indikator indicator_kernel (EMA, RSI Wilder, ADX, ATR,
+    volume SMA dengan jumlah berjalan, rolling high/low grid dengan monotonic deque) dan
+    menulis nilainya ke ring (VALUE_ROWS x kapasitas) yang sejajar dengan CandleRingBuffer
+    stream. Wavelet-MACD memakai `macd_params` tetap: dengan `denoiser` kausal DIF candle baru
+    di-denoise dari jendelanya saja dan DEA ikut rekursif; tanpa denoiser DIF seluruh ring
+    di-denoise ulang seperti calculate_indicators (wavelet atas seluruh riwayat memang repaint).
+    Kondisi sinyal (SIGNAL_ROWS) memakai signal_masks yang sama dengan jalur batch.
+    """
+
+    def __init__(self, capacity: int, macd_params: Tuple[int, int, int],
+                 denoiser: Optional[CausalWaveletDenoiser] = None):
+        self.capacity = capacity
+        self.macd_params = tuple(int(p) for p in macd_params)
+        self.denoiser = denoiser
+        self.count = 0
+        self.last_timestamp = None
+        # Nilai `count` saat parameter MACD terakhir dipilih (dipakai pemanggil untuk refit berkala)
+        self.fitted_at = 0
+
+        self._ema_fast = _Ema(EMA_FAST_WINDOW)
+        self._ema_slow = _Ema(EMA_SLOW_WINDOW)
+        self._rsi = _Rsi(RSI_WINDOW)
+        self._adx = _Adx(ADX_WINDOW)
+        self._atr = _WilderMean(ATR_WINDOW)
+        self._vol_sma = _Sma(VOLUME_WINDOW)
+        self._highest_high = _RollingExtreme(GRID_WINDOW, maximum=True)
+        self._lowest_low = _RollingExtreme(GRID_WINDOW, maximum=False)
+        p_fast, p_slow, p_signal = self.macd_params
+        self._macd_fast = _Ema(p_fast)
+        self._macd_slow = _Ema(p_slow)
+        self._dea = _Ema(p_signal)
+        self._dif_window = deque(maxlen=denoiser.window if denoiser is not None else 1)
+        self._prev_close: Optional[float] = None
+
+        # Ring sejajar candle: posisi tulis berikutnya di `_head`
+        self._head = 0
+        self._ohlcv = np.zeros((len(OHLCV), capacity))
+        self._values = np.full((len(VALUE_ROWS), capacity), np.nan)
+        self._flags = np.zeros((len(SIGNAL_ROWS), capacity), dtype=bool)
+        self._raw_dif = np.full(capacity, np.nan)
+        self._rows = {name: i for i, name in enumerate(VALUE_ROWS)}
+
+    def _positions(self, n: int) -> np.ndarray:
+        """Indeks ring `n` candle terakhir dalam urutan kronologis"""
+        return (self._head - n + np.arange(n)) % self.capacity
+
+    def _step(self, open_: float, high: float, low: float, close: float, volume: float):
+        """Satu candle close: setiap state diperbarui sekali lalu nilainya ditulis ke ring"""
+        prev_close = self._prev_close
+        if prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high, prev_close) - min(low, prev_close)
+        self._prev_close = close
+
+        atr = self._atr.update(true_range)
+        center = (self._highest_high.update(high) + self._lowest_low.update(low)) / 2
+        dif = self._macd_fast.update(close) - self._macd_slow.update(close)
+        dea = NAN
+        if self.denoiser is not None and not math.isnan(dif):
+            self._dif_window.append(dif)
+            dif = float(self.denoiser.denoise_windows(np.fromiter(self._dif_window, dtype=np.float64)))
+            dea = self._dea.update(dif)
+
+        pos = self._head
+        self._ohlcv[:, pos] = (open_, high, low, close, volume)
+        self._raw_dif[pos] = dif
+        self._values[:, pos] = (
+            self._ema_fast.update(close), self._ema_slow.update(close), self._rsi.update(close),
+            self._adx.update(high, low, true_range), atr, self._vol_sma.update(volume),
+            dif, dea, dif - dea, center, center - atr, center + atr
+        )
+        self._head = (pos + 1) % self.capacity
+        self.count += 1
+
+    def _denoise_ring(self, n: int):
+        """DIF non-kausal: wavelet atas seluruh DIF valid di ring, lalu DEA dan MACD dihitung ulang"""
+        idx = self._positions(n)
+        dif = self._raw_dif[idx]
+        valid = ~np.isnan(dif)
+        dif[valid] = wavelet_denoise(dif[valid])
+        dea = ema(dif, self.macd_params[2])
+        rows = self._rows
+        self._values[rows['DIF'], idx] = dif
+        self._values[rows['DEA'], idx] = dea
+        self._values[rows['MACD'], idx] = dif - dea
+
+    def extend(self, df: pd.DataFrame) -> bool:
+        """Memproses candle close `df` yang lebih baru dari candle terakhir yang sudah dihitung
+
+        Mengembalikan False (tanpa mengubah state) jika `df` tidak menyambung riwayat mesin,
+        mis. candle terakhir yang dihitung sudah tergeser keluar dari `df`; pemanggil lalu
+        membuat mesin baru dari `df`.
+        """
+        timestamps = df['timestamp'].to_numpy()
+        start = 0
+        if self.last_timestamp is not None:
+            start = int(np.searchsorted(timestamps, self.last_timestamp, side='right'))
+            if start == 0 or timestamps[start - 1] != self.last_timestamp:
+                return False
+        new = len(df) - start
+        if new == 0:
+            return True
+
+        columns = [df[c].to_numpy(dtype=np.float64)[start:] for c in OHLCV]
+        for row in zip(*columns):
+            self._step(*row)
+        self.last_timestamp = timestamps[-1]
+
+        n = min(self.count, self.capacity)
+        if self.denoiser is None:
+            self._denoise_ring(n)
+            # DIF seluruh ring berubah, jadi semua kondisi dihitung ulang
+            tail = n
+        else:
+            # Kondisi candle baru butuh satu candle sebelumnya (perubahan RSI, body, persilangan MACD)
+            tail = min(new + 1, n)
+        idx = self._positions(tail)
+        values = {name: self._values[i, idx] for i, name in enumerate(VALUE_ROWS)}
+        signals = signal_masks(*self._ohlcv[:, idx], values)
+        # Candle pertama potongan tidak punya candle sebelumnya kecuali potongan mencakup seluruh ring
+        written = tail if tail == n else tail - 1
+        self._flags[:, idx[-written:]] = np.stack([signals[name][-written:] for name in SIGNAL_ROWS])
+        return True
+
+    def values(self, n: int) -> Dict[str, np.ndarray]:
+        """Nilai indikator `n` candle terakhir (salinan, urutan kronologis)"""
+        idx = self._positions(n)
+        return dict(zip(VALUE_ROWS, self._values[:, idx]))
+
+    def signals(self, n: int) -> Dict[str, np.ndarray]:
+        """Kondisi sinyal `n` candle terakhir (salinan, urutan kronologis)"""
+        idx = self._positions(n)
+        return dict(zip(SIGNAL_ROWS, self._flags[:, idx]))
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("binance")
+
+from async_backend import AsyncCryptoTradingSystem
+from backend import CryptoTradingSystem
+from synthetic import synthetic_frame
+
+
+def test_sync_io_api_not_exposed():
+    # Tanpa pewarisan: tidak ada metode sinkron yang diam-diam memanggil coroutine
+    for name in ('get_multi_timeframe_klines', 'analyze_multi_timeframe', 'start_realtime_analysis',
+                 '_get_klines_stored', '_backfill', 'start_order_book'):
+        assert not hasattr(AsyncCryptoTradingSystem, name)
+
+
+def test_analysis_matches_sync_system():
+    df = synthetic_frame(300)
+
+    async def analyze():
+        system = AsyncCryptoTradingSystem()
+        try:
+            return await system._analyze(df, 'BTCUSDT', '1m')
+        finally:
+            await system.close()
+
+    result, analysis = asyncio.run(analyze())
+    expected, expected_analysis = CryptoTradingSystem(offline=True).calculate_indicators(df, 'BTCUSDT', '1m')
+    assert analysis['recommendation'] == expected_analysis['recommendation']
+    assert result['MACD'].equals(expected['MACD'])
+
+
+def test_async_requests_share_scheduler():
+    from request_scheduler import RequestScheduler
+
+    class FakeAsyncClient:
+        response = None
+
+        def __init__(self):
+            self.calls = 0
+
+        async def get_klines(self, **params):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return []
+
+    async def fetch():
+        system = AsyncCryptoTradingSystem()
+        system.request_scheduler = RequestScheduler()
+        system._semaphore = asyncio.Semaphore(4)
+        system.client = FakeAsyncClient()
+        # Request identik yang bersamaan digabung menjadi satu panggilan
+        await asyncio.gather(*[system.get_klines('BTCUSDT', '1m', 10) for _ in range(3)])
+        await system.get_klines('ETHUSDT', '1m', 10)
+        return system.client.calls, system.request_scheduler.stats
+
+    calls, stats = asyncio.run(fetch())
+    assert calls == 2
+    assert stats['coalesced'] == 2
+    assert stats['weight'] == 4
+
+
+def test_scan_fetch_is_bulk_and_close_cancels_tasks():
+    from request_scheduler import PRIORITY_BULK
+
+    class FakeAsyncClient:
+        closed = False
+
+        async def close_connection(self):
+            self.closed = True
+
+    async def run():
+        system = AsyncCryptoTradingSystem()
+        priorities = []
+
+        async def get_klines(symbol, interval, limit=500, priority=None):
+            priorities.append(priority)
+            return synthetic_frame(limit)
+
+        system.get_klines = get_klines
+        frames = await system.get_klines_many(['BTCUSDT', 'ETHUSDT'], '1m', 50)
+
+        # Pengisian celah yang masih berjalan saat close harus dibatalkan sebelum client ditutup
+        backfill = asyncio.create_task(asyncio.sleep(60))
+        system._tasks.add(backfill)
+        system.client = client = FakeAsyncClient()
+        await system.close()
+        return frames, priorities, backfill, client
+
+    frames, priorities, backfill, client = asyncio.run(run())
+    assert set(frames) == {'BTCUSDT', 'ETHUSDT'}
+    assert priorities == [PRIORITY_BULK, PRIORITY_BULK]
+    assert backfill.cancelled() and client.closed
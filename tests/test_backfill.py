@@ -0,0 +1,56 @@
+import os
+
+from backfill import KlineBackfiller, INTERVAL_MS, KLINES_PAGE_LIMIT, CHECKPOINT_MIN_PAGES
+from kline_parser import klines_to_frame
+
+STEP = INTERVAL_MS['1m']
+PAGE = STEP * KLINES_PAGE_LIMIT
+
+
+def fake_request(calls):
+    """Pengganti get_klines: satu candle 1m per menit dalam [startTime, endTime]"""
+    def request(symbol, interval, startTime, endTime, limit):
+        calls.append(startTime)
+        first = startTime + (-startTime) % STEP
+        return [[t, "1", "1", "1", "1", "1", t + STEP - 1, "1", 1, "1", "1", "0"]
+                for t in range(first, min(endTime, first + limit * STEP - 1) + 1, STEP)]
+    return request
+
+
+def test_checkpoint_key_ignores_end_time(tmp_path):
+    backfiller = KlineBackfiller(None, klines_to_frame, checkpoint_dir=str(tmp_path), request=fake_request([]))
+    start = 10 * PAGE + 5
+    pages = backfiller.pages(start, start + 5 * PAGE, '1m')
+    # Akhir rentang maju beberapa halaman: halaman awal sama, checkpoint yang sama dipakai
+    later = backfiller.pages(start, start + 8 * PAGE + 30 * STEP, '1m')
+    assert later[:len(pages) - 1] == pages[:-1]
+    assert backfiller._checkpoint_path('BTCUSDT', '1m', pages) == backfiller._checkpoint_path('BTCUSDT', '1m', later)
+
+
+def test_interrupted_backfill_resumes_from_full_pages(tmp_path):
+    calls = []
+    backfiller = KlineBackfiller(None, klines_to_frame, checkpoint_dir=str(tmp_path), request=fake_request(calls))
+    start = 10 * PAGE
+    end = start + CHECKPOINT_MIN_PAGES * PAGE + 100 * STEP
+    pages = backfiller.pages(start, end, '1m')
+    checkpoint = backfiller._checkpoint_path('BTCUSDT', '1m', pages)
+    os.makedirs(checkpoint)
+    os.makedirs(f"{checkpoint}_{len(pages)}")
+    # Run sebelumnya terputus setelah halaman pertama
+    backfiller._fetch_page('BTCUSDT', '1m', pages[0], checkpoint)
+    calls.clear()
+
+    # Run berikutnya sampai "sekarang" yang sudah maju lebih dari satu halaman
+    later = end + 2 * PAGE
+    df = backfiller.run('BTCUSDT', '1m', start, later)
+    assert pages[0][0] not in calls
+    assert len(df) == (later - start) // STEP + 1
+    assert not os.path.exists(checkpoint)
+    assert os.listdir(tmp_path) == []
+
+
+def test_small_range_is_not_checkpointed(tmp_path):
+    backfiller = KlineBackfiller(None, klines_to_frame, checkpoint_dir=str(tmp_path), request=fake_request([]))
+    df = backfiller.run('BTCUSDT', '1m', 0, 50 * STEP)
+    assert len(df) == 51
+    assert os.listdir(tmp_path) == []
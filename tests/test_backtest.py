@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pywt")
+
+from backtest import Backtester, walk_forward_macd, MACD_MIN_FIT_BARS
+from batch_indicators import DEFAULT_MACD_PARAMS, FAST_PERIODS, SLOW_PERIODS, SIGNAL_PERIODS
+from indicator_kernel import ema
+from macd_search import batched_macd_fitness, macd_fitness, windowed_macd_fitness
+from synthetic import synthetic_frame
+from wavelet import CausalWaveletDenoiser
+
+
+def test_default_backtest_has_no_lookahead():
+    # Tanpa look-ahead, indikator dan sinyal pada prefix data sama dengan pada seluruh data
+    df = synthetic_frame(3000, seed=5)
+    full = Backtester(df)
+    prefix = Backtester(df.iloc[:1800].reset_index(drop=True))
+    for name in ('DIF', 'DEA', 'ATR', 'RSI'):
+        np.testing.assert_allclose(prefix._base_indicators()[name], full._base_indicators()[name][:1800],
+                                   equal_nan=True, err_msg=name)
+    params = {'rsi_buy': 55, 'adx_min': 10, 'volume_mult': 1.0}
+    for prefix_mask, full_mask in zip(prefix.signals(params), full.signals(params)):
+        assert (prefix_mask == full_mask[:1800]).all()
+
+
+def test_lookahead_mode_repaints():
+    df = synthetic_frame(3000, seed=5)
+    full = Backtester(df, lookahead=True)._base_indicators()['DIF']
+    prefix = Backtester(df.iloc[:1800].reset_index(drop=True), lookahead=True)._base_indicators()['DIF']
+    assert not np.allclose(prefix[-50:], full[1750:1800])
+
+
+def test_walk_forward_params_use_only_past_bars():
+    close = synthetic_frame(1000, seed=2)['close'].to_numpy()
+    params, _, _ = walk_forward_macd(close, CausalWaveletDenoiser(), refit_bars=100, fit_bars=300)
+    assert (params[:MACD_MIN_FIT_BARS] == DEFAULT_MACD_PARAMS).all()
+    # Mengubah candle setelah bar 500 tidak mengubah parameter sampai bar 500
+    changed = close.copy()
+    changed[500:] *= np.linspace(1, 3, 500)
+    changed_params, _, _ = walk_forward_macd(changed, CausalWaveletDenoiser(), refit_bars=100, fit_bars=300)
+    assert (changed_params[:501] == params[:501]).all()
+
+
+def test_windowed_fitness_matches_direct_windows():
+    close = synthetic_frame(2000, seed=4)['close'].to_numpy()
+    ends = np.array([300, 800, 1500, 2000])
+    starts = np.array([0, 300, 1000, 1500])
+    params, fitness = windowed_macd_fitness(close, starts, ends, FAST_PERIODS, SLOW_PERIODS, SIGNAL_PERIODS)
+    # Jendela dari awal series punya pemanasan EMA yang sama dengan pencarian batch pada potongannya
+    batch_params, batch_fitness = batched_macd_fitness(close[:300], FAST_PERIODS, SLOW_PERIODS, SIGNAL_PERIODS)
+    assert params == batch_params
+    np.testing.assert_allclose(fitness[0], batch_fitness, rtol=1e-9)
+    # Jendela lain: statistik MACD seluruh series pada potongan jendela
+    for column, (fast, slow, signal) in enumerate(params):
+        dif = ema(close, fast) - ema(close, slow)
+        macd = dif - ema(dif, signal)
+        direct = macd_fitness(np.stack([macd[a:b] for a, b in zip(starts[1:], ends[1:])]))
+        np.testing.assert_allclose(fitness[1:, column], direct, rtol=1e-9)
@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from candle_store import CandleStore, CANDLE_COLUMNS
+
+STEP = 60_000
+
+
+def candles(start: int, stop: int, close: float = 1.0):
+    """Kolom candle 1m dengan indeks open time [start, stop) dan harga close seragam"""
+    index = np.arange(start, stop, dtype=np.int64)
+    columns = {column: np.full(len(index), close, dtype=dtype) for column, dtype in CANDLE_COLUMNS.items()}
+    columns['timestamp'] = index * STEP
+    return columns
+
+
+def stored(store: CandleStore):
+    data = store.read('BTCUSDT', '1m')
+    return list(data['timestamp'] // STEP), list(data['close'])
+
+
+def test_append_after_tail(tmp_path):
+    store = CandleStore(str(tmp_path))
+    assert store.write('BTCUSDT', '1m', candles(0, 10))
+    assert store.write('BTCUSDT', '1m', candles(10, 12, close=2.0))
+    index, close = stored(store)
+    assert index == list(range(12))
+    assert close == [1.0] * 10 + [2.0] * 2
+
+
+def test_inside_range_write_keeps_tail(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('BTCUSDT', '1m', candles(0, 10))
+    assert store.write('BTCUSDT', '1m', candles(3, 5, close=2.0))
+    index, close = stored(store)
+    assert index == list(range(10))
+    assert close == [1.0] * 3 + [2.0] * 2 + [1.0] * 5
+
+
+def test_overlapping_write_replaces_and_extends(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('BTCUSDT', '1m', candles(0, 10))
+    assert store.write('BTCUSDT', '1m', candles(8, 13, close=2.0))
+    index, close = stored(store)
+    assert index == list(range(13))
+    assert close == [1.0] * 8 + [2.0] * 5
+
+
+def test_overlapping_write_with_missing_candle_merges(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('BTCUSDT', '1m', candles(0, 10))
+    new = candles(7, 12, close=2.0)
+    new = {column: np.delete(values, 1) for column, values in new.items()}
+    assert store.write('BTCUSDT', '1m', new)
+    index, close = stored(store)
+    assert index == list(range(12))
+    assert close == [1.0] * 7 + [2.0, 1.0] + [2.0] * 3
+
+
+def test_gapped_write_is_rejected(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('BTCUSDT', '1m', candles(0, 10))
+    assert not store.write('BTCUSDT', '1m', candles(20, 22))
+    assert not store.write('BTCUSDT', '1m', candles(-10, -5))
+    assert stored(store)[0] == list(range(10))
+
+
+def test_head_write_prepends(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('BTCUSDT', '1m', candles(0, 10))
+    assert store.write('BTCUSDT', '1m', candles(-3, 1, close=2.0))
+    index, close = stored(store)
+    assert index == list(range(-3, 10))
+    assert close == [2.0] * 4 + [1.0] * 9
+
+
+def _write_windows(root: str):
+    # Setiap proses menulis jendela bertumpuk yang sama, jadi hasil akhir tidak bergantung urutan
+    store = CandleStore(root)
+    for start in range(0, 2000, 10):
+        store.write('BTCUSDT', '1m', candles(start, start + 30, close=float(start // 10 % 7)))
+        store.write('BTCUSDT', '1m', candles(start, start + 20, close=float(start // 10 % 7)))
+
+
+def test_concurrent_processes_share_series(tmp_path):
+    pytest.importorskip("fcntl")
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_write_windows, args=(str(tmp_path),)) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    store = CandleStore(str(tmp_path))
+    index, close = stored(store)
+    assert index == list(range(2020))
+    sizes = {os.path.getsize(store._column_path('BTCUSDT', '1m', column)) // np.dtype(dtype).itemsize
+             for column, dtype in CANDLE_COLUMNS.items()}
+    assert sizes == {2020}
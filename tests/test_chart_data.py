@@ -0,0 +1,66 @@
+import numpy as np
+
+from chart_data import ChartSeries, LINE_COLUMNS
+from synthetic import synthetic_frame
+
+BARS = 3000
+
+
+def analysis_frame(seed: int = 0):
+    """Frame sintetis dengan kolom garis grafik (nilai acak, NaN di awal seperti warm-up)"""
+    df = synthetic_frame(BARS, seed=seed)
+    rng = np.random.default_rng(seed)
+    for name in LINE_COLUMNS:
+        values = rng.normal(size=BARS).cumsum()
+        values[:30] = np.nan
+        df[name] = values
+    return df
+
+
+def assert_same_view(series: ChartSeries, expected: ChartSeries):
+    view, reference = series.view(), expected.view()
+    for name, values in reference['candles'].items():
+        assert np.array_equal(view['candles'][name], values, equal_nan=True), name
+    for name, (x, y) in reference['lines'].items():
+        assert np.array_equal(view['lines'][name][0], x), name
+        assert np.array_equal(view['lines'][name][1], y, equal_nan=True), name
+
+
+def test_update_refreshes_repainted_bars():
+    df = analysis_frame()
+    series = ChartSeries(max_points=300)
+    series.update(df)
+
+    # Wavelet non-kausal mengubah DIF/DEA/MACD bar lama, bukan hanya candle terakhir
+    repainted = df.copy()
+    for name in ['DIF', 'DEA', 'MACD']:
+        repainted.loc[BARS - 400:, name] += 1.0
+    repainted.loc[BARS - 1, 'close'] += 5.0
+
+    assert series.update(repainted) == 400
+    expected = ChartSeries(max_points=300)
+    expected.update(repainted)
+    assert_same_view(series, expected)
+    for name, values in expected.columns.items():
+        assert np.array_equal(series.columns[name], values, equal_nan=True), name
+
+
+def test_update_without_changes_is_noop():
+    df = analysis_frame()
+    series = ChartSeries(max_points=300)
+    series.update(df)
+    assert series.update(df.iloc[-500:]) == 0
+    assert len(series) == BARS
+
+
+def test_appended_bars_match_rebuild():
+    df = analysis_frame(seed=1)
+    series = ChartSeries(max_points=300)
+    # 2990 dan 3000 bar memberi lebar bucket yang sama, jadi hasil bisa dibandingkan langsung
+    series.update(df.iloc[:2990])
+    for end in range(2991, BARS + 1):
+        assert series.update(df.iloc[end - 500:end]) == 1
+    expected = ChartSeries(max_points=300)
+    expected.update(df)
+    assert series.bucket_ms == expected.bucket_ms
+    assert_same_view(series, expected)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pywt")
+
+from backend import CryptoTradingSystem
+from compact_frame import (CompactFrameBuffer, RECOMMENDATION_LABELS, SIDE_LABELS, compact_ranking,
+                           recommendation_codes)
+from scanner import MarketScanner
+from synthetic import synthetic_frame
+
+LIMIT = 300
+
+
+class StubSystem:
+    """Sistem minimal untuk scan(): klines sintetis per simbol"""
+    causal_denoiser = None
+
+    def get_klines(self, symbol, interval, limit, priority=None):
+        return synthetic_frame(limit, seed=int(symbol[1:-4]))
+
+
+def test_recommendation_codes_buy_first():
+    buy = np.array([False, True, False, True])
+    sell = np.array([False, False, True, True])
+    codes = recommendation_codes(buy, sell)
+    assert codes.dtype == np.int8
+    assert codes.tolist() == [0, 1, 2, 1]
+    assert [RECOMMENDATION_LABELS[c] for c in codes] == \
+        list(np.where(buy, "BUY SEKARANG", np.where(sell, "SELL SEKARANG", "TUNGGU / NO TRADE")))
+
+
+def test_unknown_columns_rejected():
+    with pytest.raises(ValueError):
+        CompactFrameBuffer(['close', 'RSI', 'FOO'])
+
+
+def test_compact_matches_full_frame():
+    system = CryptoTradingSystem(offline=True)
+    df = synthetic_frame(LIMIT)
+    full, analysis = system.calculate_indicators(df.copy())
+    columns = ['close', 'RSI', 'MACD', 'RECOMMENDATION']
+    compact, compact_analysis = system.calculate_indicators(df.copy(), compact=True, columns=columns)
+
+    # Proyeksi: hanya timestamp + kolom yang diminta, float32
+    assert list(compact.columns) == ['timestamp'] + columns
+    assert all(compact[c].dtype == np.float32 for c in columns[:-1])
+    for name in columns[:-1]:
+        np.testing.assert_allclose(compact[name], full[name].astype(np.float32), rtol=1e-6)
+
+    # Kode enum: kategori RECOMMENDATION_LABELS dengan kode int8, label sama dengan mode biasa
+    recommendation = compact['RECOMMENDATION']
+    assert list(recommendation.cat.categories) == RECOMMENDATION_LABELS
+    assert recommendation.cat.codes.dtype == np.int8
+    assert recommendation.astype(str).tolist() == full['RECOMMENDATION'].tolist()
+    assert compact_analysis['recommendation'] == analysis['recommendation']
+
+
+def test_compact_buffer_reuse_is_opt_in():
+    system = CryptoTradingSystem(offline=True)
+    df = synthetic_frame(LIMIT)
+    first, _ = system.calculate_indicators(df.copy(), 'S0USDT', '1m', compact=True)
+    kept = first.copy()
+    system.calculate_indicators(synthetic_frame(LIMIT, seed=1), 'S0USDT', '1m', compact=True)
+    pd.testing.assert_frame_equal(first, kept)
+
+    # reuse_buffer: frame adalah view ke blok bersama dan ikut berubah pada panggilan berikutnya
+    shared, _ = system.calculate_indicators(df.copy(), 'S0USDT', '1m', compact=True, reuse_buffer=True)
+    close = shared['close'].to_numpy().copy()
+    system.calculate_indicators(synthetic_frame(LIMIT, seed=1), 'S0USDT', '1m', compact=True, reuse_buffer=True)
+    assert not np.array_equal(shared['close'].to_numpy(), close)
+
+
+def test_compact_scan_projection_and_codes():
+    symbols = [f"S{i}USDT" for i in range(3)]
+    full = MarketScanner(StubSystem(), max_workers=1).scan('M1', LIMIT, symbols)
+    compact = MarketScanner(StubSystem(), max_workers=1).scan(
+        'M1', LIMIT, symbols, compact=True, columns=['recommendation', 'side', 'score', 'rsi'])
+
+    assert list(compact.columns) == ['symbol', 'recommendation', 'side', 'score', 'rsi']
+    assert compact['symbol'].tolist() == full['symbol'].tolist()
+    assert compact['rsi'].dtype == np.float32
+    assert compact['score'].dtype == np.int8
+    assert list(compact['recommendation'].cat.categories) == RECOMMENDATION_LABELS
+    assert list(compact['side'].cat.categories) == SIDE_LABELS
+    assert compact['recommendation'].astype(str).tolist() == full['recommendation'].tolist()
+    assert compact['side'].astype(str).tolist() == full['side'].tolist()
+
+    with pytest.raises(ValueError):
+        compact_ranking(full, ['rsi', 'FOO'])
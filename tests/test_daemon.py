@@ -0,0 +1,133 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("binance")
+pytest.importorskip("pywt")
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from async_backend import stream_name
+from backend import CryptoTradingSystem
+from daemon import AnalysisDaemon
+from daemon_client import DaemonClient
+from synthetic import synthetic_frame
+
+
+class StubSystem:
+    """Pengganti AsyncCryptoTradingSystem: analisis offline dari frame sintetis"""
+
+    def __init__(self):
+        self.analysis = CryptoTradingSystem(offline=True)
+        self.callbacks = {}
+
+    async def subscribe(self, symbols, interval, callback, limit):
+        for symbol in symbols:
+            self.callbacks[stream_name(symbol, interval)] = (callback, symbol, interval)
+
+    async def refresh(self, name):
+        callback, symbol, interval = self.callbacks[name]
+        callback(name, *self.analysis.calculate_indicators(synthetic_frame(300), symbol, interval))
+
+    async def unsubscribe(self, names):
+        for name in names:
+            self.callbacks.pop(name)
+
+
+def run_daemon(scenario, **kwargs):
+    async def main():
+        system = StubSystem()
+        daemon = AnalysisDaemon(system, tail=50, **kwargs)
+        client = TestClient(TestServer(daemon.make_app()))
+        await client.start_server()
+        try:
+            await scenario(client, daemon, system)
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+
+
+def test_snapshot_epoch_after_restart():
+    async def scenario(client, daemon, system):
+        stream = (await (await client.post('/streams', json={'symbol': 'BTCUSDT', 'interval': 'M5'})).json())['stream']
+        snapshot = await (await client.get(f'/streams/{stream}')).json()
+        assert snapshot['seq'] == 1
+        epoch = snapshot['epoch']
+        assert (await client.get(f'/streams/{stream}?after=1&epoch={epoch}')).status == 204
+        # Stream dimulai ulang: seq kembali ke 1 dengan epoch baru, jadi snapshot tetap dikirim
+        await client.delete(f'/streams/{stream}')
+        await client.post('/streams', json={'symbol': 'BTCUSDT', 'interval': 'M5'})
+        response = await client.get(f'/streams/{stream}?after=1&epoch={epoch}')
+        assert response.status == 200
+        restarted = await response.json()
+        assert restarted['seq'] == 1 and restarted['epoch'] != epoch
+
+    run_daemon(scenario)
+
+
+def test_streams_released_with_leases():
+    async def scenario(client, daemon, system):
+        pinned = await daemon.start_stream('ETHUSDT', 'M5')
+        body = {'symbol': 'BTCUSDT', 'interval': 'M5'}
+        stream = (await (await client.post('/streams', json={**body, 'client': 'a'})).json())['stream']
+        await client.post('/streams', json={**body, 'client': 'b'})
+
+        assert (await client.delete(f'/streams/{stream}?client=a')).status == 204
+        assert stream in daemon.topics
+        assert (await client.delete(f'/streams/{stream}?client=b')).status == 204
+        assert stream not in daemon.topics and stream not in system.callbacks
+
+        # Klien yang berhenti polling tanpa DELETE: lease habis, stream pin tetap berjalan
+        await client.post('/streams', json={**body, 'client': 'c'})
+        await asyncio.sleep(0.3)
+        assert set(daemon.topics) == {pinned}
+
+    run_daemon(scenario, lease_seconds=0.1)
+
+
+class ThreadedDaemon:
+    """Daemon dengan server HTTP sungguhan di thread latar, untuk DaemonClient (urllib)"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.loop = asyncio.new_event_loop()
+        self.daemon = AnalysisDaemon(StubSystem(), tail=50)
+        self.runner = web.AppRunner(self.daemon.make_app())
+        self.loop.run_until_complete(self.runner.setup())
+        self.loop.run_until_complete(web.TCPSite(self.runner, '127.0.0.1', port).start())
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def test_client_versions_survive_daemon_restart():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = ThreadedDaemon(port)
+    client = DaemonClient(f"http://127.0.0.1:{port}")
+    stream = client.start_realtime_analysis('BTCUSDT', 'M5')
+    assert client.get_realtime_result(stream)[0] == 1
+    version, df, _ = client.get_realtime_result(stream)
+    assert version == 1 and df.empty
+
+    # Daemon baru tanpa stream ini: klien memintanya lagi, seq baru (1) tidak dianggap versi lama
+    server.close()
+    server = ThreadedDaemon(port)
+    try:
+        assert client.get_realtime_result(stream)[0] == 0
+        version, df, _ = client.get_realtime_result(stream)
+        assert version == 2 and not df.empty
+        client.stop_realtime_analysis(stream)
+        assert not server.daemon.topics
+    finally:
+        server.close()
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pywt")
+
+import batch_indicators as bi
+from backtest import Backtester
+from indicator_kernel import indicator_kernel, VALUE_ROWS, SIGNAL_ROWS
+from synthetic import synthetic_frame
+from wavelet import wavelet_denoise
+
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+
+
+@pytest.mark.parametrize("n", [500, 5000])
+def test_kernel_matches_ta(n):
+    pytest.importorskip("ta")
+    from bench_indicator_kernel import legacy_indicators, MACD_PARAMS, RTOL, ATOL, SIGNALS
+
+    df = synthetic_frame(n)
+    expected_values, expected_signals = legacy_indicators(df)
+    values, signals = indicator_kernel(*(df[c].to_numpy(dtype=np.float64) for c in OHLCV), MACD_PARAMS,
+                                       lambda dif, valid: wavelet_denoise(dif))
+    for name in VALUE_ROWS:
+        expected = np.asarray(expected_values[name], dtype=np.float64)
+        assert (np.isnan(expected) == np.isnan(values[name])).all(), name
+        mask = ~np.isnan(expected)
+        np.testing.assert_allclose(values[name][mask], expected[mask], rtol=RTOL, atol=ATOL, err_msg=name)
+    for name in SIGNALS:
+        assert (np.asarray(expected_signals[name]) == signals[name]).all(), name
+
+
+def test_batch_signals_match_kernel():
+    frames = [synthetic_frame(400, seed=seed) for seed in range(4)]
+    stacked = {c: np.stack([f[c].to_numpy(dtype=np.float64) for f in frames]) for c in OHLCV}
+    indicators, signals = bi.batch_indicators(stacked)
+    for i, frame in enumerate(frames):
+        dif = indicators['DIF'][i]
+        values, kernel_signals = indicator_kernel(*(frame[c].to_numpy(dtype=np.float64) for c in OHLCV),
+                                                  tuple(indicators['MACD_PARAMS'][i]),
+                                                  lambda _, valid: dif[valid])
+        for name in SIGNAL_ROWS:
+            assert (signals[name][i] == kernel_signals[name]).all(), (i, name)
+
+
+def test_backtester_signals_match_batch():
+    df = synthetic_frame(2000, seed=3)
+    _, signals = bi.batch_indicators({c: df[c].to_numpy(dtype=np.float64)[None, :] for c in OHLCV})
+    buy, sell = Backtester(df, lookahead=True).signals({})
+    assert (buy == signals['buy'][0]).all()
+    assert (sell == (signals['sell'][0] & ~signals['buy'][0])).all()
+
+
+def test_kernel_rows_match_single_series():
+    # Input 2-D (simbol x waktu) dengan parameter MACD per baris sama dengan kernel per seri
+    frames = [synthetic_frame(600, seed=seed) for seed in range(3)]
+    stacked = {c: np.stack([f[c].to_numpy(dtype=np.float64) for f in frames]) for c in OHLCV}
+    params = np.array([(12, 26, 9), (8, 22, 7), (12, 26, 10)])
+    values, signals = indicator_kernel(*(stacked[c] for c in OHLCV), params, lambda dif, valid: dif * 0.5)
+    for i, frame in enumerate(frames):
+        single, single_signals = indicator_kernel(*(frame[c].to_numpy(dtype=np.float64) for c in OHLCV),
+                                                  tuple(params[i]), lambda dif, valid: dif * 0.5)
+        for name in VALUE_ROWS:
+            np.testing.assert_allclose(values[name][i], single[name], rtol=1e-12, equal_nan=True, err_msg=name)
+        for name in SIGNAL_ROWS:
+            assert (signals[name][i] == single_signals[name]).all(), (i, name)
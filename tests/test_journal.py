@@ -0,0 +1,27 @@
+from journal import DecisionJournal
+
+
+def analysis(symbol: str):
+    return {'symbol': symbol, 'recommendation': 'TUNGGU / NO TRADE', 'last_close': 1.0}
+
+
+def test_writers_share_dictionary_codes(tmp_path):
+    # Dua penulis pada direktori yang sama (mis. app dan daemon), masing-masing dengan kamus lama
+    app = DecisionJournal(str(tmp_path))
+    daemon = DecisionJournal(str(tmp_path))
+    try:
+        app.record(analysis('BTCUSDT'), '5m', '2024-01-01 00:00')
+        app.flush()
+        daemon.record(analysis('ETHUSDT'), '1h', '2024-01-01 00:05')
+        daemon.flush()
+        app.record(analysis('SOLUSDT'), '5m', '2024-01-01 00:10')
+        app.flush()
+    finally:
+        app.close()
+        daemon.close()
+
+    reader = DecisionJournal(str(tmp_path))
+    history = reader.read()
+    reader.close()
+    assert history['symbol'].tolist() == ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+    assert history['interval'].tolist() == ['5m', '1h', '5m']
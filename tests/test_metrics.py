@@ -0,0 +1,19 @@
+import time
+
+from metrics import Histogram, StageTimer
+
+
+def test_nested_spans_not_counted_twice():
+    histogram = Histogram('stage_seconds', 'test', ['stage'])
+    start = time.perf_counter()
+    stages = StageTimer(histogram)
+    with stages.time('nested'):
+        time.sleep(0.02)
+    time.sleep(0.01)
+    stages.lap('outer')
+    total = time.perf_counter() - start
+
+    sums = {labels[0]: value for labels, (_, value) in histogram.snapshot().items()}
+    assert sums['nested'] >= 0.02
+    assert 0.01 <= sums['outer'] < 0.02
+    assert sum(sums.values()) <= total
@@ -0,0 +1,42 @@
+import numpy as np
+
+from backend import CryptoTradingSystem
+from backfill import INTERVAL_MS
+from kline_parser import klines_to_frame
+from resample import resample_frame
+from synthetic import synthetic_klines
+
+# Riwayat M1 sintetis yang berakhir di tengah candle H4 (candle H4 terakhir masih terbentuk)
+M1_ROWS = synthetic_klines(250 * 240 + 97)
+
+
+class FakeClient:
+    """get_klines dengan klines native per interval dari resample riwayat M1"""
+
+    def __init__(self):
+        self.calls = []
+        self.base = klines_to_frame(M1_ROWS)
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None):
+        self.calls.append((interval, limit))
+        df = self.base if interval == '1m' else resample_frame(self.base, interval)
+        df = df.tail(limit)
+        ts = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        return [[int(t), str(r.open), str(r.high), str(r.low), str(r.close), str(r.volume),
+                 int(t) + INTERVAL_MS[interval] - 1, str(r.quote_volume), int(r.trades),
+                 str(r.taker_buy_volume), "0", "0"]
+                for t, r in zip(ts, df.itertuples())]
+
+
+def test_multi_timeframe_uses_native_history():
+    client = FakeClient()
+    system = CryptoTradingSystem.with_client(client, None)
+    frames = system.get_multi_timeframe_klines('BTCUSDT', ['M5', 'H4'], limit=200)
+
+    # Satu request per timeframe plus M1 sejak candle terbentuk, bukan (limit+1) * 240 candle M1
+    assert sorted(client.calls) == [('1m', 240), ('4h', 201), ('5m', 201)]
+    for tf, interval in (('M5', '5m'), ('H4', '4h')):
+        expected = resample_frame(client.base, interval).tail(200).reset_index(drop=True)
+        assert (frames[tf]['timestamp'] == expected['timestamp']).all()
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            np.testing.assert_allclose(frames[tf][column], expected[column], err_msg=f"{tf} {column}")
@@ -0,0 +1,78 @@
+import pytest
+
+from order_book import LocalOrderBook
+
+
+def depth_event(first: int, last: int, bids=(), asks=()):
+    """Event depthUpdate Binance: U/u id update pertama/terakhir, level [harga, kuantitas] string"""
+    return {'e': 'depthUpdate', 'U': first, 'u': last,
+            'b': [[str(p), str(q)] for p, q in bids], 'a': [[str(p), str(q)] for p, q in asks]}
+
+
+SNAPSHOT = {'lastUpdateId': 100,
+            'bids': [['99.0', '2.0'], ['98.0', '3.0']],
+            'asks': [['101.0', '1.0'], ['102.0', '4.0']]}
+
+
+def synced_book():
+    book = LocalOrderBook('btcusdt', feature_levels=2)
+    book.on_event(depth_event(95, 101, bids=[(99.0, 5.0)]))
+    assert book.load_snapshot(SNAPSHOT)
+    return book
+
+
+def test_buffered_events_applied_after_snapshot():
+    book = LocalOrderBook('btcusdt', feature_levels=2)
+    # Event sebelum snapshot di-buffer; book belum sinkron
+    assert book.on_event(depth_event(90, 97, bids=[(99.0, 9.0)]))
+    assert book.on_event(depth_event(98, 101, bids=[(99.0, 5.0)], asks=[(101.0, 0.0)]))
+    assert book.on_event(depth_event(102, 103, asks=[(100.5, 1.5)]))
+    assert book.features() == {}
+
+    assert book.load_snapshot(SNAPSHOT)
+    # u <= lastUpdateId dibuang (99 tetap bukan 9), event 98..101 memenuhi U <= 101 <= u
+    assert book.synced and book.last_update_id == 103
+    assert book.top(2) == {'bids': [(99.0, 5.0), (98.0, 3.0)], 'asks': [(100.5, 1.5), (102.0, 4.0)]}
+    features = book.features()
+    assert features['best_bid'] == 99.0 and features['best_ask'] == 100.5
+    assert features['spread'] == pytest.approx(1.5)
+    assert features['spread_bps'] == pytest.approx(1.5 / 99.75 * 10_000)
+    assert features['bid_depth'] == 8.0 and features['ask_depth'] == 5.5
+    assert features['imbalance'] == pytest.approx(2.5 / 13.5)
+
+
+def test_snapshot_older_than_buffer_is_rejected():
+    book = LocalOrderBook('btcusdt')
+    book.on_event(depth_event(150, 160))
+    # lastUpdateId + 1 < U event pertama: ada update yang hilang di antaranya
+    assert not book.load_snapshot(SNAPSHOT)
+    assert not book.synced and book.features() == {}
+    assert book.load_snapshot({**SNAPSHOT, 'lastUpdateId': 155})
+    assert book.synced and book.last_update_id == 160
+
+
+def test_first_event_must_straddle_snapshot():
+    book = LocalOrderBook('btcusdt')
+    book.on_event(depth_event(90, 100))
+    book.on_event(depth_event(103, 104))
+    # Event 101..102 hilang: tidak ada event dengan U <= 101 <= u
+    assert not book.load_snapshot(SNAPSHOT)
+    assert not book.synced
+
+
+def test_gap_after_sync_triggers_resync():
+    book = synced_book()
+    assert book.on_event(depth_event(102, 102, asks=[(101.0, 0.0)]))
+    assert book.features()['best_ask'] == 102.0
+
+    # Celah: event 103..104 hilang
+    assert not book.on_event(depth_event(105, 106, bids=[(99.5, 1.0)]))
+    assert not book.synced and book.features() == {}
+    # Event setelah celah di-buffer sampai snapshot baru
+    assert book.on_event(depth_event(107, 107, bids=[(98.0, 0.0)]))
+    assert book.wait_buffered(0)
+
+    assert book.load_snapshot({'lastUpdateId': 105, 'bids': [['99.0', '1.0'], ['98.0', '1.0']],
+                               'asks': [['101.5', '2.0']]})
+    assert book.synced and book.last_update_id == 107
+    assert book.top(5) == {'bids': [(99.5, 1.0), (99.0, 1.0)], 'asks': [(101.5, 2.0)]}
@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pywt")
+
+from backend import CryptoTradingSystem
+from resample import bucket_start
+from result_cache import ResultCache
+from synthetic import synthetic_frame
+
+LIMIT = 300
+STEP_MS = 60_000
+
+
+class FormingCandleSystem(CryptoTradingSystem):
+    """Klines sintetis yang diakhiri candle terbentuk; close-nya berubah setiap request"""
+
+    def __init__(self, cached: bool = True):
+        super().__init__(offline=True)
+        self.result_cache = ResultCache() if cached else None
+        self.requests = []
+
+    def get_klines(self, symbol, interval, limit=500, priority=None):
+        self.requests.append(limit)
+        forming = int(bucket_start(np.int64(time.time() * 1000), '1m'))
+        df = synthetic_frame(limit)
+        df['timestamp'] = pd.to_datetime(forming - STEP_MS * np.arange(limit)[::-1], unit='ms')
+        df.loc[limit - 1, 'close'] += len(self.requests)
+        return df
+
+
+def current_candle() -> int:
+    return int(bucket_start(np.int64(time.time() * 1000), '1m'))
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_recommendation_uses_closed_candles(cached):
+    system = FormingCandleSystem(cached)
+    forming = current_candle()
+    df, analysis = system.get_trading_recommendation('BTCUSDT', '1m', LIMIT)
+    if current_candle() != forming:
+        pytest.skip("candle closed during the test")
+
+    # Satu request `limit` candle (tanpa halaman tambahan); candle terbentuk dibuang
+    assert system.requests == [LIMIT]
+    assert system._to_ms(df['timestamp'].iloc[-1]) == forming - STEP_MS
+    assert len(df) == LIMIT - 1
+    assert analysis['last_close'] == df['close'].iloc[-1]
+    closed = system.get_klines('BTCUSDT', '1m', LIMIT).iloc[:-1].reset_index(drop=True)
+    expected = CryptoTradingSystem(offline=True).calculate_indicators(closed)[1]
+    assert expected['last_close'] == analysis['last_close']
+    assert expected['recommendation'] == analysis['recommendation']
+
+
+def test_cache_serves_closed_candle_result():
+    system = FormingCandleSystem()
+    forming = current_candle()
+    _, analysis = system.get_trading_recommendation('BTCUSDT', '1m', LIMIT)
+    _, cached = system.get_trading_recommendation('BTCUSDT', '1m', LIMIT)
+    if current_candle() != forming:
+        pytest.skip("candle closed during the test")
+    assert len(system.requests) == 1
+    assert cached is analysis
+
+
+def test_failed_analysis_not_cached(monkeypatch):
+    system = FormingCandleSystem()
+    # Jalur exception calculate_indicators mengembalikan analisis kosong
+    monkeypatch.setattr(system, 'calculate_indicators', lambda df, symbol, interval: (df, {}))
+    system.get_trading_recommendation('BTCUSDT', '1m', LIMIT)
+    system.get_trading_recommendation('BTCUSDT', '1m', LIMIT)
+    assert len(system.requests) == 2
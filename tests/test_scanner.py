@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("pywt")
+
+import scanner
+from backend import CryptoTradingSystem
+from scanner import MarketScanner
+from synthetic import synthetic_frame
+
+LIMIT = 300
+
+
+class StubSystem:
+    """Sistem minimal untuk scan(): klines sintetis per simbol"""
+
+    def __init__(self, causal_wavelet: bool):
+        self.causal_denoiser = CryptoTradingSystem(offline=True, causal_wavelet=causal_wavelet).causal_denoiser
+
+    def get_klines(self, symbol, interval, limit, priority=None):
+        return synthetic_frame(limit, seed=int(symbol[1:-4]))
+
+
+@pytest.mark.parametrize("causal_wavelet", [True, False])
+def test_scan_uses_system_denoiser(monkeypatch, causal_wavelet):
+    system = StubSystem(causal_wavelet)
+    used = []
+
+    def batch_indicators(stacked, denoiser=None):
+        used.append(denoiser)
+        return original(stacked, denoiser=denoiser)
+
+    original = scanner.batch_indicators
+    monkeypatch.setattr(scanner, 'batch_indicators', batch_indicators)
+    result = MarketScanner(system, max_workers=1).scan('M1', LIMIT, [f"S{i}USDT" for i in range(3)])
+    assert len(result) == 3
+    assert used == [system.causal_denoiser]
+    assert (used[0] is not None) == causal_wavelet
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pywt")
+
+from backend import CryptoTradingSystem
+from candle_buffer import CandleRingBuffer
+from compact_frame import INDICATOR_COLUMNS
+from indicator_kernel import indicator_kernel, VALUE_ROWS, SIGNAL_ROWS
+from kline_parser import klines_to_frame
+from streaming_indicators import StreamingIndicators
+from synthetic import synthetic_frame, synthetic_klines
+from wavelet import CausalWaveletDenoiser, wavelet_denoise
+
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+MACD_PARAMS = (10, 24, 8)
+
+
+@pytest.mark.parametrize("causal, capacity", [(True, 400), (False, 1500)])
+def test_streaming_matches_kernel(causal, capacity):
+    df = synthetic_frame(1500, seed=7)
+    engine = StreamingIndicators(capacity, MACD_PARAMS, CausalWaveletDenoiser() if causal else None)
+    assert engine.extend(df.iloc[:300])
+    # Frame bertumpang tindih seperti ring buffer: hanya candle yang lebih baru yang diproses
+    for end in range(301, 1501, 7):
+        assert engine.extend(df.iloc[max(0, end - 200):end])
+    assert engine.extend(df.iloc[-200:])
+    assert engine.count == 1500
+
+    denoiser = CausalWaveletDenoiser()
+    values, signals = indicator_kernel(*(df[c].to_numpy(dtype=np.float64) for c in OHLCV), MACD_PARAMS,
+                                       (lambda dif, valid: denoiser.denoise(dif)) if causal
+                                       else (lambda dif, valid: wavelet_denoise(dif)))
+    streamed, streamed_signals = engine.values(capacity), engine.signals(capacity)
+    for name in VALUE_ROWS:
+        expected = values[name][-capacity:]
+        assert (np.isnan(expected) == np.isnan(streamed[name])).all(), name
+        np.testing.assert_allclose(streamed[name], expected, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+    for name in SIGNAL_ROWS:
+        assert (streamed_signals[name] == signals[name][-capacity:]).all(), name
+
+
+def test_extend_rejects_disconnected_history():
+    df = synthetic_frame(400)
+    engine = StreamingIndicators(300, MACD_PARAMS)
+    engine.extend(df.iloc[:200])
+    assert not engine.extend(df.iloc[250:300])
+    assert engine.count == 200
+
+
+def test_stream_analysis_reuses_engine():
+    df = klines_to_frame(synthetic_klines(400))
+    system = CryptoTradingSystem(offline=True)
+    buffer = CandleRingBuffer(300)
+    buffer.extend_frame(df.iloc[:300])
+    stream = {'symbol': 'BTCUSDT', 'interval': '1m', 'buffer': buffer}
+
+    result, analysis = system.calculate_stream_indicators(stream, buffer.to_frame())
+    expected, expected_analysis = system.calculate_indicators(buffer.to_frame(), 'BTCUSDT', '1m')
+    assert analysis['recommendation'] == expected_analysis['recommendation']
+    for name in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(result[name], expected[name], rtol=1e-9, equal_nan=True, err_msg=name)
+
+    # Candle close berikutnya hanya memperbarui mesin yang sama
+    engine = stream['indicators']
+    buffer.extend_frame(df.iloc[300:301])
+    system.calculate_stream_indicators(stream, buffer.to_frame())
+    assert stream['indicators'] is engine and engine.count == 301
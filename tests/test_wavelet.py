@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+pywt = pytest.importorskip("pywt")
+
+from synthetic import synthetic_frame
+from wavelet import CausalWaveletDenoiser
+
+WINDOW = 64
+
+
+def test_causal_denoiser_warmup():
+    denoiser = CausalWaveletDenoiser(window=WINDOW)
+    close = synthetic_frame(300)['close'].to_numpy()
+    result = denoiser.denoise(close)
+
+    # Prefix yang terlalu pendek untuk satu level tidak di-denoise
+    raw = [t for t in range(WINDOW) if pywt.dwt_max_level(t + 1, denoiser.wavelet) < 1]
+    assert np.array_equal(result[raw], close[raw])
+    # Bar warm-up memakai seluruh prefix; level dibatasi panjangnya sehingga berbeda dari jendela penuh
+    for t in [20, 40, WINDOW - 2]:
+        assert pywt.dwt_max_level(t + 1, denoiser.wavelet) <= denoiser.level
+        assert result[t] == pytest.approx(denoiser.denoise_windows(close[:t + 1]))
+    # Mulai indeks window - 1 setiap bar memakai jendela penuh
+    for t in [WINDOW - 1, 100, 299]:
+        assert result[t] == pytest.approx(denoiser.denoise_windows(close[t - WINDOW + 1:t + 1]))
+    # Warm-up tetap kausal: data baru tidak mengubah bar lama
+    assert np.array_equal(denoiser.denoise(close[:100]), result[:100])
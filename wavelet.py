@@ -0,0 +1,140 @@
+import logging
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger("CryptoTrader")
+
+
+def wavelet_denoise(signal: np.ndarray, wavelet: str = 'db4', level: int = 3, mode: str = 'soft') -> np.ndarray:
+    """Wavelet denoising dengan universal threshold pada detail coefficients"""
+    if len(signal) < 10:
+        return signal
+
+    try:
+        # pywt di-import saat dipakai agar import modul tetap ringan
+        import pywt
+
+        # Dekomposisi sinyal
+        coeffs = pywt.wavedec(signal, wavelet, level=level)
+
+        # Hitung threshold (universal threshold)
+        sigma = np.median(np.abs(coeffs[-level])) / 0.6745
+        threshold = sigma * np.sqrt(2 * np.log(len(signal)))
+
+        # Terapkan thresholding ke detail coefficients
+        coeffs[1:] = [pywt.threshold(c, threshold, mode) for c in coeffs[1:]]
+
+        # Rekonstruksi sinyal
+        denoised = pywt.waverec(coeffs, wavelet)
+        return denoised[:len(signal)]
+    except Exception as e:
+        logger.error(f"Wavelet denoising failed: {e}")
+        return signal
+
+
+def wavelet_denoise_batch(signals: np.ndarray, wavelet: str = 'db4', level: int = 3, mode: str = 'soft') -> np.ndarray:
+    """Wavelet denoising banyak series sekaligus (baris = series dengan panjang sama)"""
+    signals = np.asarray(signals, dtype=np.float64)
+    n = signals.shape[-1]
+    if n < 10 or len(signals) == 0:
+        return signals
+
+    import pywt
+    coeffs = pywt.wavedec(signals, wavelet, level=level, axis=-1)
+
+    # Universal threshold per series
+    sigma = np.median(np.abs(coeffs[-level]), axis=-1, keepdims=True) / 0.6745
+    threshold = sigma * np.sqrt(2 * np.log(n))
+
+    coeffs[1:] = [pywt.threshold(c, threshold, mode) for c in coeffs[1:]]
+    return pywt.waverec(coeffs, wavelet, axis=-1)[..., :n]
+
+
+# Jumlah jendela yang diproses per blok matmul agar salinan jendela tetap kecil
+_WINDOW_CHUNK = 8192
+
+
+class CausalWaveletDenoiser:
+    """Wavelet denoising kausal dengan jendela geser berukuran tetap
+
+    Nilai bar t adalah sampel terakhir hasil wavelet_denoise pada `window` bar
+    terakhir sampai t, sehingga tidak berubah ketika data baru datang (tidak
+    repaint). Dekomposisi dan rekonstruksi bersifat linear untuk panjang jendela
+    tetap, jadi keduanya diprekomputasi sekali sebagai matriks filter bank; per bar
+    hanya tersisa satu perkalian matriks, thresholding, dan satu dot product.
+
+    Warm-up: `window - 1` bar pertama belum punya jendela penuh dan memakai seluruh
+    prefix yang tersedia, dengan level dibatasi dwt_max_level panjang prefix (prefix
+    yang terlalu pendek untuk satu level, mis. di bawah 14 bar untuk db4, tidak
+    di-denoise sama sekali). Nilainya tetap kausal, tetapi bukan estimator yang sama
+    dengan bar mulai indeks `window - 1`; pemakai yang butuh perilaku seragam
+    sebaiknya mengabaikan bar warm-up.
+    """
+
+    def __init__(self, window: int = 128, wavelet: str = 'db4', level: int = 3, mode: str = 'soft'):
+        self.window = window
+        self.wavelet = wavelet
+        self.level = level
+        self.mode = mode
+        self._banks = {}
+
+    def _filter_bank(self, length: int):
+        """Matriks analisis (length x koefisien), vektor sintesis sampel terakhir, dan batas koefisien detail"""
+        if length not in self._banks:
+            import pywt
+            level = min(self.level, pywt.dwt_max_level(length, self.wavelet))
+            if length < 10 or level < 1:
+                self._banks[length] = None
+            else:
+                # Respons setiap sampel input terhadap semua koefisien
+                coeffs = pywt.wavedec(np.eye(length), self.wavelet, level=level, axis=-1)
+                analysis = np.concatenate(coeffs, axis=-1)
+                # Kontribusi setiap koefisien ke sampel terakhir hasil rekonstruksi
+                sizes = np.cumsum([c.shape[-1] for c in coeffs])[:-1]
+                units = np.split(np.eye(analysis.shape[1]), sizes, axis=-1)
+                synthesis = np.ascontiguousarray(pywt.waverec(units, self.wavelet, axis=-1)[:, length - 1])
+                # Sigma dari detail coefficients terkasar, sama dengan wavelet_denoise
+                detail = slice(sizes[0], sizes[1] if len(sizes) > 1 else None)
+                self._banks[length] = (analysis, synthesis, sizes[0], detail, np.sqrt(2 * np.log(length)))
+        return self._banks[length]
+
+    def denoise_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Nilai denoised sampel terakhir setiap jendela (..., panjang jendela)"""
+        windows = np.asarray(windows, dtype=np.float64)
+        bank = self._filter_bank(windows.shape[-1])
+        if bank is None:
+            return windows[..., -1].copy()
+
+        import pywt
+        analysis, synthesis, approx_size, detail, log_factor = bank
+        coeffs = windows @ analysis
+        sigma = np.median(np.abs(coeffs[..., detail]), axis=-1, keepdims=True) / 0.6745
+        coeffs[..., approx_size:] = pywt.threshold(coeffs[..., approx_size:], sigma * log_factor, self.mode)
+        return coeffs @ synthesis
+
+    def denoise(self, signal: np.ndarray, start: int = 0, previous: Optional[np.ndarray] = None) -> np.ndarray:
+        """Denoise kausal seluruh series (waktu,) atau banyak series (series x waktu) sekaligus
+
+        Hanya bar mulai `start` yang dihitung; bar sebelumnya diambil dari `previous`
+        (hasil panggilan sebelumnya untuk data yang sama) sehingga update per candle
+        hanya menghitung jendela candle baru.
+        """
+        signal = np.asarray(signal, dtype=np.float64)
+        n = signal.shape[-1]
+        result = np.empty(signal.shape)
+        if previous is not None and start > 0:
+            result[..., :start] = previous[..., :start]
+
+        # Bar warm-up: jendela berupa prefix yang tumbuh (level lebih rendah, lihat docstring kelas)
+        for t in range(start, min(self.window - 1, n)):
+            result[..., t] = self.denoise_windows(signal[..., :t + 1])
+
+        first = max(start, self.window - 1)
+        if first < n:
+            windows = sliding_window_view(signal, self.window, axis=-1)[..., first - self.window + 1:, :]
+            for block in range(0, windows.shape[-2], _WINDOW_CHUNK):
+                chunk = windows[..., block:block + _WINDOW_CHUNK, :]
+                result[..., first + block:first + block + chunk.shape[-2]] = self.denoise_windows(chunk)
+        return result